@@ -14,6 +14,13 @@ Usage:
     ljpw-analyzer optimize <system-config.json>
     ljpw-analyzer validate <data.csv>
     ljpw-analyzer coupling <system-config.json>
+    ljpw-analyzer mix <system-config.json>
+    ljpw-analyzer calibrate <raw-metrics.json>
+    ljpw-analyzer fleet <config-dir> [--watch]
+    ljpw-analyzer query <fleet.csv|fleet.json|config-dir> --where "harmony < 0.5"
+
+analyze, mix and calibrate results are cached on disk (see ljpw_cache);
+pass --no-cache to recompute.
 """
 
 import argparse
@@ -23,6 +30,8 @@ from typing import Dict, List, Tuple, Optional
 from dataclasses import dataclass
 import sys
 
+__version__ = '0.1.0'
+
 
 @dataclass
 class LJPWCoordinates:
@@ -226,21 +235,38 @@ class CouplingValidator:
         L_values: np.ndarray,
         J_values: np.ndarray,
         J_effective_observed: np.ndarray,
-        expected_kappa: float = 1.4
+        expected_kappa: float = 1.4,
+        n_bootstrap: int = 10000,
+        seed: Optional[int] = None,
+        method: str = 'ols'
     ) -> Dict:
         """
         Validate: Effective_J = J × (1 + κ_LJ × L)
 
         Tests Prediction 2: κ_LJ = 1.4 ± 0.2
 
+        Args:
+            n_bootstrap: Bootstrap resamples for the κ intervals (0 to skip;
+                OLS only)
+            seed: Seed for the bootstrap / Theil-Sen resampling
+            method: 'ols', or a robust estimator from ljpw_robust
+                ('theil_sen' or 'huber') when a few systems with J near zero
+                produce extreme J_eff / J ratios
+
         Returns:
             - fitted_kappa: Best-fit coupling coefficient
-            - r_squared: R² goodness of fit
+            - r_squared: R² goodness of fit (robust R² for robust methods)
             - p_value: Statistical significance
-            - confidence_interval: 95% CI for κ
+            - confidence_interval: 95% CI for κ (normal theory for OLS,
+              Sen's rank interval for Theil-Sen, sandwich for Huber)
+            - bootstrap: Percentile and BCa 95% CIs for κ (robust to
+              heteroscedastic residuals), bootstrap SE and bias
             - validated: True if 1.2 < κ < 1.6 and R² > 0.6
+            - method: Estimator used
         """
         from scipy import stats
+        from ljpw_bootstrap import slope_confidence_intervals
+        from ljpw_robust import robust_slope
 
         # Model: Effective_J = J * (1 + κ * L)
         # Rearrange: Effective_J / J = 1 + κ * L
@@ -248,19 +274,26 @@ class CouplingValidator:
 
         y = J_effective_observed / J_values
         x = L_values
-
-        # Linear regression
-        slope, intercept, r_value, p_value, std_err = stats.linregress(x, y)
-
-        fitted_kappa = slope
-        r_squared = r_value ** 2
-
-        # 95% confidence interval for slope
-        from scipy.stats import t
         n = len(x)
-        t_val = t.ppf(0.975, n - 2)  # 97.5th percentile, n-2 df
-        ci_low = fitted_kappa - t_val * std_err
-        ci_high = fitted_kappa + t_val * std_err
+
+        if method == 'ols':
+            # Linear regression
+            slope, intercept, r_value, p_value, std_err = stats.linregress(x, y)
+
+            fitted_kappa = slope
+            r_squared = r_value ** 2
+
+            # 95% confidence interval for slope
+            from scipy.stats import t
+            t_val = t.ppf(0.975, n - 2)  # 97.5th percentile, n-2 df
+            ci_low = fitted_kappa - t_val * std_err
+            ci_high = fitted_kappa + t_val * std_err
+        else:
+            fit = robust_slope(x, y, method=method, seed=seed)
+            fitted_kappa = fit['slope']
+            r_squared = fit['r_squared']
+            p_value = fit['p_value']
+            ci_low, ci_high = fit['confidence_interval']
 
         # Validation criteria
         validated = (
@@ -269,39 +302,112 @@ class CouplingValidator:
             p_value < 0.05                   # Statistically significant
         )
 
-        return {
+        result = {
             'fitted_kappa': fitted_kappa,
             'expected_kappa': expected_kappa,
             'r_squared': r_squared,
             'p_value': p_value,
             'confidence_interval': (ci_low, ci_high),
             'validated': validated,
-            'sample_size': n
+            'sample_size': n,
+            'method': method
+        }
+
+        if n_bootstrap and method == 'ols':
+            boot = slope_confidence_intervals(x, y, n_resamples=n_bootstrap, seed=seed)
+            result['bootstrap'] = {
+                'percentile_ci': boot['percentile'],
+                'bca_ci': boot['bca'],
+                'std_error': boot['std_error'],
+                'bias': boot['bias'],
+                'n_resamples': boot['n_resamples']
+            }
+
+        return result
+
+
+def analyze_system(coords: LJPWCoordinates, cache=None) -> Dict:
+    """
+    Core analysis of one system, as printed by analyze_command
+
+    Args:
+        coords: System coordinates
+        cache: Optional ljpw_cache.ResultCache; results are keyed by the
+            coordinates, __version__, the analyzer source and COUPLING_MATRIX
+
+    Returns:
+        Dict with distance, harmony, effective dimensions, Love
+        multipliers and optimization priorities ([dimension, gap] pairs)
+    """
+    from ljpw_cache import cached_call, source_fingerprint
+
+    def compute():
+        return {
+            'distance': LJPWAnalyzer.distance_from_anchor(coords),
+            'harmony': LJPWAnalyzer.harmony_index(coords),
+            'effective': LJPWAnalyzer.effective_dimensions(coords),
+            'multipliers': LJPWAnalyzer.love_multiplier(coords.L),
+            'priorities': LJPWAnalyzer.optimization_priority(coords)
         }
 
+    context = {'version': __version__, 'source': source_fingerprint('ljpw_analyzer'),
+               'coupling': LJPWAnalyzer.COUPLING_MATRIX}
+    return cached_call(cache, 'analyze', coords.to_dict(), context, compute)
 
-def analyze_command(config_path: str) -> None:
+
+def mix_system(coords: LJPWCoordinates, cache=None) -> Dict:
+    """
+    Mixing scores, diagnostics and equilibrium comparison of one system
+
+    Args:
+        coords: System coordinates
+        cache: Optional ljpw_cache.ResultCache; results are keyed by the
+            coordinates, __version__, the analyzer and mixing source and
+            the mixing coupling coefficients
+
+    Returns:
+        Dict with 'scores', 'diagnostics' and 'equilibrium_comparison'
+    """
+    from ljpw_cache import cached_call, source_fingerprint
+    from ljpw_mixing import LJPWMixer, LJPWDiagnostics
+
+    def compute():
+        diagnostics = LJPWDiagnostics()
+        values = (coords.L, coords.J, coords.P, coords.W)
+        return {
+            'scores': LJPWMixer().mix(*values),
+            'diagnostics': diagnostics.diagnose(*values),
+            'equilibrium_comparison': diagnostics.compare_to_equilibrium(*values)
+        }
+
+    context = {'version': __version__, 'source': source_fingerprint('ljpw_analyzer', 'ljpw_mixing'),
+               'coupling': LJPWMixer().coupling}
+    return cached_call(cache, 'mix', coords.to_dict(), context, compute)
+
+
+def analyze_command(config_path: str, cache=None) -> None:
     """Analyze a system from JSON configuration"""
     with open(config_path, 'r') as f:
         config = json.load(f)
 
     coords = LJPWCoordinates(**config['coordinates'])
+    analysis = analyze_system(coords, cache)
 
     print(f"=== LJPW Analysis: {config.get('system', 'Unknown System')} ===\n")
 
     # Basic metrics
     print(f"Coordinates: L={coords.L:.2f}, J={coords.J:.2f}, P={coords.P:.2f}, W={coords.W:.2f}")
 
-    distance = LJPWAnalyzer.distance_from_anchor(coords)
-    harmony = LJPWAnalyzer.harmony_index(coords)
+    distance = analysis['distance']
+    harmony = analysis['harmony']
 
     print(f"Distance from Anchor: {distance:.3f}")
     print(f"Harmony Index: {harmony:.3f}")
 
     # Effective dimensions
     print("\n--- Coupling Effects ---")
-    effective = LJPWAnalyzer.effective_dimensions(coords)
-    multipliers = LJPWAnalyzer.love_multiplier(coords.L)
+    effective = analysis['effective']
+    multipliers = analysis['multipliers']
 
     print(f"Love Multiplier Effect at L={coords.L:.2f}:")
     print(f"  Justice:  {coords.J:.2f} → {effective['effective_J']:.2f} ({multipliers['J_multiplier']:.2f}x)")
@@ -310,7 +416,7 @@ def analyze_command(config_path: str) -> None:
 
     # Optimization priorities
     print("\n--- Optimization Priorities ---")
-    priorities = LJPWAnalyzer.optimization_priority(coords)
+    priorities = analysis['priorities']
     for i, (dim, gap) in enumerate(priorities, 1):
         dim_name = {'L': 'Love', 'J': 'Justice', 'P': 'Power', 'W': 'Wisdom'}[dim]
         print(f"{i}. {dim_name}: gap = {gap:.3f}")
@@ -385,7 +491,7 @@ def coupling_command(config_path: str) -> None:
         print(f"{dim_name}: {base:.2f} × {mult:.2f} = {eff:.2f} (+{improvement:.1f}%)")
 
 
-def mix_command(config_path: str) -> None:
+def mix_command(config_path: str, cache=None) -> None:
     """Analyze mixing and numerical equivalents"""
     with open(config_path, 'r') as f:
         config = json.load(f)
@@ -394,18 +500,19 @@ def mix_command(config_path: str) -> None:
 
     # Import mixing module
     try:
-        from ljpw_mixing import LJPWMixer, LJPWDiagnostics, NATURAL_EQUILIBRIUM
+        from ljpw_mixing import NATURAL_EQUILIBRIUM
     except ImportError:
         print("Error: ljpw_mixing module not found. Please ensure it's in the same directory.")
         sys.exit(1)
 
+    result = mix_system(coords, cache)
+
     print(f"=== LJPW Mixing Analysis ===\n")
     print(f"System: {config.get('system', 'Unknown')}")
     print(f"Coordinates: L={coords.L:.2f}, J={coords.J:.2f}, P={coords.P:.2f}, W={coords.W:.2f}\n")
 
     # Mixing scores
-    mixer = LJPWMixer()
-    scores = mixer.mix(coords.L, coords.J, coords.P, coords.W)
+    scores = result['scores']
 
     print("--- Mixing Scores ---")
     print(f"Robustness (harmonic):     {scores['robustness']:.3f}  [Weakest link metric]")
@@ -416,8 +523,7 @@ def mix_command(config_path: str) -> None:
 
     # Diagnostics
     print("\n--- Diagnostics ---")
-    diagnostics = LJPWDiagnostics()
-    diag = diagnostics.diagnose(coords.L, coords.J, coords.P, coords.W)
+    diag = result['diagnostics']
 
     print(f"Bottleneck: {diag['bottleneck']} (value: {diag['bottleneck_value']:.2f})")
     print("\nIssues:")
@@ -430,7 +536,7 @@ def mix_command(config_path: str) -> None:
 
     # Color visualization
     print("\n--- Color Visualization ---")
-    print(f"RGB: {diag['color']['rgb']}")
+    print(f"RGB: {tuple(diag['color']['rgb'])}")
     print(f"Hex: {diag['color']['hex']}")
     print(f"Name: {diag['color']['name']}")
 
@@ -439,21 +545,140 @@ def mix_command(config_path: str) -> None:
     eq_vals = NATURAL_EQUILIBRIUM.as_tuple()
     print(f"Natural Equilibrium: L={eq_vals[0]:.3f}, J={eq_vals[1]:.3f}, P={eq_vals[2]:.3f}, W={eq_vals[3]:.3f}")
 
-    comp = diagnostics.compare_to_equilibrium(coords.L, coords.J, coords.P, coords.W)
+    comp = result['equilibrium_comparison']
     print(f"Distance from Natural Equilibrium: {comp['distance_from_equilibrium']:.3f}")
     print(f"Distance from Anchor Point: {comp['distance_from_anchor']:.3f}")
     print(f"Interpretation: {comp['interpretation'][0]}")
 
 
+def calibrate_command(metrics_path: str, cache=None) -> None:
+    """Calibrate raw team metrics to LJPW coordinates"""
+    from ljpw_calibrator import SoftwareTeamCalibrator, load_metrics_from_json
+
+    metrics = load_metrics_from_json(metrics_path)
+    calibrator = SoftwareTeamCalibrator()
+    coords = calibrator.calibrate(metrics, cache=cache)
+    eq_comp = calibrator.compare_to_natural_equilibrium(coords)
+
+    print("=== LJPW Calibration ===\n")
+    print(f"Coordinates: L={coords.L:.3f}, J={coords.J:.3f}, P={coords.P:.3f}, W={coords.W:.3f}")
+    print(f"Distance from Natural Equilibrium: {eq_comp['distance_from_equilibrium']:.3f}")
+    print(f"Distance from Anchor Point: {eq_comp['distance_from_anchor']:.3f}")
+    print(f"Interpretation: {eq_comp['interpretation']}")
+
+
+def fleet_command(directory: str, manifest: Optional[str], output: Optional[str],
+                  watch: bool, interval: float) -> None:
+    """Incrementally analyze every system config under a directory"""
+    import os
+    import time
+    from ljpw_fleet import FleetAnalyzer
+
+    manifest = manifest or os.path.join(directory, '.ljpw-manifest.json')
+    fleet = FleetAnalyzer(directory, manifest_path=manifest, ignore=[output] if output else [])
+
+    def report(changes, elapsed):
+        counts = ', '.join(f"{len(paths)} {kind}" for kind, paths in changes.items() if paths)
+        print(f"[{time.strftime('%H:%M:%S')}] {counts or 'no changes'} ({elapsed * 1000:.1f} ms)")
+        for rel in changes['errors']:
+            print(f"  Error in {rel}: {fleet.entries[rel]['error']}")
+
+    if watch:
+        print(f"Watching {fleet.root} (every {interval:g}s, Ctrl-C to stop)")
+        try:
+            fleet.watch(output_path=output, interval=interval, on_change=report)
+        except KeyboardInterrupt:
+            pass
+        return
+
+    started = time.perf_counter()
+    changes = fleet.scan()
+    report(changes, time.perf_counter() - started)
+    if output:
+        fleet.write_output(output)
+
+    summary = fleet.summary()
+    print(f"\n=== Fleet: {summary['systems']} systems ===")
+    if summary['systems']:
+        mean = summary['mean']
+        print(f"Mean: L={mean['L']:.2f}, J={mean['J']:.2f}, P={mean['P']:.2f}, W={mean['W']:.2f}")
+        print(f"Mean Harmony Index: {mean['harmony']:.3f}")
+        print(f"Mean Composite Score: {mean['composite']:.3f}")
+        print("Bottlenecks: " + ', '.join(f"{d}={n}" for d, n in summary['bottlenecks'].items()))
+        print("\nLowest harmony:")
+        for system in summary['lowest_harmony']:
+            print(f"  {system['harmony']:.3f}  {system['system']} ({system['path']})")
+
+
+def query_command(source: str, where: Optional[str], order_by: Optional[str], limit: Optional[int],
+                  ascending: bool, group: Optional[str], aggregates: List[str],
+                  columns: Optional[str], output_format: str) -> None:
+    """Filter, rank or group a fleet with a query expression"""
+    import csv
+    import time
+    from ljpw_query import DIMENSIONS, group_by, load_table, parse_aggregates, select
+
+    table = load_table(source)
+    started = time.perf_counter()
+    if group:
+        result = group_by(table, group, parse_aggregates(aggregates or ['harmony:mean']), where=where)
+        matched = int(result['count'].sum())
+    else:
+        index = select(table, where, order_by=order_by, limit=limit, ascending=ascending)
+        names = [c.strip() for c in columns.split(',')] if columns else \
+            [c for c in ('system', 'path') if c in table.columns] + list(DIMENSIONS) + \
+            ['harmony', 'composite', 'bottleneck'] + ([order_by] if order_by and order_by not in
+                                                       DIMENSIONS + ('harmony', 'composite') else [])
+        result = table.rows(index, names)
+        matched = len(index)
+    elapsed = time.perf_counter() - started
+
+    names = list(result)
+    rows = list(zip(*(result[name].tolist() for name in names)))
+    if output_format == 'json':
+        print(json.dumps([dict(zip(names, row)) for row in rows], indent=2))
+        return
+    if output_format == 'csv':
+        writer = csv.writer(sys.stdout)
+        writer.writerow(names)
+        writer.writerows(rows)
+        return
+
+    cells = [[f"{v:.3f}" if isinstance(v, float) else str(v) for v in row] for row in rows]
+    widths = [max([len(name)] + [len(row[k]) for row in cells]) for k, name in enumerate(names)]
+    print('  '.join(name.ljust(w) for name, w in zip(names, widths)))
+    for row in cells:
+        print('  '.join(v.ljust(w) for v, w in zip(row, widths)))
+    print(f"\n{matched} of {len(table)} systems ({elapsed * 1000:.1f} ms)")
+
+
+def _open_cache(args):
+    """ResultCache from the CLI options, or None with --no-cache"""
+    if args.no_cache:
+        return None
+    from ljpw_cache import ResultCache
+    return ResultCache(args.cache, max_bytes=int(args.cache_max_mb * 1024 * 1024))
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='LJPW Analyzer - Analyze systems using the LJPW framework'
     )
+    parser.add_argument('--version', action='version', version=f'%(prog)s {__version__}')
+
+    # Cache options, accepted after any cached command
+    cache_options = argparse.ArgumentParser(add_help=False)
+    cache_options.add_argument('--cache', metavar='PATH', default=None,
+                               help='Result cache file (default: $LJPW_CACHE_PATH or '
+                                    '~/.cache/ljpw-analyzer/results.sqlite)')
+    cache_options.add_argument('--cache-max-mb', type=float, default=64.0,
+                               help='Evict least recently used results beyond this size')
+    cache_options.add_argument('--no-cache', action='store_true', help='Always recompute')
 
     subparsers = parser.add_subparsers(dest='command', help='Command to run')
 
     # Analyze command
-    analyze_parser = subparsers.add_parser('analyze', help='Analyze a system')
+    analyze_parser = subparsers.add_parser('analyze', help='Analyze a system', parents=[cache_options])
     analyze_parser.add_argument('config', help='Path to system configuration JSON')
 
     # Optimize command
@@ -465,19 +690,59 @@ def main():
     coupling_parser.add_argument('config', help='Path to system configuration JSON')
 
     # Mix command (NEW)
-    mix_parser = subparsers.add_parser('mix', help='Analyze mixing and numerical equivalents')
+    mix_parser = subparsers.add_parser('mix', help='Analyze mixing and numerical equivalents',
+                                       parents=[cache_options])
     mix_parser.add_argument('config', help='Path to system configuration JSON')
 
+    # Calibrate command
+    calibrate_parser = subparsers.add_parser('calibrate', help='Calibrate raw team metrics',
+                                             parents=[cache_options])
+    calibrate_parser.add_argument('metrics', help='Path to RawMetrics JSON')
+
+    # Fleet command
+    fleet_parser = subparsers.add_parser('fleet', help='Incrementally analyze a directory of configs')
+    fleet_parser.add_argument('directory', help='Directory of system configuration JSON files')
+    fleet_parser.add_argument('--manifest', help='Manifest path (default: <directory>/.ljpw-manifest.json)')
+    fleet_parser.add_argument('--output', help='Write fleet summary and per-system results here')
+    fleet_parser.add_argument('--watch', action='store_true', help='Keep results current as files change')
+    fleet_parser.add_argument('--interval', type=float, default=1.0, help='Watch polling interval (s)')
+
+    # Query command
+    query_parser = subparsers.add_parser('query', help='Filter, rank or group a fleet')
+    query_parser.add_argument('source', help='Fleet CSV/.npz (L, J, P, W columns), fleet --output '
+                                             'JSON, or a directory of configs')
+    query_parser.add_argument('--where', help="Filter, e.g. \"harmony < 0.5 and bottleneck == 'J'\"")
+    query_parser.add_argument('--order-by', help='Rank by this column (largest first)')
+    query_parser.add_argument('--limit', type=int, help='Keep the top N rows')
+    query_parser.add_argument('--ascending', action='store_true', help='Rank smallest first')
+    query_parser.add_argument('--group-by', help='Aggregate per value of this column')
+    query_parser.add_argument('--agg', action='append', default=[], metavar='COLUMN:AGG[,AGG]',
+                              help='Aggregate for --group-by (count, sum, mean, min, max, std); '
+                                   'repeatable, default harmony:mean')
+    query_parser.add_argument('--columns', help='Comma-separated columns to print')
+    query_parser.add_argument('--format', choices=['table', 'csv', 'json'], default='table')
+
     args = parser.parse_args()
 
     if args.command == 'analyze':
-        analyze_command(args.config)
+        analyze_command(args.config, _open_cache(args))
     elif args.command == 'optimize':
         optimize_command(args.config)
     elif args.command == 'coupling':
         coupling_command(args.config)
     elif args.command == 'mix':
-        mix_command(args.config)
+        mix_command(args.config, _open_cache(args))
+    elif args.command == 'calibrate':
+        calibrate_command(args.metrics, _open_cache(args))
+    elif args.command == 'fleet':
+        fleet_command(args.directory, args.manifest, args.output, args.watch, args.interval)
+    elif args.command == 'query':
+        try:
+            query_command(args.source, args.where, args.order_by, args.limit, args.ascending,
+                          args.group_by, args.agg, args.columns, args.format)
+        except (ValueError, KeyError) as e:
+            print(f"Error: {e.args[0] if e.args else e}", file=sys.stderr)
+            sys.exit(2)
     else:
         parser.print_help()
         sys.exit(1)
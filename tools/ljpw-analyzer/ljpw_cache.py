@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+LJPW Cache - Content-Addressed Result Cache
+
+CI runs analyze/mix/calibrate on hundreds of configs per PR, and nearly
+all of them are unchanged since the last run. This module lets an
+unchanged input cost a hash and one lookup.
+
+This module:
+1. Keys each result by a SHA-256 of the canonical JSON of its inputs plus
+   a context (analyzer version, coupling constants, a hash of the source
+   files that compute it), so changing any of them invalidates the entry
+2. Stores results as JSON in a single SQLite file (WAL mode, safe for
+   parallel CI jobs sharing it)
+3. Evicts least-recently-used entries once the stored size passes a bound,
+   tracked as a running total in a one-row meta table so a put never
+   scans the whole cache
+4. Never fails an analysis: if the cache file cannot be used, results are
+   computed as if it did not exist
+
+Usage:
+    from ljpw_cache import ResultCache
+
+    cache = ResultCache()                     # ~/.cache/ljpw-analyzer/results.sqlite
+    result = analyze_system(coords, cache=cache)
+"""
+
+import hashlib
+import importlib.util
+import json
+import os
+import sqlite3
+import sys
+import time
+from dataclasses import asdict, is_dataclass
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'ljpw-analyzer', 'results.sqlite')
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+CACHE_PATH_ENV = 'LJPW_CACHE_PATH'
+
+
+def _json_default(value: Any) -> Any:
+    if is_dataclass(value):
+        return asdict(value)
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Cannot cache value of type {type(value).__name__}")
+
+
+def canonical_json(value: Any) -> str:
+    """Deterministic JSON: sorted keys, no whitespace, exact float repr"""
+    return json.dumps(value, sort_keys=True, separators=(',', ':'), default=_json_default)
+
+
+def cache_key(kind: str, inputs: Any, context: Any = None) -> str:
+    """Stable hash of what a result depends on"""
+    payload = canonical_json({'kind': kind, 'inputs': inputs, 'context': context})
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+@lru_cache(maxsize=None)
+def source_fingerprint(*modules: str) -> str:
+    """
+    SHA-256 over the source files of the named modules
+
+    Part of every cache context, so editing the code that computes a
+    result invalidates it without anyone bumping __version__. Hashed once
+    per process.
+    """
+    digest = hashlib.sha256()
+    for name in modules:
+        spec = importlib.util.find_spec(name)
+        origin = spec.origin if spec is not None else None
+        digest.update(name.encode('utf-8') + b'\0')
+        if origin and os.path.isfile(origin):
+            with open(origin, 'rb') as f:
+                digest.update(f.read())
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    Size-bounded LRU cache of JSON results in a SQLite file
+
+    Entries are (key, value, size, last_used). Hits refresh last_used; a
+    put that takes the total past max_bytes deletes the least recently
+    used entries until it fits. The total is kept in meta.total_bytes,
+    adjusted in the same transaction as every insert and delete.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Args:
+            path: SQLite file (default: $LJPW_CACHE_PATH, else
+                ~/.cache/ljpw-analyzer/results.sqlite); ':memory:' works
+            max_bytes: Bound on the total size of stored values
+        """
+        self.path = path or os.environ.get(CACHE_PATH_ENV) or DEFAULT_CACHE_PATH
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        try:
+            if self.path != ':memory:':
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS entries ('
+                'key TEXT PRIMARY KEY, value TEXT NOT NULL, '
+                'size INTEGER NOT NULL, last_used REAL NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS meta ('
+                'id INTEGER PRIMARY KEY CHECK (id = 0), total_bytes INTEGER NOT NULL)'
+            )
+            if conn.execute('SELECT 1 FROM meta').fetchone() is None:
+                # New file, or one written before the total was tracked: sum once
+                conn.execute('BEGIN IMMEDIATE')
+                conn.execute('INSERT OR IGNORE INTO meta (id, total_bytes) '
+                             'SELECT 0, COALESCE(SUM(size), 0) FROM entries')
+                conn.execute('COMMIT')
+            self._conn = conn
+        except (OSError, sqlite3.Error) as e:
+            print(f"Warning: result cache disabled ({self.path}: {e})", file=sys.stderr)
+
+    @property
+    def enabled(self) -> bool:
+        return self._conn is not None
+
+    def get(self, key: str) -> Optional[Any]:
+        """Cached value for key, or None"""
+        if self._conn is None:
+            return None
+        try:
+            row = self._conn.execute('SELECT value FROM entries WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute('UPDATE entries SET last_used = ? WHERE key = ?', (time.time(), key))
+            return json.loads(row[0])
+        except sqlite3.Error:
+            return None
+
+    def put(self, key: str, value: Any) -> None:
+        """Store value (JSON-serializable) under key, evicting LRU entries if needed"""
+        if self._conn is None:
+            return
+        text = value if isinstance(value, str) else canonical_json(value)
+        try:
+            self._conn.execute('BEGIN IMMEDIATE')
+            old = self._conn.execute('SELECT size FROM entries WHERE key = ?', (key,)).fetchone()
+            self._conn.execute(
+                'INSERT OR REPLACE INTO entries (key, value, size, last_used) VALUES (?, ?, ?, ?)',
+                (key, text, len(text), time.time())
+            )
+            self._add_bytes(len(text) - (old[0] if old else 0))
+            self._evict()
+            self._conn.execute('COMMIT')
+        except sqlite3.Error:
+            try:
+                self._conn.execute('ROLLBACK')
+            except sqlite3.Error:
+                pass
+
+    def _add_bytes(self, delta: int) -> None:
+        if delta:
+            self._conn.execute('UPDATE meta SET total_bytes = total_bytes + ?', (delta,))
+
+    def _total_bytes(self) -> int:
+        return self._conn.execute('SELECT total_bytes FROM meta').fetchone()[0]
+
+    def _evict(self) -> None:
+        excess = self._total_bytes() - self.max_bytes
+        if excess <= 0:
+            return
+        victims = []
+        freed = 0
+        for key, size in self._conn.execute('SELECT key, size FROM entries ORDER BY last_used'):
+            victims.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        self._conn.executemany('DELETE FROM entries WHERE key = ?', victims)
+        self._add_bytes(-freed)
+
+    def get_or_compute(self, kind: str, inputs: Any, context: Any,
+                       compute: Callable[[], Any]) -> Any:
+        """
+        Cached result for (kind, inputs, context), computing it on a miss
+
+        The result is returned as decoded JSON either way, so a hit and a
+        miss look the same to the caller (tuples come back as lists).
+        """
+        key = cache_key(kind, inputs, context)
+        cached = self.get(key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        self.misses += 1
+        text = canonical_json(compute())
+        self.put(key, text)
+        return json.loads(text)
+
+    def stats(self) -> Dict[str, Any]:
+        """Entries, stored bytes, and this session's hits and misses"""
+        entries, size = 0, 0
+        if self._conn is not None:
+            entries = self._conn.execute('SELECT COUNT(*) FROM entries').fetchone()[0]
+            size = self._total_bytes()
+        return {'path': self.path, 'entries': entries, 'bytes': size,
+                'max_bytes': self.max_bytes, 'hits': self.hits, 'misses': self.misses}
+
+    def clear(self) -> None:
+        if self._conn is not None:
+            self._conn.execute('BEGIN IMMEDIATE')
+            self._conn.execute('DELETE FROM entries')
+            self._conn.execute('UPDATE meta SET total_bytes = 0')
+            self._conn.execute('COMMIT')
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def __enter__(self) -> 'ResultCache':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def cached_call(cache: Optional[ResultCache], kind: str, inputs: Any, context: Any,
+                compute: Callable[[], Any]) -> Any:
+    """get_or_compute when a cache is given, else compute() passed through JSON"""
+    if cache is None:
+        return json.loads(canonical_json(compute()))
+    return cache.get_or_compute(kind, inputs, context, compute)
@@ -19,7 +19,7 @@ Usage:
 """
 
 import json
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Sequence
 from dataclasses import dataclass, asdict
 import numpy as np
 
@@ -70,6 +70,28 @@ class LJPWCoordinates:
         return asdict(self)
 
 
+def align_teams(values: np.ndarray, source: Sequence, teams: Optional[Sequence] = None) -> np.ndarray:
+    """
+    Per-team values reordered to another team order
+
+    Lines up metric columns from different sources (git, Prometheus,
+    surveys) for calibrate_arrays.
+
+    Args:
+        values: One value per team in source
+        source: Team order of values
+        teams: Wanted team order (None: values unchanged)
+
+    Returns:
+        One value per team in teams; NaN for teams not in source
+    """
+    if teams is None:
+        return values
+    position = {team: k for k, team in enumerate(source)}
+    index = np.array([position.get(team, -1) for team in teams], dtype=np.int64)
+    return np.where(index >= 0, np.append(np.asarray(values, dtype=float), np.nan)[index], np.nan)
+
+
 class SoftwareTeamCalibrator:
     """
     Calibrates raw metrics to LJPW coordinates
@@ -194,13 +216,34 @@ class SoftwareTeamCalibrator:
 
         return float(np.clip(W, 0, 1))
 
-    def calibrate(self, metrics: RawMetrics) -> LJPWCoordinates:
+    def calibrate(self, metrics: RawMetrics, cache=None) -> LJPWCoordinates:
         """
         Convert raw metrics to complete LJPW coordinates
 
         This is the main calibration function.
         Returns objective, reproducible LJPW coordinates.
+
+        Args:
+            metrics: Raw metrics of one team
+            cache: Optional ljpw_cache.ResultCache, keyed by the metrics,
+                the analyzer version, the calibrator source and the
+                calibration constants
         """
+        if cache is not None:
+            from ljpw_analyzer import __version__
+            from ljpw_cache import source_fingerprint
+
+            context = {
+                'version': __version__,
+                'source': source_fingerprint('ljpw_calibrator', 'ljpw_analyzer'),
+                'natural_equilibrium': self.natural_eq.to_dict(),
+                'optimal_doc_ratio': self.OPTIMAL_DOC_RATIO,
+                'optimal_cpu_utilization': self.OPTIMAL_CPU_UTILIZATION
+            }
+            coords = cache.get_or_compute('calibrate', asdict(metrics), context,
+                                          lambda: self.calibrate(metrics).to_dict())
+            return LJPWCoordinates(**coords)
+
         L = self.calibrate_love(metrics)
         J = self.calibrate_justice(metrics)
         P = self.calibrate_power(metrics)
@@ -208,6 +251,77 @@ class SoftwareTeamCalibrator:
 
         return LJPWCoordinates(L=L, J=J, P=P, W=W)
 
+    def calibrate_arrays(self, fields: Dict[str, np.ndarray]) -> np.ndarray:
+        """
+        Vectorized calibrate for many teams and/or Monte Carlo draws
+
+        Args:
+            fields: Every RawMetrics field name → array; arrays broadcast
+                against each other (e.g. (teams, 1) constants with
+                (teams, draws) samples)
+
+        Returns:
+            Array of shape broadcast_shape + (4,) holding (L, J, P, W),
+            identical to calibrate applied element by element
+        """
+        f = {name: np.asarray(value, dtype=float) for name, value in fields.items()}
+
+        # Love: connectivity, usability, documentation, psych safety (1-7 → 0-1)
+        L = (f['cross_review_rate'] + (1.0 - f['api_error_rate']) + f['doc_coverage']
+             + (f['psych_safety_score'] - 1) / 6.0) / 4
+
+        # Justice: test coverage, consistency, standards, debt ratio
+        test_coverage = (f['line_coverage'] + f['branch_coverage']) / 2
+        J = (test_coverage + (1.0 - f['architecture_violations'])
+             + f['code_standards_compliance'] + (1.0 - f['tech_debt_time_ratio'])) / 4
+
+        # Power: capped velocity, SLA performance, scalability around 70% CPU
+        velocity = np.minimum(1.0, f['velocity_achievement'])
+        performance = np.minimum(1.0, f['sla_target_ms'] / np.maximum(f['p95_response_time_ms'], 1))
+        scalability = np.maximum(
+            0, 1.0 - np.abs(f['cpu_utilization'] - self.OPTIMAL_CPU_UTILIZATION) / self.OPTIMAL_CPU_UTILIZATION
+        )
+        P = (velocity + performance + scalability) / 3
+
+        # Wisdom: doc ratio (optimal at 40%), onboarding, isolation, knowledge (1-7 → 0-1)
+        ratio = f['doc_to_code_ratio']
+        doc_ratio = np.maximum(0, np.where(
+            ratio <= self.OPTIMAL_DOC_RATIO,
+            ratio / self.OPTIMAL_DOC_RATIO,
+            1.0 - (ratio - self.OPTIMAL_DOC_RATIO) / self.OPTIMAL_DOC_RATIO
+        ))
+        onboarding = np.maximum(0, 1.0 - f['onboarding_days'] / f['baseline_onboarding_days'])
+        W = (doc_ratio + onboarding + f['change_isolation_rate']
+             + (f['knowledge_retention_score'] - 1) / 6.0) / 4
+
+        L, J, P, W = np.broadcast_arrays(L, J, P, W)
+        return np.clip(np.stack([L, J, P, W], axis=-1), 0, 1)
+
+    def calibrate_with_uncertainty(
+        self,
+        metrics: RawMetrics,
+        uncertainty: Dict,
+        n_draws: int = 2000,
+        seed: Optional[int] = None
+    ) -> Dict:
+        """
+        Calibrate one team with measurement uncertainty on its metrics
+
+        Args:
+            metrics: Point estimates
+            uncertainty: Field name → Uncertainty (or a standard error)
+            n_draws: Monte Carlo draws
+            seed: Seed for the draws
+
+        Returns:
+            Per-output bands (see ljpw_uncertainty.team_bands)
+        """
+        from ljpw_uncertainty import propagate_uncertainty, team_bands
+
+        result = propagate_uncertainty([metrics], uncertainty, n_draws=n_draws,
+                                       seed=seed, calibrator=self)
+        return team_bands(result, 0)
+
     def compare_to_natural_equilibrium(self, coords: LJPWCoordinates) -> Dict:
         """
         Compare system to Natural Equilibrium
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+LJPW Coupling - Joint Estimation of the 4×4 Coupling Matrix
+
+Re-estimates every off-diagonal entry of LJPWAnalyzer.COUPLING_MATRIX from
+panels of observed coordinates and effective outcomes.
+
+Model (key 'XY' = how much X amplifies Y, as in COUPLING_MATRIX):
+    Effective_Y = Y × (1 + Σ_{X≠Y} κ_XY × X)
+
+which is linear in κ without dividing by Y:
+    Effective_Y - Y = Σ_{X≠Y} κ_XY × (X·Y)
+
+This module implements:
+1. Batched least squares: the four target equations (12 coefficients) are
+   solved together as one stacked (4, 3, 3) system
+2. Optional ridge regularization toward a prior matrix (default: the
+   current COUPLING_MATRIX), for small or collinear panels
+3. Sparse designs: a NaN effective outcome only drops that observation from
+   that target's equation, so systems measured on a subset of dimensions
+   still contribute
+4. Classical, heteroscedasticity-robust (HC1) or cluster-robust (by system)
+   standard errors for panel data
+
+Usage:
+    from ljpw_coupling import estimate_coupling_matrix
+
+    estimate = estimate_coupling_matrix(coords, effective, system_ids=ids)
+    LJPWAnalyzer.COUPLING_MATRIX = estimate.to_coupling_matrix()
+"""
+
+import numpy as np
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+DIMENSIONS = ['L', 'J', 'P', 'W']
+
+# For target Y (column t), the sources X ≠ Y in DIMENSIONS order
+_SOURCES = [[s for s in range(4) if s != t] for t in range(4)]
+
+
+@dataclass
+class CouplingMatrixEstimate:
+    """Fitted coupling coefficients with standard errors, keyed like COUPLING_MATRIX"""
+    coefficients: Dict[str, float]
+    std_errors: Dict[str, float]
+    n_observations: Dict[str, int]  # per target dimension
+    r_squared: Dict[str, float]     # per target, for Effective_Y - Y
+    se_type: str
+    ridge: float
+
+    def to_coupling_matrix(self) -> Dict[str, float]:
+        """Drop-in replacement for LJPWAnalyzer.COUPLING_MATRIX"""
+        return dict(self.coefficients)
+
+    def as_array(self) -> np.ndarray:
+        """(4, 4) array with entry [i, j] = κ for key DIMENSIONS[i] + DIMENSIONS[j]"""
+        return np.array([[self.coefficients[a + b] for b in DIMENSIONS] for a in DIMENSIONS])
+
+    def confidence_intervals(self, z: float = 1.96) -> Dict[str, tuple]:
+        """Normal-approximation intervals for every off-diagonal entry"""
+        return {
+            key: (value - z * self.std_errors[key], value + z * self.std_errors[key])
+            for key, value in self.coefficients.items() if key[0] != key[1]
+        }
+
+
+def _prior_coefficients(prior: Optional[Dict[str, float]] = None) -> np.ndarray:
+    """Off-diagonal prior κ per target equation, shape (4, 3)"""
+    if prior is None:
+        from ljpw_analyzer import LJPWAnalyzer
+        prior = LJPWAnalyzer.COUPLING_MATRIX
+    return np.array([
+        [prior[DIMENSIONS[s] + DIMENSIONS[t]] for s in _SOURCES[t]] for t in range(4)
+    ])
+
+
+def _build_estimate(
+    beta: np.ndarray,
+    se: np.ndarray,
+    n_obs: np.ndarray,
+    r_squared: np.ndarray,
+    se_type: str,
+    ridge: float
+) -> CouplingMatrixEstimate:
+    """Key (4, 3) per-target coefficient arrays like COUPLING_MATRIX"""
+    coefficients = {a + b: 1.0 for a in DIMENSIONS for b in DIMENSIONS}
+    std_errors = {key: 0.0 for key in coefficients}
+    for t in range(4):
+        for k, s in enumerate(_SOURCES[t]):
+            key = DIMENSIONS[s] + DIMENSIONS[t]
+            coefficients[key] = float(beta[t, k])
+            std_errors[key] = float(se[t, k])
+
+    return CouplingMatrixEstimate(
+        coefficients=coefficients,
+        std_errors=std_errors,
+        n_observations={d: int(n) for d, n in zip(DIMENSIONS, n_obs)},
+        r_squared={d: float(r) for d, r in zip(DIMENSIONS, r_squared)},
+        se_type=se_type,
+        ridge=ridge
+    )
+
+
+def _design(coords: np.ndarray) -> np.ndarray:
+    """Regressors X·Y for each target: shape (4, N, 3)"""
+    return np.stack([coords[:, _SOURCES[t]] * coords[:, [t]] for t in range(4)])
+
+
+def estimate_coupling_matrix(
+    coords: np.ndarray,
+    effective: np.ndarray,
+    system_ids: Optional[np.ndarray] = None,
+    ridge: float = 0.0,
+    prior: Optional[Dict[str, float]] = None,
+    se_type: Optional[str] = None
+) -> CouplingMatrixEstimate:
+    """
+    Fit all twelve off-diagonal coupling coefficients jointly
+
+    Args:
+        coords: Observed (L, J, P, W), shape (N, 4); one row per system-period
+        effective: Observed effective (L, J, P, W), shape (N, 4); NaN where
+            an outcome was not measured
+        system_ids: Optional system identifier per row (panels); enables
+            cluster-robust standard errors
+        ridge: Penalty λ on ||κ - κ_prior||² per target equation
+        prior: Coupling matrix to shrink toward (default: LJPWAnalyzer's)
+        se_type: 'classical', 'robust' (HC1) or 'cluster'
+            (default: 'cluster' if system_ids are given, else 'robust')
+
+    Returns:
+        CouplingMatrixEstimate; diagonal entries are fixed at 1.0 (SE 0)
+    """
+    coords = np.asarray(coords, dtype=float)
+    effective = np.asarray(effective, dtype=float)
+    if coords.shape != effective.shape or coords.ndim != 2 or coords.shape[1] != 4:
+        raise ValueError("coords and effective must both have shape (N, 4)")
+
+    se_type = se_type or ('cluster' if system_ids is not None else 'robust')
+    if se_type == 'cluster' and system_ids is None:
+        raise ValueError("Cluster-robust standard errors need system_ids")
+    if se_type not in ('classical', 'robust', 'cluster'):
+        raise ValueError(f"Unknown se_type: {se_type}")
+
+    prior_beta = _prior_coefficients(prior)
+
+    # Observation weights: 0 where the target's outcome (or a coordinate) is missing
+    observed = np.isfinite(effective) & np.all(np.isfinite(coords), axis=1, keepdims=True)
+    weight = observed.T.astype(float)                        # (4, N)
+    X = _design(np.nan_to_num(coords)) * weight[:, :, None]  # (4, N, 3)
+    y = np.where(observed, effective - coords, 0.0).T        # (4, N)
+
+    # Batched normal equations with ridge toward the prior
+    eye = np.eye(3)
+    xtx = np.einsum('tni,tnj->tij', X, X)
+    xty = np.einsum('tni,tn->ti', X, y)
+    A = xtx + ridge * eye
+    beta = np.linalg.solve(A, (xty + ridge * prior_beta)[..., None])[..., 0]  # (4, 3)
+    A_inv = np.linalg.inv(A)
+
+    residuals = (y - np.einsum('tni,ti->tn', X, beta)) * weight
+    n_obs = weight.sum(axis=1)
+    df_resid = np.maximum(n_obs - 3, 1)
+
+    if se_type == 'classical':
+        sigma2 = np.sum(residuals ** 2, axis=1) / df_resid
+        cov = sigma2[:, None, None] * A_inv @ xtx @ A_inv
+    else:
+        scores = X * residuals[:, :, None]  # (4, N, 3)
+        if se_type == 'cluster':
+            clusters, cluster_idx = np.unique(np.asarray(system_ids), return_inverse=True)
+            n_clusters = len(clusters)
+            summed = np.stack([
+                np.stack([np.bincount(cluster_idx, weights=scores[t, :, i], minlength=n_clusters)
+                          for i in range(3)], axis=1)
+                for t in range(4)
+            ])  # (4, G, 3)
+            meat = np.einsum('tgi,tgj->tij', summed, summed)
+            scale = n_clusters / max(n_clusters - 1, 1) * (n_obs - 1) / df_resid
+        else:
+            meat = np.einsum('tni,tnj->tij', scores, scores)
+            scale = n_obs / df_resid
+        cov = scale[:, None, None] * A_inv @ meat @ A_inv
+
+    se = np.sqrt(np.maximum(np.diagonal(cov, axis1=1, axis2=2), 0.0))
+
+    y_mean = np.sum(y, axis=1) / np.maximum(n_obs, 1)
+    tss = np.sum(((y - y_mean[:, None]) * weight) ** 2, axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        r_squared = 1 - np.sum(residuals ** 2, axis=1) / tss
+
+    return _build_estimate(beta, se, n_obs, r_squared, se_type, ridge)
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+LJPW Fleet - Incremental Analysis of a Directory of System Configs
+
+Keeps fleet-wide results for a tree of system configs (the format of
+examples/software-team.json) current without re-analyzing every file on
+every run.
+
+This module:
+1. Records each config's mtime, size and SHA-256, plus its analysis row,
+   in a JSON manifest
+2. On each scan, stats every file and only reads those whose mtime or size
+   changed. Only files whose content hash changed are re-parsed and
+   re-analyzed
+3. Updates the fleet aggregate (counts, dimension and score sums,
+   bottleneck counts) by subtracting a system's old row and adding its
+   new one, and rewrites the output file in place
+4. Watches the tree by polling, so a one-file change costs one stat pass
+   plus the analysis of that one file
+
+Usage:
+    from ljpw_fleet import FleetAnalyzer
+
+    fleet = FleetAnalyzer('configs/', manifest_path='configs/.ljpw-manifest.json')
+    changes = fleet.scan()                 # incremental after the first run
+    print(fleet.summary()['mean']['harmony'])
+    fleet.watch(output_path='fleet.json')  # until interrupted
+"""
+
+import hashlib
+import heapq
+import json
+import os
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+DIMENSIONS = ('L', 'J', 'P', 'W')
+
+SCORES = DIMENSIONS + ('distance', 'harmony', 'composite')
+
+MANIFEST_VERSION = 1
+
+
+def analyze_config(config: Dict) -> Dict:
+    """Analysis row of one system config (as read from JSON)"""
+    from ljpw_analyzer import LJPWCoordinates, analyze_system, mix_system
+
+    coords = LJPWCoordinates(**config['coordinates'])
+    analysis = analyze_system(coords)
+    mixing = mix_system(coords)
+    return {
+        'system': config.get('system', 'Unknown System'),
+        **coords.to_dict(),
+        'distance': analysis['distance'],
+        'harmony': analysis['harmony'],
+        'composite': mixing['scores']['composite'],
+        'bottleneck': mixing['diagnostics']['bottleneck']
+    }
+
+
+def _write_json(path: str, data: Dict) -> None:
+    # Compact json.dumps uses the C encoder (json.dump and indent do not);
+    # write-then-rename so readers never see a half-written file
+    tmp = f'{path}.tmp'
+    with open(tmp, 'w') as f:
+        f.write(json.dumps(data))
+    os.replace(tmp, path)
+
+
+class FleetAnalyzer:
+    """
+    Incrementally maintained analysis of every config under a directory
+
+    Manifest entries are keyed by path relative to root: {'mtime_ns',
+    'size', 'sha256', 'row'} for a valid config or {'error'} for one that
+    could not be analyzed.
+    """
+
+    def __init__(self, root: str, manifest_path: Optional[str] = None, pattern: str = '.json',
+                 ignore: Sequence[str] = (), analyze: Callable[[Dict], Dict] = analyze_config,
+                 read_only: bool = False):
+        """
+        Args:
+            root: Directory searched recursively for configs (hidden
+                files and directories are skipped)
+            manifest_path: Where to persist the manifest (None: memory only)
+            pattern: File name suffix of configs
+            ignore: Files under root that are not configs (e.g. the output)
+            analyze: Config dict → analysis row (must include SCORES keys
+                and 'bottleneck')
+            read_only: Use an existing manifest but never write it (scan
+                still analyzes changed files, in memory)
+        """
+        self.root = os.path.abspath(root)
+        self.manifest_path = manifest_path
+        self.read_only = read_only
+        self.pattern = pattern
+        self.analyze = analyze
+        self.entries: Dict[str, Dict] = {}
+        if manifest_path and os.path.exists(manifest_path):
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+            if manifest.get('version') == MANIFEST_VERSION and manifest.get('root') == self.root:
+                self.entries = manifest['entries']
+        self._ignored = {os.path.abspath(p) for p in (manifest_path, *ignore) if p}
+
+        self.totals = {key: 0.0 for key in SCORES}
+        self.bottlenecks = {dim: 0 for dim in DIMENSIONS}
+        self.count = 0
+        for entry in self.entries.values():
+            self._add(entry.get('row'), +1)
+
+    def _add(self, row: Optional[Dict], sign: int) -> None:
+        if row is None:
+            return
+        self.count += sign
+        for key in SCORES:
+            self.totals[key] += sign * row[key]
+        self.bottlenecks[row['bottleneck']] += sign
+
+    def _files(self) -> Dict[str, os.stat_result]:
+        found = {}
+        prefix = len(self.root) + 1
+        stack = [self.root]
+        while stack:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        if not entry.name.startswith('.'):
+                            stack.append(entry.path)
+                    elif entry.name.endswith(self.pattern) and entry.path not in self._ignored \
+                            and not entry.name.startswith('.'):
+                        found[entry.path[prefix:]] = entry.stat()
+        return found
+
+    def scan(self) -> Dict[str, List[str]]:
+        """
+        Bring the manifest and aggregate up to date with the directory
+
+        Returns:
+            Relative paths that were 'added', 'changed' (re-analyzed),
+            'touched' (new mtime, same content), 'removed' and 'errors'
+        """
+        changes = {'added': [], 'changed': [], 'touched': [], 'removed': [], 'errors': []}
+        files = self._files()
+
+        for rel in [rel for rel in self.entries if rel not in files]:
+            self._add(self.entries.pop(rel).get('row'), -1)
+            changes['removed'].append(rel)
+
+        for rel, stat in files.items():
+            old = self.entries.get(rel)
+            if old is not None and old['mtime_ns'] == stat.st_mtime_ns and old['size'] == stat.st_size:
+                continue
+
+            try:
+                with open(os.path.join(self.root, rel), 'rb') as f:
+                    data = f.read()
+            except OSError:
+                continue  # vanished between listing and reading; next scan removes it
+            digest = hashlib.sha256(data).hexdigest()
+
+            if old is not None and old['sha256'] == digest:
+                old['mtime_ns'], old['size'] = stat.st_mtime_ns, stat.st_size
+                changes['touched'].append(rel)
+                continue
+
+            entry = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'sha256': digest}
+            try:
+                entry['row'] = self.analyze(json.loads(data))
+            except (ValueError, KeyError, TypeError) as e:
+                entry['error'] = f'{type(e).__name__}: {e}'
+                changes['errors'].append(rel)
+
+            if old is not None:
+                self._add(old.get('row'), -1)
+            self._add(entry.get('row'), +1)
+            self.entries[rel] = entry
+            changes['changed' if old is not None else 'added'].append(rel)
+
+        if self.manifest_path and not self.read_only and any(changes.values()):
+            self.save()
+        return changes
+
+    def save(self) -> None:
+        _write_json(self.manifest_path, {
+            'version': MANIFEST_VERSION, 'root': self.root, 'entries': self.entries
+        })
+
+    def rows(self) -> Dict[str, Dict]:
+        """Relative path → analysis row, for every valid config"""
+        return {rel: entry['row'] for rel, entry in self.entries.items() if 'row' in entry}
+
+    def summary(self, lowest: int = 5) -> Dict:
+        """
+        Fleet aggregate from the running totals
+
+        Args:
+            lowest: How many lowest-harmony systems to list
+        """
+        n = self.count
+        rows = self.rows()
+        return {
+            'systems': n,
+            'errors': {rel: e['error'] for rel, e in self.entries.items() if 'error' in e},
+            'mean': {key: (self.totals[key] / n if n else None) for key in SCORES},
+            'bottlenecks': dict(self.bottlenecks),
+            'lowest_harmony': [
+                {'path': rel, 'system': row['system'], 'harmony': row['harmony']}
+                for rel, row in heapq.nsmallest(lowest, rows.items(), key=lambda item: item[1]['harmony'])
+            ]
+        }
+
+    def write_output(self, path: str) -> None:
+        """Write summary and per-system rows to path (replaced atomically)"""
+        _write_json(path, {'summary': self.summary(), 'systems': self.rows()})
+
+    def watch(self, output_path: Optional[str] = None, interval: float = 1.0,
+              on_change: Optional[Callable[[Dict[str, List[str]], float], None]] = None,
+              max_scans: Optional[int] = None) -> None:
+        """
+        Poll the directory and keep manifest and output current
+
+        Args:
+            output_path: Fleet output file, rewritten after each change
+            interval: Seconds between scans
+            on_change: Called with scan()'s result and its duration in
+                seconds when anything changed
+            max_scans: Stop after this many scans (None: until interrupted)
+        """
+        if output_path:
+            self._ignored.add(os.path.abspath(output_path))
+        scans = 0
+        while max_scans is None or scans < max_scans:
+            started = time.perf_counter()
+            changes = self.scan()
+            scans += 1
+            if any(changes.values()) or scans == 1:
+                if output_path:
+                    self.write_output(output_path)
+                if on_change:
+                    on_change(changes, time.perf_counter() - started)
+            if max_scans is None or scans < max_scans:
+                time.sleep(interval)
+
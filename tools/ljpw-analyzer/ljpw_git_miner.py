@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+LJPW Git Miner - Love/Justice/Wisdom Inputs from Commit History
+
+Measures, per team, the git-derived RawMetrics fields described in
+validation-studies/protocols/measurement-protocol-software-teams.md:
+- cross_review_rate: share of commits reviewed by someone other than the
+  author (a Reviewed-by/Approved-by trailer, or a different committer)
+- change_isolation_rate: share of commits whose changed files all sit in
+  one module
+- doc_to_code_ratio: net documentation lines / net code lines
+
+This module:
+1. Streams `git log --numstat` for each repository (one process per
+   repository, run in parallel)
+2. Attributes every commit to teams, per repository or per path prefix
+   for monorepos
+3. Keeps daily per-team counts and running line totals as mining state,
+   so the next run only reads commits after the last one processed
+4. Emits per-team columns for SoftwareTeamCalibrator.calibrate_arrays
+
+Usage:
+    from ljpw_git_miner import GitMiner, MinerConfig
+
+    miner = GitMiner(MinerConfig(team_paths={'services/payments/': 'payments'}),
+                     state_path='.ljpw_git_state.json')
+    miner.mine(['/src/monorepo'])          # incremental after the first run
+    git_metrics = miner.result(since='2025-01-06', until='2025-01-19')
+    fields.update(git_metrics.fields(team_ids))
+"""
+
+import json
+import os
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ljpw_calibrator import align_teams
+
+_COMMIT = '\x1e'  # starts each commit header line
+_FIELD = '\x1f'
+_FORMAT = _COMMIT + _FIELD.join([
+    '%H', '%ae', '%ce', '%ct',
+    '%(trailers:key=Reviewed-by,key=Approved-by,valueonly,separator=%x1d)'
+])
+
+DOC_EXTENSIONS = ('.md', '.rst', '.txt', '.adoc', '.org')
+CODE_EXTENSIONS = (
+    '.py', '.js', '.jsx', '.ts', '.tsx', '.go', '.java', '.kt', '.scala', '.rb',
+    '.rs', '.c', '.cc', '.cpp', '.h', '.hpp', '.cs', '.swift', '.php', '.sh', '.sql'
+)
+
+
+@dataclass
+class MinerConfig:
+    """How commits map to teams and modules, and what counts as review"""
+    team_paths: Dict[str, str] = field(default_factory=dict)  # path prefix → team (longest wins)
+    repo_teams: Dict[str, str] = field(default_factory=dict)  # repo path → team (default: repo dir name)
+    module_depth: int = 2               # leading directories that name a module
+    doc_dirs: Tuple[str, ...] = ('docs/', 'doc/')
+    doc_extensions: Tuple[str, ...] = DOC_EXTENSIONS
+    code_extensions: Tuple[str, ...] = CODE_EXTENSIONS
+    bot_committers: Tuple[str, ...] = ('noreply@github.com',)  # web-flow merges are not reviews
+    branch: str = 'HEAD'
+
+
+def _day(timestamp: int) -> str:
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime('%Y-%m-%d')
+
+
+class _RepoTally:
+    """Mining state of one repository: daily counts and running line totals"""
+
+    def __init__(self, state: Optional[Dict] = None):
+        state = state or {}
+        self.head: Optional[str] = state.get('head')
+        # team → day → [commits, reviewed, isolated]
+        self.days: Dict[str, Dict[str, List[int]]] = state.get('days', {})
+        # team → [net doc lines, net code lines]
+        self.lines: Dict[str, List[int]] = state.get('lines', {})
+
+    def to_dict(self) -> Dict:
+        return {'head': self.head, 'days': self.days, 'lines': self.lines}
+
+
+def _git(repo: str, *args: str) -> str:
+    return subprocess.run(['git', '-C', repo, *args], capture_output=True, text=True,
+                          check=True).stdout.strip()
+
+
+class _CommitClassifier:
+    """Per-file lookups (team, module, doc/code), cached by path"""
+
+    def __init__(self, config: MinerConfig, repo_team: str):
+        self.config = config
+        self.repo_team = repo_team
+        self.prefixes = sorted(config.team_paths, key=len, reverse=True)
+        self.cache: Dict[str, Tuple[str, str, int]] = {}
+
+    def classify(self, path: str) -> Tuple[str, str, int]:
+        """(team, module, kind) with kind 1 = doc, 2 = code, 0 = other"""
+        info = self.cache.get(path)
+        if info is None:
+            c = self.config
+            team = next((c.team_paths[p] for p in self.prefixes if path.startswith(p)), self.repo_team)
+            parts = path.split('/')[:-1]
+            module = '/'.join(parts[:c.module_depth])
+            lower = path.lower()
+            if lower.endswith(c.doc_extensions) or lower.startswith(c.doc_dirs) \
+                    or any('/' + d in lower for d in c.doc_dirs):
+                kind = 1
+            elif lower.endswith(c.code_extensions):
+                kind = 2
+            else:
+                kind = 0
+            info = self.cache[path] = (team, module, kind)
+        return info
+
+
+def mine_repository(repo: str, config: MinerConfig, state: Optional[Dict] = None) -> Dict:
+    """
+    Mine one repository from its last processed commit to config.branch
+
+    Args:
+        repo: Path to a git work tree or bare repository
+        config: Team, module and review rules
+        state: This repository's state from an earlier run (None: full history)
+
+    Returns:
+        Updated state (JSON-serializable)
+    """
+    tally = _RepoTally(state)
+    head = _git(repo, 'rev-parse', config.branch)
+    if head == tally.head:
+        return tally.to_dict()
+
+    revision = head
+    if tally.head:
+        ancestor = subprocess.run(['git', '-C', repo, 'merge-base', '--is-ancestor', tally.head, head],
+                                  capture_output=True)
+        if ancestor.returncode == 0:
+            revision = f'{tally.head}..{head}'
+        else:
+            tally = _RepoTally()  # history was rewritten: start over
+
+    repo_team = config.repo_teams.get(repo, os.path.basename(os.path.abspath(repo).rstrip('/')))
+    classifier = _CommitClassifier(config, repo_team)
+    bots = set(config.bot_committers)
+
+    process = subprocess.Popen(
+        ['git', '-C', repo, 'log', '--no-merges', '--no-renames', '--numstat',
+         f'--format={_FORMAT}', revision],
+        stdout=subprocess.PIPE, text=True, encoding='utf-8', errors='replace', bufsize=1 << 20
+    )
+
+    def finish(commit):
+        if commit is None:
+            return
+        author, committer, timestamp, reviewers, files = commit
+        reviewed = any(r and author not in r for r in reviewers) or \
+            (committer != author and committer not in bots)
+        modules: Dict[str, set] = {}
+        for team, module, added, deleted, kind in files:
+            modules.setdefault(team, set()).add(module)
+            if kind and added >= 0:
+                lines = tally.lines.setdefault(team, [0, 0])
+                lines[kind - 1] += added - deleted
+        day = _day(timestamp)
+        for team, touched in (modules.items() if modules else [(repo_team, {''})]):
+            counts = tally.days.setdefault(team, {}).setdefault(day, [0, 0, 0])
+            counts[0] += 1
+            counts[1] += reviewed
+            counts[2] += len(touched) == 1
+
+    commit = None
+    for line in process.stdout:
+        if line.startswith(_COMMIT):
+            finish(commit)
+            sha, author, committer, timestamp, reviewers = line[1:].rstrip('\n').split(_FIELD)
+            commit = (author.lower(), committer.lower(), int(timestamp),
+                      [r.strip().lower() for r in reviewers.split('\x1d')], [])
+        elif line != '\n' and commit is not None:
+            added, deleted, path = line.rstrip('\n').split('\t', 2)
+            team, module, kind = classifier.classify(path)
+            if added == '-':  # binary file
+                commit[4].append((team, module, -1, -1, 0))
+            else:
+                commit[4].append((team, module, int(added), int(deleted), kind))
+    finish(commit)
+    if process.wait() != 0:
+        raise RuntimeError(f"git log failed in {repo}")
+
+    tally.head = head
+    return tally.to_dict()
+
+
+def _mine_job(job):
+    repo, config, state = job
+    return repo, mine_repository(repo, config, state)
+
+
+@dataclass
+class GitMetrics:
+    """Git-derived RawMetrics fields per team (NaN: no commits in the window)"""
+    teams: List[str]
+    cross_review_rate: np.ndarray
+    change_isolation_rate: np.ndarray
+    doc_to_code_ratio: np.ndarray
+    commits: np.ndarray
+
+    FIELDS = ('cross_review_rate', 'change_isolation_rate', 'doc_to_code_ratio')
+
+    def fields(self, teams: Optional[Sequence[str]] = None) -> Dict[str, np.ndarray]:
+        """
+        Columns for SoftwareTeamCalibrator.calibrate_arrays
+
+        Args:
+            teams: Team order of the other metric columns (default: self.teams);
+                teams without commits get NaN
+        """
+        return {name: align_teams(getattr(self, name), self.teams, teams) for name in self.FIELDS}
+
+
+class GitMiner:
+    """
+    Incremental, parallel miner over many repositories
+
+    State (per repository: last processed commit, daily per-team counts,
+    running doc/code line totals) is kept in memory and, with state_path,
+    in a JSON file between runs. State saved under a different MinerConfig
+    is discarded, so changed rules re-mine full history.
+    """
+
+    def __init__(self, config: Optional[MinerConfig] = None, state_path: Optional[str] = None):
+        self.config = config or MinerConfig()
+        self.state_path = state_path
+        self.repos: Dict[str, Dict] = {}
+        if state_path and os.path.exists(state_path):
+            with open(state_path) as f:
+                state = json.load(f)
+            # State mined under other team/module/doc rules is attributed
+            # differently: drop it so the next mine() starts from scratch
+            if state.get('config') == json.loads(json.dumps(asdict(self.config))):
+                self.repos = state.get('repos', {})
+
+    def mine(self, repos: Sequence[str], workers: Optional[int] = None) -> None:
+        """
+        Bring every repository up to date, in parallel processes
+
+        Args:
+            repos: Repository paths
+            workers: Processes (default: one per CPU, at most one per repo)
+        """
+        jobs = [(os.path.abspath(repo), self.config, self.repos.get(os.path.abspath(repo)))
+                for repo in repos]
+        workers = min(workers or os.cpu_count() or 1, len(jobs))
+        if workers <= 1:
+            results = map(_mine_job, jobs)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(_mine_job, jobs))
+        for repo, state in results:
+            self.repos[repo] = state
+        if self.state_path:
+            self.save()
+
+    def save(self, path: Optional[str] = None) -> None:
+        path = path or self.state_path
+        tmp = path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({'version': 1, 'config': asdict(self.config), 'repos': self.repos}, f)
+        os.replace(tmp, path)
+
+    def result(self, since: Optional[str] = None, until: Optional[str] = None) -> GitMetrics:
+        """
+        Per-team metrics over all mined repositories
+
+        Args:
+            since, until: Inclusive 'YYYY-MM-DD' (UTC) bounds for the review
+                and isolation rates. Line totals always cover full history,
+                because the doc/code ratio describes the current tree
+
+        Returns:
+            GitMetrics with one entry per team
+        """
+        counts: Dict[str, np.ndarray] = {}
+        lines: Dict[str, np.ndarray] = {}
+        for state in self.repos.values():
+            for team, days in state['days'].items():
+                acc = counts.setdefault(team, np.zeros(3))
+                for day, day_counts in days.items():
+                    if (since is None or day >= since) and (until is None or day <= until):
+                        acc += day_counts
+            for team, team_lines in state['lines'].items():
+                lines.setdefault(team, np.zeros(2))[:] += team_lines
+
+        teams = sorted(set(counts) | set(lines))
+        c = np.array([counts.get(t, np.zeros(3)) for t in teams]).reshape(len(teams), 3)
+        l = np.array([lines.get(t, np.zeros(2)) for t in teams]).reshape(len(teams), 2)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            review = np.where(c[:, 0] > 0, c[:, 1] / c[:, 0], np.nan)
+            isolation = np.where(c[:, 0] > 0, c[:, 2] / c[:, 0], np.nan)
+            ratio = np.where(l[:, 1] > 0, np.maximum(l[:, 0], 0) / l[:, 1], np.nan)
+
+        return GitMetrics(
+            teams=teams,
+            cross_review_rate=review,
+            change_isolation_rate=isolation,
+            doc_to_code_ratio=ratio,
+            commits=c[:, 0].astype(np.int64)
+        )
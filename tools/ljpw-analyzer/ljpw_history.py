@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+LJPW History - SQLite Time-Series Store of Analysis Results
+
+Persists each system's coordinates, mixing scores, bottleneck, diagnostic
+flags and (optionally) calibration inputs per timestamp, and answers
+dashboard queries from indexes.
+
+This module:
+1. Stores one row per (system, time) in a WITHOUT ROWID table clustered
+   on (system_id, time), so a system's trend is one contiguous range read
+2. Indexes harmony, (bottleneck, time) and (time, bottleneck) for
+   threshold, bottleneck and "what changed this week" queries
+3. Bulk-inserts arrays: scores come from LJPWMixer.mix_arrays, rows go in
+   through executemany inside one transaction per batch
+4. Returns query results as numpy arrays
+
+Usage:
+    from ljpw_history import HistoryStore
+
+    store = HistoryStore('ljpw_history.sqlite')
+    store.record_many(systems, times, coords)          # coords: (N, 4) L, J, P, W
+    trend = store.trend('payments', start='2024-01-01')
+    trend['time'], trend['harmony']                    # numpy arrays
+    changed = store.bottleneck_changes(since='2025-01-13')
+"""
+
+import json
+import sqlite3
+import time as _time
+from dataclasses import asdict, is_dataclass
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from ljpw_mixing import LJPWMixer
+
+DIMENSIONS = ('L', 'J', 'P', 'W')
+
+SCORES = ('robustness', 'effectiveness', 'growth_potential', 'harmony', 'composite')
+
+COLUMNS = DIMENSIONS + SCORES + ('bottleneck', 'flags')
+
+# Diagnostic bitflags, with the thresholds LJPWDiagnostics.diagnose reports issues at
+FLAG_LOW_ROBUSTNESS = 1       # robustness < 0.5: bottleneck
+FLAG_LOW_EFFECTIVENESS = 2    # effectiveness < 0.6: a dimension critically low
+FLAG_LOVE_DEFICIENCY = 4      # growth_potential < 0.8 and L < 0.7
+FLAG_FAR_FROM_ANCHOR = 8      # harmony < 0.6
+
+FLAG_NAMES = {
+    FLAG_LOW_ROBUSTNESS: 'low_robustness',
+    FLAG_LOW_EFFECTIVENESS: 'low_effectiveness',
+    FLAG_LOVE_DEFICIENCY: 'love_deficiency',
+    FLAG_FAR_FROM_ANCHOR: 'far_from_anchor',
+}
+
+TimeLike = Union[float, int, str, datetime]
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS systems (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS records (
+    system_id INTEGER NOT NULL REFERENCES systems (id),
+    time REAL NOT NULL,
+    L REAL, J REAL, P REAL, W REAL,
+    robustness REAL, effectiveness REAL, growth_potential REAL, harmony REAL, composite REAL,
+    bottleneck INTEGER,
+    flags INTEGER,
+    inputs TEXT,
+    PRIMARY KEY (system_id, time)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS records_harmony ON records (harmony);
+CREATE INDEX IF NOT EXISTS records_bottleneck ON records (bottleneck, time);
+CREATE INDEX IF NOT EXISTS records_time ON records (time, bottleneck);
+'''
+
+
+def to_timestamp(value: TimeLike) -> float:
+    """Unix seconds from a number, a datetime or an ISO 8601 string (naive = UTC)"""
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        return float(value)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def diagnostic_flags(L, J, P, W, scores: Dict[str, np.ndarray]) -> np.ndarray:
+    """Bitflags of the issues LJPWDiagnostics.diagnose would report"""
+    return (
+        FLAG_LOW_ROBUSTNESS * (scores['robustness'] < 0.5)
+        + FLAG_LOW_EFFECTIVENESS * (scores['effectiveness'] < 0.6)
+        + FLAG_LOVE_DEFICIENCY * ((scores['growth_potential'] < 0.8) & (np.asarray(L) < 0.7))
+        + FLAG_FAR_FROM_ANCHOR * (scores['harmony'] < 0.6)
+    ).astype(np.int64)
+
+
+def flag_names(flags: int) -> List[str]:
+    return [name for bit, name in FLAG_NAMES.items() if flags & bit]
+
+
+class HistoryStore:
+    """Time series of LJPW results per system in one SQLite file"""
+
+    def __init__(self, path: str = 'ljpw_history.sqlite'):
+        self.path = path
+        self.conn = sqlite3.connect(path, isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('PRAGMA cache_size=-65536')  # 64 MB keeps index pages hot during bulk loads
+        self.conn.executescript(_SCHEMA)
+        self._ids: Dict[str, int] = dict(self.conn.execute('SELECT name, id FROM systems'))
+        self._names: Dict[int, str] = {i: name for name, i in self._ids.items()}
+        self.mixer = LJPWMixer()
+
+    def _system_ids(self, names: Sequence[str]) -> np.ndarray:
+        unique, inverse = np.unique(np.asarray(names, dtype=str), return_inverse=True)
+        new = [name for name in unique.tolist() if name not in self._ids]
+        if new:
+            self.conn.executemany('INSERT OR IGNORE INTO systems (name) VALUES (?)', [(n,) for n in new])
+            for name, i in self.conn.execute(
+                    f"SELECT name, id FROM systems WHERE name IN ({','.join('?' * len(new))})", new):
+                self._ids[name] = i
+                self._names[i] = name
+        ids = np.array([self._ids[name] for name in unique.tolist()], dtype=np.int64)
+        return ids[inverse.ravel()]
+
+    def record(self, system: str, coords: Sequence[float], time: Optional[TimeLike] = None,
+               inputs=None) -> None:
+        """
+        Store one result
+
+        Args:
+            system: System name
+            coords: (L, J, P, W)
+            time: When it was measured (default: now)
+            inputs: Calibration inputs (RawMetrics or dict), stored as JSON
+        """
+        self.record_many([system], [_time.time() if time is None else time], [coords],
+                         None if inputs is None else [inputs])
+
+    def record_many(self, systems: Sequence[str], times: Sequence[TimeLike], coords: np.ndarray,
+                    inputs: Optional[Sequence] = None, batch_size: int = 200000) -> int:
+        """
+        Bulk-store results (a later record for the same system and time replaces it)
+
+        Args:
+            systems: System name per row
+            times: Unix seconds (or datetimes / ISO strings) per row
+            coords: (N, 4) array of L, J, P, W
+            inputs: Optional calibration inputs per row (RawMetrics, dict or None)
+            batch_size: Rows per transaction
+
+        Returns:
+            Rows written
+        """
+        coords = np.asarray(coords, dtype=float).reshape(-1, 4)
+        n = len(coords)
+        times = np.asarray(times)
+        times = times.astype(float) if times.dtype.kind in 'iuf' else \
+            np.array([to_timestamp(t) for t in times.tolist()], dtype=float)
+
+        L, J, P, W = coords.T
+        scores = self.mixer.mix_arrays(L, J, P, W)
+        bottleneck = np.argmin(coords, axis=1)  # ties go to the first, as in diagnose
+        flags = diagnostic_flags(L, J, P, W, scores)
+        ids = self._system_ids(systems)
+
+        encoded = None
+        if inputs is not None:
+            encoded = [None if x is None else json.dumps(asdict(x) if is_dataclass(x) else x)
+                       for x in inputs]
+
+        columns = [ids, times, L, J, P, W] + [scores[k] for k in SCORES] + [bottleneck, flags]
+        sql = (f"INSERT OR REPLACE INTO records (system_id, time, {', '.join(COLUMNS)}, inputs) "
+               f"VALUES ({', '.join('?' * (len(COLUMNS) + 3))})")
+
+        for start in range(0, n, batch_size):
+            stop = min(start + batch_size, n)
+            block = [c[start:stop].tolist() for c in columns]
+            block.append(encoded[start:stop] if encoded is not None else [None] * (stop - start))
+            self.conn.execute('BEGIN')
+            try:
+                self.conn.executemany(sql, zip(*block))
+                self.conn.execute('COMMIT')
+            except Exception:
+                self.conn.execute('ROLLBACK')
+                raise
+        return n
+
+    def _rows(self, sql: str, params: Sequence, names: Sequence[str]) -> Dict[str, np.ndarray]:
+        rows = self.conn.execute(sql, params).fetchall()
+        table = np.array(rows, dtype=float).reshape(len(rows), len(names))
+        result = {}
+        for k, name in enumerate(names):
+            column = table[:, k]
+            result[name] = column.astype(np.int64) if name in ('system_id', 'bottleneck', 'flags') else column
+        return result
+
+    def trend(self, system: str, start: Optional[TimeLike] = None, end: Optional[TimeLike] = None,
+              fields: Sequence[str] = ('harmony',)) -> Dict[str, np.ndarray]:
+        """
+        One system's time series, in time order (a range scan of the primary key)
+
+        Args:
+            system: System name
+            start, end: Inclusive time bounds (None: unbounded)
+            fields: Any of L, J, P, W, the mixing scores, bottleneck, flags
+
+        Returns:
+            Dict with 'time' and each field as numpy arrays
+        """
+        fields = list(fields)
+        for name in fields:
+            if name not in COLUMNS:
+                raise ValueError(f"Unknown field: {name}")
+        if system not in self._ids:
+            return {name: np.empty(0) for name in ['time'] + fields}
+        lo = -np.inf if start is None else to_timestamp(start)
+        hi = np.inf if end is None else to_timestamp(end)
+        return self._rows(
+            f"SELECT time, {', '.join(fields)} FROM records "
+            f"WHERE system_id = ? AND time >= ? AND time <= ? ORDER BY time",
+            (self._ids[system], lo, hi), ['time'] + fields
+        )
+
+    def snapshot(self, at: Optional[TimeLike] = None,
+                 fields: Sequence[str] = COLUMNS) -> Dict[str, np.ndarray]:
+        """
+        Latest record of every system at or before a time
+
+        Returns:
+            Dict with 'system' (names), 'time' and each field, one entry per system
+        """
+        fields = [name for name in fields if name in COLUMNS]
+        hi = np.inf if at is None else to_timestamp(at)
+        result = self._rows(
+            f"SELECT s.id, r.time, {', '.join('r.' + f for f in fields)} FROM systems s "
+            f"JOIN records r ON r.system_id = s.id AND r.time = "
+            f"(SELECT MAX(time) FROM records WHERE system_id = s.id AND time <= ?) ORDER BY s.id",
+            (hi,), ['system_id', 'time'] + fields
+        )
+        result['system'] = np.array([self._names[i] for i in result.pop('system_id').tolist()], dtype=object)
+        return result
+
+    def below_harmony(self, threshold: float, since: Optional[TimeLike] = None,
+                      until: Optional[TimeLike] = None) -> Dict[str, np.ndarray]:
+        """Records with harmony below threshold (harmony index), optionally in a time range"""
+        lo = -np.inf if since is None else to_timestamp(since)
+        hi = np.inf if until is None else to_timestamp(until)
+        result = self._rows(
+            "SELECT system_id, time, harmony, bottleneck FROM records INDEXED BY records_harmony "
+            "WHERE harmony < ? AND time >= ? AND time <= ? ORDER BY harmony",
+            (threshold, lo, hi), ['system_id', 'time', 'harmony', 'bottleneck']
+        )
+        result['system'] = np.array([self._names[i] for i in result.pop('system_id').tolist()], dtype=object)
+        return result
+
+    def bottleneck_changes(self, since: TimeLike, until: Optional[TimeLike] = None) -> Dict[str, np.ndarray]:
+        """
+        Systems whose bottleneck changed in a window
+
+        Compares every record in [since, until] with the system's previous
+        record (which may fall before since).
+
+        Returns:
+            Dict with 'system', 'time' (of the change), 'before' and 'after'
+            (dimension names), one entry per change
+        """
+        lo = to_timestamp(since)
+        hi = np.inf if until is None else to_timestamp(until)
+        # Records in the window (time index) plus each system's last record before it (primary key)
+        window = self._rows(
+            "SELECT system_id, time, bottleneck FROM records INDEXED BY records_time "
+            "WHERE time >= ? AND time <= ?",
+            (lo, hi), ['system_id', 'time', 'bottleneck']
+        )
+        systems = np.unique(window['system_id'])
+        previous = self._rows(
+            "SELECT r.system_id, r.time, r.bottleneck FROM records r "
+            "JOIN (SELECT value AS id FROM json_each(?)) s ON r.system_id = s.id AND r.time = "
+            "(SELECT MAX(time) FROM records WHERE system_id = s.id AND time < ?)",
+            (json.dumps(systems.tolist()), lo), ['system_id', 'time', 'bottleneck']
+        )
+
+        system_id = np.concatenate([previous['system_id'], window['system_id']])
+        times = np.concatenate([previous['time'], window['time']])
+        bottleneck = np.concatenate([previous['bottleneck'], window['bottleneck']])
+        order = np.lexsort((times, system_id))
+        system_id, times, bottleneck = system_id[order], times[order], bottleneck[order]
+
+        changed = np.flatnonzero((system_id[1:] == system_id[:-1]) & (bottleneck[1:] != bottleneck[:-1])) + 1
+        dims = np.array(DIMENSIONS, dtype=object)
+        return {
+            'system': np.array([self._names[i] for i in system_id[changed].tolist()], dtype=object),
+            'time': times[changed],
+            'before': dims[bottleneck[changed - 1]],
+            'after': dims[bottleneck[changed]]
+        }
+
+    def inputs(self, system: str, time: TimeLike) -> Optional[Dict]:
+        """Calibration inputs stored with one record, if any"""
+        row = self.conn.execute(
+            'SELECT inputs FROM records WHERE system_id = ? AND time = ?',
+            (self._ids.get(system, -1), to_timestamp(time))
+        ).fetchone()
+        return json.loads(row[0]) if row and row[0] else None
+
+    def __len__(self) -> int:
+        return self.conn.execute('SELECT COUNT(*) FROM records').fetchone()[0]
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> 'HistoryStore':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
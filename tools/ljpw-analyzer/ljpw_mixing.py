@@ -10,7 +10,7 @@ This module implements:
 """
 
 import numpy as np
-from typing import Dict, Tuple
+from typing import Dict, Optional, Sequence, Tuple
 from dataclasses import dataclass
 
 
@@ -48,6 +48,8 @@ COUPLING_COEFFICIENTS = {
     'LW': 1.5,  # Love → Wisdom
 }
 
+MIX_SCORES = ('robustness', 'effectiveness', 'growth_potential', 'harmony', 'composite')
+
 
 class LJPWMixer:
     """Implements multiple mixing algorithms for LJPW dimensions"""
@@ -149,6 +151,45 @@ class LJPWMixer:
             'composite': self.composite_score(L, J, P, W)
         }
 
+    def mix_arrays(self, L: np.ndarray, J: np.ndarray, P: np.ndarray, W: np.ndarray,
+                   scores: Optional[Sequence[str]] = None) -> Dict[str, np.ndarray]:
+        """
+        Vectorized mix for arrays of coordinates (any matching shape)
+
+        Args:
+            scores: Keys to compute (default: all); composite needs the other four
+
+        Returns:
+            Same keys as mix, each an array; matches mix up to rounding
+        """
+        L, J, P, W = (np.asarray(v, dtype=float) for v in (L, J, P, W))
+        wanted = set(MIX_SCORES if scores is None or 'composite' in scores else scores)
+        result = {}
+
+        if 'robustness' in wanted:
+            with np.errstate(divide='ignore'):
+                positive = (L > 0) & (J > 0) & (P > 0) & (W > 0)
+                result['robustness'] = np.where(positive, 4.0 / (1/L + 1/J + 1/P + 1/W), 0.0)
+        if 'effectiveness' in wanted:
+            result['effectiveness'] = (L * J * P * W) ** 0.25
+        if 'growth_potential' in wanted:
+            result['growth_potential'] = (
+                0.35*L
+                + 0.25*J * (1 + self.coupling['LJ'] * L)
+                + 0.20*P * (1 + self.coupling['LP'] * L)
+                + 0.20*W * (1 + self.coupling['LW'] * L)
+            )
+        if 'harmony' in wanted:
+            result['harmony'] = 1.0 / (1.0 + np.sqrt((L-1)**2 + (J-1)**2 + (P-1)**2 + (W-1)**2))
+        if 'composite' in wanted:
+            result['composite'] = (
+                0.15 * result['robustness'] +
+                0.25 * result['effectiveness'] +
+                0.35 * result['growth_potential'] +
+                0.25 * result['harmony']
+            )
+        return result
+
 
 class LJPWVisualizer:
     """Visualizes LJPW in RGB color space"""
@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+"""
+LJPW Prometheus - Power Metrics from Prometheus/OpenMetrics Dumps
+
+calibrate_power needs p95_response_time_ms, sla_target_ms and
+cpu_utilization per team. This module reads them from saved scrape dumps
+(the text exposition format, plain or .gz) instead of hand-copied JSON.
+
+This module:
+1. Streams dump files line by line and only parses the lines of the few
+   metrics it needs (prefix check first, labels parsed once per series)
+2. Maps each series' label set to a team id (a label, a lookup table or
+   a function)
+3. Turns cumulative histogram buckets into increases over the sprint
+   window (counter resets handled as Prometheus does), sums them per team
+   and interpolates p95 within a bucket like histogram_quantile
+4. Averages a CPU utilization gauge over the window, or converts a CPU
+   seconds counter to utilization via its rate
+
+Usage:
+    from ljpw_prometheus import PrometheusIngester, ScrapeConfig
+
+    ingester = PrometheusIngester(ScrapeConfig(team_label='team'), start=t0, end=t1)
+    ingester.ingest_files(sorted(glob.glob('scrapes/*.prom.gz')))
+    power = ingester.result(sla_targets={'payments': 300.0})
+    fields.update(power.fields(team_ids))
+"""
+
+import gzip
+import math
+import os
+import re
+import numpy as np
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Union
+
+from ljpw_calibrator import align_teams
+
+_SAMPLE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{.*\})?\s+(\S+)(?:\s+(\S+))?\s*$')
+# Lines containing '#' may carry an OpenMetrics exemplar
+# (" # {trace_id=...} value [timestamp]"), which the greedy label group
+# above would run into: match labels quote-aware and drop the exemplar
+_SAMPLE_EXEMPLAR = re.compile(
+    r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{(?:[^"}]+|"[^"\\]*(?:\\.[^"\\]*)*")*\})?'
+    r'\s+(\S+)(?:\s+([^\s#]\S*))?\s*(?:#.*)?$'
+)
+_LABEL = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)\s*=\s*"((?:[^"\\]|\\.)*)"')
+_ESCAPES = {'\\\\': '\\', '\\"': '"', '\\n': '\n'}
+
+TeamMap = Union[Dict[str, str], Callable[[Dict[str, str]], Optional[str]]]
+
+
+@dataclass
+class ScrapeConfig:
+    """Which metrics feed which Power inputs, and how series map to teams"""
+    latency_histogram: str = 'http_request_duration_seconds'
+    latency_to_ms: float = 1000.0            # histogram unit → milliseconds
+    cpu_metric: str = 'process_cpu_seconds_total'
+    cpu_counter: Optional[bool] = None       # None: from # TYPE, else a _total suffix
+    cpu_cores: float = 1.0                   # cores per series, for counter rates
+    sla_metric: Optional[str] = None         # gauge in the histogram unit, e.g. an SLO target
+    team_label: str = 'team'
+    team_map: Optional[TeamMap] = None       # label value → team id, or labels → team id
+    quantile: float = 0.95
+
+
+def parse_labels(text: str) -> Dict[str, str]:
+    """Label set of a sample, from the text between and including the braces"""
+    labels = {}
+    for name, value in _LABEL.findall(text):
+        if '\\' in value:
+            value = re.sub(r'\\[\\"n]', lambda m: _ESCAPES[m.group(0)], value)
+        labels[name] = value
+    return labels
+
+
+def _parse_float(text: str) -> float:
+    # Go-style spellings used by the exposition format
+    try:
+        return float(text)
+    except ValueError:
+        return {'+Inf': math.inf, '-Inf': -math.inf, 'NaN': math.nan}.get(text, math.nan)
+
+
+def histogram_quantile(q: float, upper_bounds: Sequence[float], counts: Sequence[float]) -> float:
+    """
+    Quantile from cumulative bucket counts, as Prometheus's histogram_quantile
+
+    Linear interpolation inside the bucket holding rank q·total, with 0 as
+    the lower edge of the first bucket. A rank in the +Inf bucket returns
+    the highest finite bound.
+
+    Args:
+        q: Quantile in [0, 1]
+        upper_bounds: Bucket 'le' bounds, which must include +Inf
+        counts: Cumulative count per bound
+    """
+    order = np.argsort(upper_bounds)
+    le = np.asarray(upper_bounds, dtype=float)[order]
+    counts = np.maximum.accumulate(np.asarray(counts, dtype=float)[order])  # fix non-monotonic
+    if len(le) < 2 or not np.isposinf(le[-1]) or counts[-1] <= 0:
+        return math.nan
+
+    rank = q * counts[-1]
+    b = int(np.searchsorted(counts[:-1], rank, side='left'))
+    if b == len(le) - 1:
+        return float(le[-2])
+    if b == 0 and le[0] <= 0:
+        return float(le[0])
+
+    lower = le[b - 1] if b > 0 else 0.0
+    below = counts[b - 1] if b > 0 else 0.0
+    return float(lower + (le[b] - lower) * (rank - below) / (counts[b] - below))
+
+
+class _Counter:
+    """Reset-aware increase of one counter series over the window"""
+    __slots__ = ('team', 'le', 'first_time', 'last_time', 'last', 'increase')
+
+    def __init__(self, team, le, time, value):
+        self.team, self.le = team, le
+        self.first_time = self.last_time = time
+        self.last = value
+        self.increase = 0.0
+
+    def add(self, time, value):
+        if time <= self.last_time:
+            return  # duplicate or out-of-order sample
+        # A drop means the process restarted and the counter began again at 0
+        self.increase += value - self.last if value >= self.last else value
+        self.last, self.last_time = value, time
+
+
+@dataclass
+class PowerMetrics:
+    """Power inputs per team, one array entry per team (NaN: not observed)"""
+    teams: List[str]
+    p95_response_time_ms: np.ndarray
+    sla_target_ms: np.ndarray
+    cpu_utilization: np.ndarray
+    requests: np.ndarray      # latency observations behind each p95
+    cpu_samples: np.ndarray   # gauge samples or counter series behind each CPU value
+
+    FIELDS = ('p95_response_time_ms', 'sla_target_ms', 'cpu_utilization')
+
+    def fields(self, teams: Optional[Sequence[str]] = None) -> Dict[str, np.ndarray]:
+        """
+        Columns for SoftwareTeamCalibrator.calibrate_arrays
+
+        Args:
+            teams: Team order of the other metric columns (default: self.teams);
+                teams without data get NaN
+        """
+        return {name: align_teams(getattr(self, name), self.teams, teams) for name in self.FIELDS}
+
+    def to_dict(self) -> Dict[str, Dict[str, float]]:
+        return {
+            team: {
+                'p95_response_time_ms': float(self.p95_response_time_ms[t]),
+                'sla_target_ms': float(self.sla_target_ms[t]),
+                'cpu_utilization': float(self.cpu_utilization[t]),
+                'requests': float(self.requests[t]),
+                'cpu_samples': int(self.cpu_samples[t])
+            }
+            for t, team in enumerate(self.teams)
+        }
+
+
+class PrometheusIngester:
+    """
+    Streaming reader of scrape dumps into per-team Power inputs
+
+    Memory holds one small state per series, never the samples. Counter
+    increases need samples in time order per series: feed files oldest
+    first (ingest_files sorts by modification time unless told not to).
+    """
+
+    def __init__(self, config: Optional[ScrapeConfig] = None,
+                 start: Optional[float] = None, end: Optional[float] = None):
+        """
+        Args:
+            config: Metric names and team mapping
+            start, end: Sprint window in Unix seconds (None: unbounded)
+        """
+        self.config = config or ScrapeConfig()
+        self.start = -math.inf if start is None else start
+        self.end = math.inf if end is None else end
+
+        c = self.config
+        self._bucket = c.latency_histogram + '_bucket'
+        names = [self._bucket, c.cpu_metric] + ([c.sla_metric] if c.sla_metric else [])
+        self._prefixes = tuple(names)
+        self._names = set(names)
+        self._cpu_counter = c.cpu_counter
+
+        self._series: Dict = {}  # (name, raw labels) → (team, le) or None, parsed once
+        self._buckets: Dict = {}  # series key → _Counter
+        self._cpu_counters: Dict = {}
+        self._cpu_gauge: Dict[str, List[float]] = {}  # team → [sum, count]
+        self._sla: Dict[str, List[float]] = {}
+        self.lines_read = 0
+        self.samples_used = 0
+
+    def _team(self, labels: Dict[str, str]) -> Optional[str]:
+        team_map = self.config.team_map
+        if callable(team_map):
+            return team_map(labels)
+        value = labels.get(self.config.team_label)
+        if value is None or team_map is None:
+            return value
+        return team_map.get(value)
+
+    def ingest_lines(self, lines: Iterable[str], scrape_time: Optional[float] = None) -> None:
+        """
+        Fold in exposition-format lines
+
+        Args:
+            lines: Lines of one or more scrapes
+            scrape_time: Unix seconds for samples without their own timestamp
+        """
+        prefixes, names, series = self._prefixes, self._names, self._series
+        for line in lines:
+            self.lines_read += 1
+            if line.startswith('#'):
+                # '# TYPE <name> counter|gauge' settles how to read the CPU metric
+                if self._cpu_counter is None and line.startswith('# TYPE ' + self.config.cpu_metric + ' '):
+                    self._cpu_counter = line.split()[3] == 'counter'
+                continue
+            if not line.startswith(prefixes):
+                continue
+            match = (_SAMPLE_EXEMPLAR if '#' in line else _SAMPLE).match(line)
+            if match is None:
+                continue
+            name, raw_labels, value, stamp = match.groups()
+            if name not in names:
+                continue
+
+            if stamp is not None:
+                time = float(stamp)
+                if time > 1e11:  # Prometheus text format stamps in ms, OpenMetrics in s
+                    time /= 1000.0
+            elif scrape_time is not None:
+                time = scrape_time
+            else:
+                raise ValueError("Sample without timestamp and no scrape_time given")
+            if not self.start <= time <= self.end:
+                continue
+
+            key = (name, raw_labels)
+            info = series.get(key, False)
+            if info is False:
+                labels = parse_labels(raw_labels or '')
+                team = self._team(labels)
+                info = series[key] = None if team is None else (team, _parse_float(labels.get('le', 'NaN')))
+            if info is None:
+                continue
+            team, le = info
+            value = _parse_float(value)
+            if math.isnan(value):
+                continue
+            self.samples_used += 1
+
+            if name == self._bucket:
+                self._add_counter(self._buckets, key, team, le, time, value)
+            elif name == self.config.cpu_metric:
+                if self._is_cpu_counter():
+                    self._add_counter(self._cpu_counters, key, team, None, time, value)
+                else:
+                    acc = self._cpu_gauge.setdefault(team, [0.0, 0])
+                    acc[0] += value
+                    acc[1] += 1
+            else:
+                acc = self._sla.setdefault(team, [0.0, 0])
+                acc[0] += value
+                acc[1] += 1
+
+    def _is_cpu_counter(self) -> bool:
+        if self._cpu_counter is None:
+            self._cpu_counter = self.config.cpu_metric.endswith('_total')
+        return self._cpu_counter
+
+    @staticmethod
+    def _add_counter(states: Dict, key, team, le, time, value) -> None:
+        state = states.get(key)
+        if state is None:
+            states[key] = _Counter(team, le, time, value)
+        else:
+            state.add(time, value)
+
+    def ingest_file(self, path: str, scrape_time: Optional[float] = None) -> None:
+        """
+        Fold in one dump file (.gz is decompressed on the fly)
+
+        Args:
+            path: Exposition-format text file
+            scrape_time: Time of samples without timestamps (default: file mtime)
+        """
+        if scrape_time is None:
+            scrape_time = os.path.getmtime(path)
+        opener = gzip.open if path.endswith('.gz') else open
+        with opener(path, 'rt', encoding='utf-8', errors='replace') as fh:
+            self.ingest_lines(fh, scrape_time)
+
+    def ingest_files(self, paths: Iterable[str], sort_by_mtime: bool = True) -> None:
+        """Fold in many dump files, oldest first"""
+        paths = list(paths)
+        if sort_by_mtime:
+            paths.sort(key=os.path.getmtime)
+        for path in paths:
+            self.ingest_file(path)
+
+    def result(self, sla_targets: Optional[Dict[str, float]] = None,
+               default_sla_ms: float = math.nan) -> PowerMetrics:
+        """
+        Power inputs per team from everything folded in so far
+
+        Latency buckets use their increase over the window. A team whose
+        buckets did not move (e.g. a single dump) falls back to the last
+        cumulative counts, i.e. the lifetime distribution.
+
+        Args:
+            sla_targets: Team id → SLA target in ms (overrides sla_metric)
+            default_sla_ms: Target for teams with neither
+        """
+        c = self.config
+        sla_targets = sla_targets or {}
+
+        buckets: Dict[str, Dict[float, List[float]]] = {}  # team → le → [increase, last]
+        for state in self._buckets.values():
+            acc = buckets.setdefault(state.team, {}).setdefault(state.le, [0.0, 0.0])
+            acc[0] += state.increase
+            acc[1] += state.last
+
+        cpu_rates: Dict[str, List[float]] = {}
+        for state in self._cpu_counters.values():
+            elapsed = state.last_time - state.first_time
+            if elapsed > 0:
+                cpu_rates.setdefault(state.team, []).append(state.increase / elapsed / c.cpu_cores)
+
+        teams = sorted(set(buckets) | set(cpu_rates) | set(self._cpu_gauge) | set(self._sla) | set(sla_targets))
+        T = len(teams)
+        p95, sla, cpu = np.full(T, np.nan), np.full(T, np.nan), np.full(T, np.nan)
+        requests, cpu_samples = np.zeros(T), np.zeros(T, dtype=np.int64)
+
+        for t, team in enumerate(teams):
+            if team in buckets:
+                le = np.array(list(buckets[team]))
+                counts = np.array([v[0] for v in buckets[team].values()])
+                if counts.max() <= 0:
+                    counts = np.array([v[1] for v in buckets[team].values()])
+                p95[t] = histogram_quantile(c.quantile, le, counts) * c.latency_to_ms
+                requests[t] = counts[np.isposinf(le)].sum()
+
+            if team in cpu_rates:
+                cpu[t] = np.mean(cpu_rates[team])
+                cpu_samples[t] = len(cpu_rates[team])
+            elif team in self._cpu_gauge:
+                total, count = self._cpu_gauge[team]
+                cpu[t] = total / count
+                cpu_samples[t] = count
+
+            if team in sla_targets:
+                sla[t] = sla_targets[team]
+            elif team in self._sla:
+                total, count = self._sla[team]
+                sla[t] = total / count * c.latency_to_ms
+            else:
+                sla[t] = default_sla_ms
+
+        return PowerMetrics(
+            teams=teams,
+            p95_response_time_ms=p95,
+            sla_target_ms=sla,
+            cpu_utilization=cpu,
+            requests=requests,
+            cpu_samples=cpu_samples
+        )
+
+
+def ingest_power_metrics(paths: Iterable[str], config: Optional[ScrapeConfig] = None,
+                         start: Optional[float] = None, end: Optional[float] = None,
+                         sla_targets: Optional[Dict[str, float]] = None) -> PowerMetrics:
+    """Per-team Power inputs from scrape dump files in one streaming pass"""
+    ingester = PrometheusIngester(config, start, end)
+    ingester.ingest_files(paths)
+    return ingester.result(sla_targets)
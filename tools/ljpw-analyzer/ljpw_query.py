@@ -0,0 +1,628 @@
+#!/usr/bin/env python3
+"""
+LJPW Query - Filter Expressions, Top-k and Group-by over Fleet Columns
+
+Answers questions like "harmony < 0.5 and L < 0.6 and bottleneck == 'J'"
+or "top 50 growth_potential where org == 'platform'" without a Python loop
+over LJPWDiagnostics output.
+
+This module:
+1. Holds a fleet as columns (FleetTable): L, J, P, W, any extra columns
+   (strings become categorical codes), and the mixing scores, distance,
+   bottleneck and diagnostic flags, each derived on first use (only the
+   scores a query names are computed)
+2. Parses a small expression language once into a tree of numpy
+   operations (Query), so evaluating it over N rows is a handful of
+   vectorized passes
+3. Selects the top or bottom k rows with argpartition, and aggregates
+   per group with bincount
+
+Expression language:
+    comparisons   harmony < 0.5, bottleneck == 'J', org != "payments"
+    membership    bottleneck in ('J', 'P'), org not in ('a', 'b')
+    logic         and, or, not, parentheses
+    arithmetic    + - * /, abs(x), min(a, b), max(a, b)
+    flags         low_robustness, low_effectiveness, love_deficiency,
+                  far_from_anchor (booleans, as LJPWDiagnostics.diagnose)
+
+Usage:
+    from ljpw_query import FleetTable, select, group_by
+
+    table = FleetTable.from_coordinates(L, J, P, W, extra={'system': names, 'org': orgs})
+    weak = select(table, "harmony < 0.5 and L < 0.6 and bottleneck == 'J'")
+    best = select(table, "org == 'platform'", order_by='growth_potential', limit=50)
+    per_org = group_by(table, 'org', {'harmony': 'mean', 'L': 'min'})
+"""
+
+import re
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from ljpw_history import FLAG_NAMES, diagnostic_flags
+from ljpw_mixing import LJPWMixer
+
+DIMENSIONS = ('L', 'J', 'P', 'W')
+
+SCORES = ('robustness', 'effectiveness', 'growth_potential', 'harmony', 'composite')
+
+DERIVED = SCORES + ('distance', 'bottleneck', 'flags') + tuple(FLAG_NAMES.values())
+
+AGGREGATES = ('count', 'sum', 'mean', 'min', 'max', 'std')
+
+
+class FleetTable:
+    """
+    Named columns of equal length, with categorical string columns
+
+    A categorical column is stored as int64 codes into an array of its
+    distinct values; bottleneck is categorical over DIMENSIONS. Encoding
+    strings sorts them, so for very large fleets pass codes and categories.
+    """
+
+    def __init__(self, columns: Dict[str, np.ndarray],
+                 categories: Optional[Dict[str, np.ndarray]] = None):
+        """
+        Args:
+            columns: Name → 1-D array (strings are encoded as categorical)
+            categories: Name → values, for columns already given as codes
+        """
+        self.columns: Dict[str, np.ndarray] = {}
+        self.categories: Dict[str, np.ndarray] = dict(categories or {})
+        self._mixer: Optional[LJPWMixer] = None
+        lengths = set()
+        for name, values in columns.items():
+            values = np.asarray(values)
+            if values.dtype.kind in 'OUS' and name not in self.categories:
+                self.categories[name], values = np.unique(values.astype(str), return_inverse=True)
+            self.columns[name] = values.ravel()
+            lengths.add(len(self.columns[name]))
+        if len(lengths) > 1:
+            raise ValueError(f"Columns have different lengths: {sorted(lengths)}")
+        self.size = lengths.pop() if lengths else 0
+
+    @classmethod
+    def from_coordinates(cls, L, J, P, W, extra: Optional[Dict[str, Sequence]] = None,
+                         mixer: Optional[LJPWMixer] = None) -> 'FleetTable':
+        """
+        Table over coordinate arrays; scores and diagnostics are derived lazily
+
+        Args:
+            L, J, P, W: Coordinate arrays
+            extra: More columns per row (e.g. 'system', 'org', 'headcount')
+            mixer: Mixer whose coupling constants the scores use
+        """
+        columns = dict(zip(DIMENSIONS, (np.asarray(v, dtype=float) for v in (L, J, P, W))))
+        columns.update(extra or {})
+        table = cls(columns)
+        table._mixer = mixer
+        return table
+
+    def __len__(self) -> int:
+        return self.size
+
+    def names(self) -> List[str]:
+        """Stored columns, then the derivable ones"""
+        derivable = [name for name in DERIVED if name not in self.columns] \
+            if all(d in self.columns for d in DIMENSIONS) else []
+        return list(self.columns) + derivable
+
+    def _derive(self, name: str) -> None:
+        # Only what the name needs: harmony alone skips the harmonic and
+        # geometric means, and bottleneck needs no scores at all
+        L, J, P, W = (self.columns[d] for d in DIMENSIONS)
+        if name == 'distance':
+            distance = np.zeros(len(L))
+            gap = np.empty(len(L))
+            for values in (L, J, P, W):
+                np.subtract(values, 1.0, out=gap)
+                distance += np.square(gap, out=gap)
+            self.columns['distance'] = np.sqrt(distance, out=distance)
+        elif name == 'harmony':
+            self.columns['harmony'] = 1.0 / (1.0 + self['distance'])
+        elif name in SCORES:
+            scores = (self._mixer or LJPWMixer()).mix_arrays(L, J, P, W, scores=[name])
+            for key, values in scores.items():
+                self.columns.setdefault(key, values)
+        elif name == 'bottleneck':
+            # Ties go to the first dimension, as in LJPWDiagnostics.diagnose
+            bottleneck = np.zeros(len(L), dtype=np.int8)
+            lowest = L.copy()
+            lower = np.empty(len(L), dtype=bool)
+            for k, values in enumerate((J, P, W), start=1):
+                # Branch-free select: masked stores on random masks are slow
+                np.less(values, lowest, out=lower)
+                bottleneck *= ~lower
+                bottleneck += lower.view(np.int8) * np.int8(k)
+                np.minimum(lowest, values, out=lowest)
+            self.columns['bottleneck'] = bottleneck
+            self.categories['bottleneck'] = np.array(DIMENSIONS)
+        elif name == 'flags':
+            self.columns['flags'] = diagnostic_flags(L, J, P, W, {k: self[k] for k in SCORES[:4]})
+        else:
+            bit = next(b for b, flag in FLAG_NAMES.items() if flag == name)
+            flag_inputs = {
+                'low_robustness': ('robustness',),
+                'low_effectiveness': ('effectiveness',),
+                'love_deficiency': ('growth_potential',),
+                'far_from_anchor': ('harmony',)
+            }[name]
+            if 'flags' in self.columns:
+                self.columns[name] = (self.columns['flags'] & bit) != 0
+            else:
+                # Scores this flag does not test are passed as +inf, which trips nothing
+                scores = {k: self[k] if k in flag_inputs else np.inf for k in SCORES[:4]}
+                self.columns[name] = (diagnostic_flags(L, J, P, W, scores) & bit) != 0
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        if name not in self.columns:
+            if name not in DERIVED or not all(d in self.columns for d in DIMENSIONS):
+                raise KeyError(f"Unknown column: {name} (available: {', '.join(self.names())})")
+            self._derive(name)
+        return self.columns[name]
+
+    def decoded(self, name: str, index: Optional[np.ndarray] = None) -> np.ndarray:
+        """Column values (categorical codes mapped back to strings), optionally at index"""
+        values = self[name] if index is None else self[name][index]
+        if name in self.categories:
+            return self.categories[name][values]
+        return values
+
+    def rows(self, index: np.ndarray, columns: Sequence[str]) -> Dict[str, np.ndarray]:
+        """Selected rows as decoded columns"""
+        return {name: self.decoded(name, index) for name in columns}
+
+
+# --- Expression parsing ---
+
+_TOKEN = re.compile(r"""
+    \s*(?:
+        (?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)
+      | (?P<string>'[^']*'|"[^"]*")
+      | (?P<name>[A-Za-z_][A-Za-z0-9_]*)
+      | (?P<op>==|!=|<=|>=|[<>()+\-*/,])
+    )""", re.VERBOSE)
+
+_KEYWORDS = {'and', 'or', 'not', 'in', 'true', 'false'}
+
+_COMPARE = {
+    '==': np.equal, '!=': np.not_equal, '<': np.less,
+    '<=': np.less_equal, '>': np.greater, '>=': np.greater_equal
+}
+
+_ARITHMETIC = {'+': np.add, '-': np.subtract, '*': np.multiply, '/': np.divide}
+
+_FUNCTIONS = {'abs': (1, np.abs), 'min': (2, np.minimum), 'max': (2, np.maximum)}
+
+
+def _tokenize(text: str) -> List[Tuple[str, str, int]]:
+    tokens = []
+    position = 0
+    text = text.rstrip()
+    while position < len(text):
+        match = _TOKEN.match(text, position)
+        if match is None or match.end() == position:
+            position = len(text) - len(text[position:].lstrip())  # report the character, not spaces
+            raise ValueError(f"Unexpected character at {position}: {text[position:position + 10]!r}")
+        kind = match.lastgroup
+        value = match.group(kind)
+        start = match.start(kind)
+        if kind == 'name' and value.lower() in _KEYWORDS:
+            kind, value = 'keyword', value.lower()
+        tokens.append((kind, value, start))
+        position = match.end()
+    tokens.append(('end', '', len(text)))
+    return tokens
+
+
+class _Parser:
+    """
+    Recursive descent over the grammar
+
+        or      := and ('or' and)*
+        and     := not ('and' not)*
+        not     := 'not' not | compare
+        compare := sum [(op sum) | ['not'] 'in' '(' literal (',' literal)* ')']
+        sum     := product (('+' | '-') product)*
+        product := unary (('*' | '/') unary)*
+        unary   := '-' unary | atom
+        atom    := number | string | true | false | name | name '(' args ')' | '(' or ')'
+
+    Nodes are tuples: ('num', value), ('str', value), ('col', name),
+    ('cmp', op, a, b), ('in', node, values, negate), ('and', a, b),
+    ('or', a, b), ('not', a), ('arith', op, a, b), ('neg', a),
+    ('call', name, args).
+    """
+
+    def __init__(self, text: str):
+        self.tokens = _tokenize(text)
+        self.position = 0
+
+    def peek(self) -> Tuple[str, str, int]:
+        return self.tokens[self.position]
+
+    def accept(self, kind: str, value: Optional[str] = None) -> bool:
+        token_kind, token_value, _ = self.peek()
+        if token_kind == kind and (value is None or token_value == value):
+            self.position += 1
+            return True
+        return False
+
+    def expect(self, kind: str, value: Optional[str] = None) -> str:
+        token = self.peek()
+        if not self.accept(kind, value):
+            wanted = repr(value) if value else kind
+            found = repr(token[1]) if token[1] else 'end of query'
+            raise ValueError(f"Expected {wanted} at {token[2]}, found {found}")
+        return token[1]
+
+    def parse(self):
+        node = self.parse_or()
+        self.expect('end')
+        return node
+
+    def parse_or(self):
+        node = self.parse_and()
+        while self.accept('keyword', 'or'):
+            node = ('or', node, self.parse_and())
+        return node
+
+    def parse_and(self):
+        node = self.parse_not()
+        while self.accept('keyword', 'and'):
+            node = ('and', node, self.parse_not())
+        return node
+
+    def parse_not(self):
+        if self.accept('keyword', 'not'):
+            return ('not', self.parse_not())
+        return self.parse_compare()
+
+    def parse_compare(self):
+        node = self.parse_sum()
+        kind, value, _ = self.peek()
+        if kind == 'op' and value in _COMPARE:
+            self.position += 1
+            return ('cmp', value, node, self.parse_sum())
+        negate = self.accept('keyword', 'not')
+        if negate or self.accept('keyword', 'in'):
+            if negate:
+                self.expect('keyword', 'in')
+            self.expect('op', '(')
+            values = [self.parse_literal()]
+            while self.accept('op', ','):
+                values.append(self.parse_literal())
+            self.expect('op', ')')
+            return ('in', node, values, negate)
+        return node
+
+    def parse_literal(self):
+        negative = self.accept('op', '-')
+        kind, value, position = self.peek()
+        self.position += 1
+        if kind == 'number':
+            return -float(value) if negative else float(value)
+        if kind == 'string' and not negative:
+            return value[1:-1]
+        raise ValueError(f"Expected a number or string at {position}")
+
+    def parse_sum(self):
+        node = self.parse_product()
+        while self.peek()[0] == 'op' and self.peek()[1] in '+-':
+            op = self.peek()[1]
+            self.position += 1
+            node = ('arith', op, node, self.parse_product())
+        return node
+
+    def parse_product(self):
+        node = self.parse_unary()
+        while self.peek()[0] == 'op' and self.peek()[1] in '*/':
+            op = self.peek()[1]
+            self.position += 1
+            node = ('arith', op, node, self.parse_unary())
+        return node
+
+    def parse_unary(self):
+        if self.accept('op', '-'):
+            return ('neg', self.parse_unary())
+        return self.parse_atom()
+
+    def parse_atom(self):
+        kind, value, position = self.peek()
+        self.position += 1
+        if kind == 'number':
+            return ('num', float(value))
+        if kind == 'string':
+            return ('str', value[1:-1])
+        if kind == 'keyword' and value in ('true', 'false'):
+            return ('num', value == 'true')
+        if kind == 'name':
+            if self.accept('op', '('):
+                if value not in _FUNCTIONS:
+                    raise ValueError(f"Unknown function at {position}: {value}")
+                args = [self.parse_sum()]
+                while self.accept('op', ','):
+                    args.append(self.parse_sum())
+                self.expect('op', ')')
+                if len(args) != _FUNCTIONS[value][0]:
+                    raise ValueError(f"{value}() takes {_FUNCTIONS[value][0]} argument(s)")
+                return ('call', value, args)
+            return ('col', value)
+        if kind == 'op' and value == '(':
+            node = self.parse_or()
+            self.expect('op', ')')
+            return node
+        raise ValueError(f"Unexpected {value!r} at {position}" if value else "Unexpected end of query")
+
+
+def _columns(node) -> List[str]:
+    if node[0] == 'col':
+        return [node[1]]
+    children = []
+    for part in node[1:]:
+        if isinstance(part, tuple):
+            children.append(part)
+        elif isinstance(part, list):
+            children.extend(p for p in part if isinstance(p, tuple))
+    return [name for child in children for name in _columns(child)]
+
+
+class Query:
+    """
+    A parsed filter expression
+
+    Parse once, then evaluate over any FleetTable; evaluation is one
+    numpy pass per node, and string literals are looked up in the
+    column's categories once per evaluation rather than per row.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.tree = _Parser(text).parse()
+        self.columns = sorted(set(_columns(self.tree)))
+
+    def mask(self, table: FleetTable) -> np.ndarray:
+        """Boolean mask of the rows that match"""
+        for name in self.columns:
+            table[name]  # unknown columns fail here, before any work
+        result = self._evaluate(self.tree, table)
+        result = np.asarray(result)
+        if result.dtype != bool:
+            raise ValueError(f"Query does not produce a condition: {self.text}")
+        return np.broadcast_to(result, (len(table),))
+
+    def _codes(self, node, table: FleetTable, values: Sequence) -> Tuple[np.ndarray, List]:
+        """Column values and literals, strings mapped to a categorical column's codes"""
+        if node[0] == 'col' and node[1] in table.categories:
+            categories = table.categories[node[1]]
+            codes = []
+            for value in values:
+                if not isinstance(value, str):
+                    raise ValueError(f"{node[1]} is a text column; compare it with a string")
+                found = np.flatnonzero(categories == value)
+                codes.append(int(found[0]) if len(found) else -1)
+            return table[node[1]], codes
+        if any(isinstance(value, str) for value in values):
+            raise ValueError(f"Only text columns can be compared with strings: {values}")
+        return self._evaluate(node, table), list(values)
+
+    def _evaluate(self, node, table: FleetTable):
+        kind = node[0]
+        if kind == 'num':
+            return node[1]
+        if kind == 'str':
+            raise ValueError(f"String {node[1]!r} must be compared with a text column")
+        if kind == 'col':
+            values = table[node[1]]
+            if node[1] in table.categories:
+                raise ValueError(f"{node[1]} is a text column; compare it with a string")
+            return values
+        if kind == 'and':
+            return np.logical_and(self._evaluate(node[1], table), self._evaluate(node[2], table))
+        if kind == 'or':
+            return np.logical_or(self._evaluate(node[1], table), self._evaluate(node[2], table))
+        if kind == 'not':
+            return np.logical_not(self._evaluate(node[1], table))
+        if kind == 'cmp':
+            op, left, right = node[1:]
+            if 'str' in (left[0], right[0]) and op not in ('==', '!='):
+                raise ValueError(f"Text can only be compared with == or !=, not {op}")
+            if right[0] == 'str':
+                values, (code,) = self._codes(left, table, [right[1]])
+                return _COMPARE[op](values, code)
+            if left[0] == 'str':
+                values, (code,) = self._codes(right, table, [left[1]])
+                return _COMPARE[op](code, values)
+            return _COMPARE[op](self._evaluate(left, table), self._evaluate(right, table))
+        if kind == 'in':
+            values, codes = self._codes(node[1], table, node[2])
+            found = np.isin(values, codes)
+            return ~found if node[3] else found
+        if kind == 'arith':
+            with np.errstate(divide='ignore', invalid='ignore'):
+                return _ARITHMETIC[node[1]](self._evaluate(node[2], table), self._evaluate(node[3], table))
+        if kind == 'neg':
+            return np.negative(self._evaluate(node[1], table))
+        if kind == 'call':
+            return _FUNCTIONS[node[1]][1](*(self._evaluate(arg, table) for arg in node[2]))
+        raise ValueError(f"Unknown node: {kind}")
+
+
+QueryLike = Union[str, Query, None]
+
+
+def _as_mask(table: FleetTable, where: QueryLike) -> Optional[np.ndarray]:
+    if where is None or (isinstance(where, str) and not where.strip()):
+        return None
+    return (where if isinstance(where, Query) else Query(where)).mask(table)
+
+
+def top_k(values: np.ndarray, k: int, largest: bool = True) -> np.ndarray:
+    """
+    Indices of the k largest (or smallest) values, best first
+
+    argpartition finds the k in O(N); only those k are sorted. NaN
+    ranks last either way.
+    """
+    values = np.asarray(values, dtype=float)
+    keys = -values if largest else values
+    keys = np.where(np.isnan(keys), np.inf, keys)
+    k = min(k, len(keys))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if k < len(keys):
+        candidates = np.argpartition(keys, k - 1)[:k]
+    else:
+        candidates = np.arange(len(keys))
+    return candidates[np.argsort(keys[candidates], kind='stable')]
+
+
+def select(table: FleetTable, where: QueryLike = None, order_by: Optional[str] = None,
+           limit: Optional[int] = None, ascending: bool = False) -> np.ndarray:
+    """
+    Row indices matching a query, optionally ranked
+
+    Args:
+        table: Fleet columns
+        where: Filter expression (None: all rows)
+        order_by: Column to rank by (top-k when limit is given)
+        limit: Keep at most this many rows
+        ascending: Rank smallest first (default: largest first)
+
+    Returns:
+        Row indices into table
+    """
+    mask = _as_mask(table, where)
+    index = np.arange(len(table)) if mask is None else np.flatnonzero(mask)
+    if order_by is not None:
+        values = table[order_by][index]
+        ranked = top_k(values, len(index) if limit is None else limit, largest=not ascending)
+        return index[ranked]
+    return index if limit is None else index[:limit]
+
+
+def group_by(table: FleetTable, key: str, aggregates: Dict[str, Union[str, Sequence[str]]],
+             where: QueryLike = None) -> Dict[str, np.ndarray]:
+    """
+    Aggregate columns per distinct value of key
+
+    Args:
+        table: Fleet columns
+        key: Column to group by (categorical, integer or float)
+        aggregates: Column → aggregate name(s) from AGGREGATES
+        where: Filter applied before grouping
+
+    Returns:
+        Dict with key (group values), 'count', and '<aggregate>_<column>'
+        arrays, one entry per non-empty group
+    """
+    mask = _as_mask(table, where)
+    values = table[key] if mask is None else table[key][mask]
+    if key in table.categories:
+        labels = table.categories[key]
+        codes = values
+    else:
+        labels, codes = np.unique(values, return_inverse=True)
+    groups = len(labels)
+
+    count = np.bincount(codes, minlength=groups)
+    present = count > 0
+    result = {key: labels[present], 'count': count[present]}
+
+    for column, names in aggregates.items():
+        names = [names] if isinstance(names, str) else list(names)
+        data = np.asarray(table[column] if mask is None else table[column][mask], dtype=float)
+        sums = None
+        for name in names:
+            if name not in AGGREGATES:
+                raise ValueError(f"Unknown aggregate: {name} (choose from {AGGREGATES})")
+            if name == 'count':
+                continue
+            if name in ('sum', 'mean', 'std') and sums is None:
+                sums = np.bincount(codes, weights=data, minlength=groups)
+            if name == 'sum':
+                out = sums
+            elif name == 'mean':
+                with np.errstate(invalid='ignore'):
+                    out = sums / count
+            elif name == 'std':
+                squares = np.bincount(codes, weights=data * data, minlength=groups)
+                with np.errstate(invalid='ignore'):
+                    mean = sums / count
+                    out = np.sqrt(np.maximum(squares / count - mean * mean, 0.0))
+            else:
+                out = np.full(groups, np.inf if name == 'min' else -np.inf)
+                (np.minimum if name == 'min' else np.maximum).at(out, codes, data)
+            result[f'{name}_{column}'] = out[present]
+    return result
+
+
+def parse_aggregates(specs: Sequence[str]) -> Dict[str, List[str]]:
+    """'harmony:mean,min' style specs → {'harmony': ['mean', 'min']}"""
+    aggregates: Dict[str, List[str]] = {}
+    for spec in specs:
+        column, _, names = spec.partition(':')
+        aggregates.setdefault(column.strip(), []).extend(
+            name.strip() for name in (names or 'mean').split(',') if name.strip()
+        )
+    return aggregates
+
+
+# --- Loading fleets ---
+
+def _column_from_strings(values: List[str]) -> np.ndarray:
+    try:
+        return np.array(values, dtype=float)
+    except ValueError:
+        return np.array(values, dtype=object)
+
+
+def load_table(path: str, mixer: Optional[LJPWMixer] = None) -> FleetTable:
+    """
+    FleetTable from a file or directory
+
+    Args:
+        path: One of
+            - CSV with L, J, P, W columns and any others (numeric columns
+              stay numeric, the rest become categorical)
+            - .npz of equal-length arrays, including L, J, P, W
+            - `fleet --output` JSON, or a directory of system configs
+              (reusing its fleet manifest if there is one; nothing is
+              written to the directory)
+    """
+    import csv
+    import json
+    import os
+
+    if os.path.isdir(path):
+        from ljpw_fleet import FleetAnalyzer
+        fleet = FleetAnalyzer(path, manifest_path=os.path.join(path, '.ljpw-manifest.json'), read_only=True)
+        fleet.scan()
+        systems = fleet.rows()
+    elif path.endswith('.npz'):
+        with np.load(path, allow_pickle=False) as data:
+            columns = {name: data[name] for name in data.files}
+        return FleetTable.from_coordinates(*(columns.pop(d) for d in DIMENSIONS),
+                                           extra=columns, mixer=mixer)
+    elif path.endswith('.json'):
+        with open(path) as f:
+            systems = json.load(f)['systems']
+    else:
+        with open(path, newline='') as f:
+            reader = csv.reader(f)
+            header = [name.strip() for name in next(reader)]
+            missing = [d for d in DIMENSIONS if d not in header]
+            if missing:
+                raise ValueError(f"CSV header must contain {list(DIMENSIONS)}, missing {missing}")
+            raw = list(zip(*reader)) or [()] * len(header)
+        columns = {name: _column_from_strings(list(values)) for name, values in zip(header, raw)}
+        return FleetTable.from_coordinates(*(columns.pop(d) for d in DIMENSIONS),
+                                           extra=columns, mixer=mixer)
+
+    paths = sorted(systems)
+    extra = {'path': np.array(paths, dtype=object),
+             'system': np.array([systems[p]['system'] for p in paths], dtype=object)}
+    return FleetTable.from_coordinates(
+        *(np.array([systems[p][d] for p in paths], dtype=float) for d in DIMENSIONS),
+        extra=extra, mixer=mixer
+    )
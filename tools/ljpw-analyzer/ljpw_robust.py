@@ -0,0 +1,505 @@
+#!/usr/bin/env python3
+"""
+LJPW Robust - Outlier-Resistant Estimators for Coupling Coefficients
+
+A few systems with J near zero make J_eff / J explode, and those points
+dominate the OLS κ in y = 1 + κ·L. This module provides robust
+alternatives for the slope of y = a + κ·x.
+
+This module implements:
+1. Theil-Sen (median of pairwise slopes) by randomized selection in
+   O(n log n) expected time: each candidate slope t is ranked by counting
+   the pairs with slope ≤ t as inversions between two orderings of the
+   points, the search interval is narrowed with slopes sampled from it,
+   and only the last few pairs are enumerated
+2. theil_sen_reference: the O(n²) all-pairs version, kept as the
+   reference the fast path must agree with
+3. Huber M-estimation by IRLS for many domains at once: every iteration
+   solves all domains' weighted least-squares fits with grouped sums
+
+Usage:
+    from ljpw_robust import robust_slope
+
+    fit = robust_slope(L, J_eff / J, method='theil_sen', seed=42)
+    print(fit['slope'], fit['confidence_interval'])
+"""
+
+import numpy as np
+from scipy import stats
+from typing import Dict, List, Optional, Sequence
+
+ROBUST_METHODS = ('theil_sen', 'huber')
+
+# Consistency constant: MAD × 1.4826 estimates σ for normal errors
+MAD_SCALE = 1.4826
+
+
+def _robust_r_squared(residuals: np.ndarray, y: np.ndarray) -> float:
+    """Rousseeuw-Leroy R²: 1 - (median |r| / median |y - median y|)²"""
+    spread = np.median(np.abs(y - np.median(y)))
+    if spread <= 0:
+        return float('nan')
+    return float(1 - (np.median(np.abs(residuals)) / spread) ** 2)
+
+
+def _tie_pairs(values: np.ndarray) -> int:
+    _, counts = np.unique(values, return_counts=True)
+    return int(np.sum(counts * (counts - 1) // 2))
+
+
+def _inversions(seq: np.ndarray, ids: Optional[np.ndarray] = None, enumerate_all: bool = False):
+    """
+    Inversions (p < q with seq[p] > seq[q]) of a permutation of 0..n-1
+
+    MSD radix pass: at bit b, values sharing the higher bits form a group
+    (kept in position order), and every 0-bit element is inverted with the
+    1-bit elements before it in its group. Because seq is a permutation,
+    group g starts at g·2^(b+1) and holds g·2^b ones before it, so each
+    level is a stable partition from one cumulative sum: O(n log n) total.
+
+    Args:
+        seq: Permutation of 0..n-1
+        ids: Sorted inversion indices in [0, count) to return as pairs
+        enumerate_all: Return every inversion as a pair
+
+    Returns:
+        count, or (count, first, second) position arrays when pairs are requested
+    """
+    n = len(seq)
+    dtype = np.int32 if n < 2 ** 31 else np.int64
+    vals = np.asarray(seq, dtype=dtype)
+    index = np.arange(n, dtype=dtype)
+    order = index.copy()
+    total = 0
+    want_pairs = enumerate_all or ids is not None
+    firsts, seconds = [], []
+
+    for b in reversed(range(max(int(n - 1).bit_length(), 1))):
+        bit = (vals >> b) & 1
+        group_start = (vals >> (b + 1)) << (b + 1)
+        ones_before = np.cumsum(bit, dtype=dtype) - bit - (group_start >> 1)
+        zeros_in_group = np.minimum(1 << b, n - group_start)
+
+        ones_pos = group_start + zeros_in_group
+        new_pos = index - ones_before + bit * (ones_pos + 2 * ones_before - index)
+
+        # Σ ones_before over the 1-bit elements is k(k-1)/2 per group of k ones
+        size = 1 << (b + 1)
+        full, rest = divmod(n, size)
+        ones_last = max(rest - (1 << b), 0)
+        ones_pairs = full * ((1 << b) * ((1 << b) - 1) // 2) + ones_last * (ones_last - 1) // 2
+        level_total = int(ones_before.sum(dtype=np.int64)) - ones_pairs
+
+        new_vals = np.empty_like(vals)
+        new_vals[new_pos] = vals
+        if want_pairs:
+            new_order = np.empty_like(order)
+            new_order[new_pos] = order
+
+        if want_pairs and level_total:
+            # The ones inverted with element i are the first inverted[i]
+            # ones of its group, which start at group_start + zeros_in_group
+            inverted = ones_before * (1 - bit)
+            if enumerate_all:
+                element = np.repeat(index, inverted)
+                offset = np.arange(level_total) - np.repeat(np.cumsum(inverted) - inverted, inverted)
+            else:
+                local = ids[(ids >= total) & (ids < total + level_total)] - total
+                cum = np.cumsum(inverted, dtype=np.int64)
+                element = np.searchsorted(cum, local, side='right')
+                offset = local - (cum[element] - inverted[element])
+            firsts.append(new_order[ones_pos[element] + offset])
+            seconds.append(order[element])
+
+        total += level_total
+        vals = new_vals
+        if want_pairs:
+            order = new_order
+
+    if not want_pairs:
+        return total
+    empty = np.empty(0, dtype=dtype)
+    return (total, np.concatenate(firsts) if firsts else empty,
+            np.concatenate(seconds) if seconds else empty)
+
+
+class _PairwiseSlopes:
+    """
+    Order statistics of the slopes (y_j - y_i) / (x_j - x_i), x_i ≠ x_j
+
+    Points are ordered by u = y - t·x (ties: larger x first, then index).
+    Between orderings at t₁ < t₂ exactly the pairs with slope in (t₁, t₂]
+    change relative order, so counting and enumerating them is an
+    inversion problem on a permutation.
+
+    That only holds if every ordering classifies each pair the same way as
+    its slope value. A pair whose slope equals t is decided by rounding in
+    u, and equal slopes from different pairs round to different floats, so
+    orderings are only taken at t nudged off the sampled slopes (_above,
+    _below). A slope v is then the band (v - δ, v + δ], and tied slopes
+    are resolved by counting the band.
+    """
+
+    def __init__(self, x: np.ndarray, y: np.ndarray, rng: np.random.Generator,
+                 sample_size: int, enumerate_limit: int):
+        self.x, self.y, self.rng = x, y, rng
+        self.n = len(x)
+        self.n_pairs = self.n * (self.n - 1) // 2 - _tie_pairs(x)
+        self.sample_size = sample_size
+        self.enumerate_limit = enumerate_limit
+        self._by_x_desc = np.argsort(-x, kind='stable')
+        x_range = np.ptp(x) if self.n else 0.0
+        self._scale = np.ptp(y) / x_range if x_range > 0 and np.ptp(y) > 0 else 1.0
+        self._lowest = self._order(-np.inf)
+        self._highest = self._order(np.inf)
+
+    def _order(self, t: float) -> np.ndarray:
+        if t == -np.inf:
+            return np.lexsort((self.y, self.x))
+        if t == np.inf:
+            return np.lexsort((self.y, -self.x))
+        pre = self._by_x_desc
+        u = (self.y - t * self.x)[pre]
+        order = np.argsort(u)
+        ordered = u[order]
+        if np.any(ordered[1:] == ordered[:-1]):
+            order = np.argsort(u, kind='stable')  # ties keep the x-descending order
+        return pre[order]
+
+    def _ranks(self, order: np.ndarray) -> np.ndarray:
+        ranks = np.empty(self.n, dtype=np.intp)
+        ranks[order] = np.arange(self.n)
+        return ranks
+
+    def _slopes(self, first: np.ndarray, second: np.ndarray) -> np.ndarray:
+        return (self.y[second] - self.y[first]) / (self.x[second] - self.x[first])
+
+    def _delta(self, v: float) -> float:
+        # Far above rounding error in u, far below the gap between distinct slopes
+        return 1e-9 * (abs(v) + self._scale)
+
+    def _above(self, v: float) -> float:
+        return v + self._delta(v)
+
+    def _below(self, v: float) -> float:
+        return v - self._delta(v)
+
+    def _sample_all(self, size: int) -> np.ndarray:
+        i = self.rng.integers(0, self.n, size)
+        j = self.rng.integers(0, self.n, size)
+        dx = self.x[j] - self.x[i]
+        valid = dx != 0
+        return (self.y[j] - self.y[i])[valid] / dx[valid]
+
+    def select(self, rank_groups: Sequence[Sequence[int]]) -> List[np.ndarray]:
+        """
+        Values at groups of 0-based ranks of the sorted slopes
+
+        A group is one rank or a few adjacent ones (the two middle ranks of
+        a median). Groups whose sample windows overlap share the search
+        interval, the sampled slopes and the candidate counts.
+        """
+        results = [None] * len(rank_groups)
+        targets = [(g, int(min(r)), int(max(r))) for g, r in enumerate(rank_groups)]
+
+        # Work items: targets, interval (lo, hi], ordering at lo, ranks at hi,
+        # slopes ≤ lo, slopes in (lo, hi], and whether to enumerate regardless
+        work = [(targets, -np.inf, np.inf, self._lowest, self._ranks(self._highest),
+                 0, self.n_pairs, False)]
+        while work:
+            targets, lo, hi, lo_order, hi_ranks, below, inside, force = work.pop()
+
+            if force or inside <= self.enumerate_limit:
+                _, first, second = _inversions(hi_ranks[lo_order], enumerate_all=True)
+                slopes = self._slopes(lo_order[first], lo_order[second])
+                local = {g: np.asarray(rank_groups[g]) - below for g, _, _ in targets}
+                slopes = np.partition(slopes, np.unique(np.concatenate(list(local.values()))))
+                for g, positions in local.items():
+                    results[g] = slopes[positions]
+                continue
+
+            if np.isinf(lo) and np.isinf(hi):
+                sample = np.sort(self._sample_all(self.sample_size))
+            else:
+                ids = np.sort(self.rng.integers(0, inside, self.sample_size))
+                _, first, second = _inversions(hi_ranks[lo_order], ids=ids)
+                sample = np.sort(self._slopes(lo_order[first], lo_order[second]))
+            m = len(sample)
+
+            # Sample window of each target, widened by 3 binomial SDs; merge overlaps
+            margin = 1.5 * np.sqrt(m) + 1
+            windows, tied = [], {}
+            for g, r_min, r_max in sorted(targets, key=lambda target: target[1]):
+                a = int(np.floor((r_min - below) / inside * m - margin))
+                b = int(np.ceil((r_max + 1 - below) / inside * m + margin))
+                center = sample[min(max((a + b) // 2, 0), m - 1)]
+                if np.count_nonzero(np.abs(sample - center) <= self._delta(center)) > 1:
+                    tied[g] = center
+                if windows and a <= windows[-1][1]:
+                    windows[-1][1] = max(windows[-1][1], b)
+                    windows[-1][2].append((g, r_min, r_max))
+                else:
+                    windows.append([a, b, [(g, r_min, r_max)]])
+
+            # (bound, slopes in (lo, bound], ranks of the ordering at bound)
+            bounds = {lo: (0, None), hi: (inside, hi_ranks)}
+            values = {self._above(sample[k]) for a, b, _ in windows for k in (a, b) if 0 <= k < m}
+            for v in tied.values():
+                values |= {self._below(v), self._above(v)}
+            for t in values:
+                if lo < t < hi:
+                    ranks_t = self._ranks(self._order(t))
+                    bounds[t] = (_inversions(ranks_t[lo_order]), ranks_t)
+
+            for _, _, members in windows:
+                # Heavily tied slopes: a target may fall in the band of one value
+                remaining = []
+                for g, r_min, r_max in members:
+                    v = tied.get(g)
+                    band = (bounds.get(self._below(v)), bounds.get(self._above(v))) if v is not None else (None,)
+                    if None not in band and band[0][0] <= r_min - below and r_max - below < band[1][0]:
+                        results[g] = np.full(len(rank_groups[g]), v)
+                    else:
+                        remaining.append((g, r_min, r_max))
+                if not remaining:
+                    continue
+
+                w_min = min(r_min for _, r_min, _ in remaining) - below
+                w_max = max(r_max for _, _, r_max in remaining) - below
+                new_lo = max((t for t in bounds if bounds[t][0] <= w_min), key=lambda t: bounds[t][0])
+                new_hi = min((t for t in bounds if bounds[t][0] > w_max), key=lambda t: bounds[t][0])
+                lo_count, lo_ranks = bounds[new_lo]
+                hi_count, new_hi_ranks = bounds[new_hi]
+
+                if new_lo == lo:
+                    new_lo_order = lo_order
+                else:
+                    new_lo_order = np.empty_like(lo_ranks)
+                    new_lo_order[lo_ranks] = np.arange(self.n)
+                # No progress is only possible with tied slopes: enumerate
+                work.append((remaining, new_lo, new_hi, new_lo_order, new_hi_ranks,
+                             below + lo_count, hi_count - lo_count, hi_count - lo_count == inside))
+
+        return results
+
+
+def theil_sen_reference(x: np.ndarray, y: np.ndarray) -> Dict[str, float]:
+    """
+    Theil-Sen slope and intercept from all n(n-1)/2 pairwise slopes
+
+    O(n²) time and memory; the reference for theil_sen (use for small n).
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    i, j = np.triu_indices(len(x), k=1)
+    dx = x[j] - x[i]
+    valid = dx != 0
+    slope = float(np.median((y[j] - y[i])[valid] / dx[valid]))
+    return {'slope': slope, 'intercept': float(np.median(y - slope * x))}
+
+
+def theil_sen(
+    x: np.ndarray,
+    y: np.ndarray,
+    confidence: float = 0.95,
+    seed: Optional[int] = None,
+    sample_size: int = 100000,
+    enumerate_limit: Optional[int] = None
+) -> Dict:
+    """
+    Theil-Sen slope with Sen's rank-based confidence interval
+
+    Exact (the median of all pairwise slopes, as theil_sen_reference, up
+    to float rounding among slopes that are mathematically equal), in
+    O(n log n) expected time; the random seed only affects running time.
+
+    Args:
+        x, y: Observations, shape (n,)
+        confidence: Two-sided level of the slope interval
+        seed: Seed or np.random.Generator for the selection sampling
+        sample_size: Slopes sampled per narrowing round
+        enumerate_limit: Pairs enumerated directly once the search interval
+            holds this few (default: max(2¹⁶, 16n))
+
+    Returns:
+        Dict with slope, intercept (median of y - slope·x), confidence_interval,
+        std_error (interval half-width / z), p_value (Kendall's τ test),
+        r_squared (robust, see _robust_r_squared) and n
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    limit = enumerate_limit if enumerate_limit is not None else max(2 ** 16, 16 * n)
+    pairs = _PairwiseSlopes(x, y, np.random.default_rng(seed), sample_size, limit)
+    n_pairs = pairs.n_pairs
+    if n_pairs == 0:
+        raise ValueError("Theil-Sen needs at least two distinct x values")
+
+    middle = [(n_pairs - 1) // 2, n_pairs // 2]
+
+    # Sen's interval: order statistics around the median from Var(Kendall S)
+    def tie_term(values):
+        _, counts = np.unique(values, return_counts=True)
+        return np.sum(counts * (counts - 1) * (2 * counts + 5))
+
+    sigma = np.sqrt((n * (n - 1) * (2 * n + 5) - tie_term(x) - tie_term(y)) / 18)
+    z = stats.norm.ppf(0.5 + confidence / 2)
+    upper = min(int(round((n_pairs + z * sigma) / 2)), n_pairs - 1)
+    lower = max(int(round((n_pairs - z * sigma) / 2)) - 1, 0)
+    median, low, high = pairs.select([middle, [lower], [upper]])
+    slope = float(np.mean(median))
+    ci = (float(low[0]), float(high[0]))
+
+    residuals = y - slope * x
+    intercept = float(np.median(residuals))
+
+    return {
+        'slope': slope,
+        'intercept': intercept,
+        'confidence_interval': ci,
+        'std_error': (ci[1] - ci[0]) / (2 * z),
+        'p_value': float(stats.kendalltau(x, y).pvalue),
+        'r_squared': _robust_r_squared(residuals - intercept, y),
+        'n': n
+    }
+
+
+def huber_regression(
+    x: np.ndarray,
+    y: np.ndarray,
+    groups: Optional[np.ndarray] = None,
+    c: float = 1.345,
+    max_iter: int = 50,
+    tol: float = 1e-8
+) -> Dict:
+    """
+    Huber M-estimates of y = a + b·x for every group at once (IRLS)
+
+    Each iteration rescales residuals by the per-group MAD, downweights
+    |r / s| > c by c / |r / s| and solves all groups' weighted fits from
+    grouped sums. Standard errors are Huber's sandwich (statsmodels RLM 'H1').
+
+    Args:
+        x, y: Observations, shape (n,)
+        groups: Group label per observation (default: one group)
+        c: Huber tuning constant (1.345 gives 95% efficiency under normality)
+        max_iter: IRLS iteration limit
+        tol: Convergence tolerance on the relative change in coefficients
+
+    Returns:
+        Dict with 'groups' and arrays (one entry per group) 'slope',
+        'intercept', 'std_error', 'p_value', 'confidence_interval' (95%,
+        shape (G, 2)), 'r_squared' (robust), 'scale', 'n', plus 'iterations'
+        and 'converged'
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if groups is None:
+        names, codes = np.array([0]), np.zeros(len(x), dtype=np.intp)
+    else:
+        names, codes = np.unique(np.asarray(groups), return_inverse=True)
+    G = len(names)
+
+    # Contiguous per-group slices: grouped sums and MAD medians
+    perm = np.argsort(codes, kind='stable')
+    x, y, codes = x[perm], y[perm], codes[perm]
+    n = np.bincount(codes, minlength=G).astype(float)
+    cuts = np.cumsum(n.astype(int))[:-1]
+    starts = np.concatenate([[0], cuts])
+
+    def group_sum(values):
+        return np.add.reduceat(values, starts)
+
+    def weighted_fit(w):
+        sw = group_sum(w)
+        mx = group_sum(w * x) / sw
+        my = group_sum(w * y) / sw
+        dx = x - mx[codes]
+        slope = group_sum(w * dx * (y - my[codes])) / group_sum(w * dx * dx)
+        return slope, my - slope * mx
+
+    def grouped_median(values):
+        return np.array([np.median(part) for part in np.split(values, cuts)])
+
+    slope, intercept = weighted_fit(np.ones_like(x))
+    converged = False
+    for iteration in range(1, max_iter + 1):
+        residuals = y - intercept[codes] - slope[codes] * x
+        scale = np.maximum(MAD_SCALE * grouped_median(np.abs(residuals)), 1e-300)
+        u = residuals / scale[codes]
+        weights = np.minimum(1.0, c / np.maximum(np.abs(u), 1e-300))
+
+        new_slope, new_intercept = weighted_fit(weights)
+        change = np.maximum(np.abs(new_slope - slope) / (1 + np.abs(slope)),
+                            np.abs(new_intercept - intercept) / (1 + np.abs(intercept)))
+        slope, intercept = new_slope, new_intercept
+        if np.all(change < tol):
+            converged = True
+            break
+
+    residuals = y - intercept[codes] - slope[codes] * x
+    u = residuals / scale[codes]
+    psi = np.clip(u, -c, c)
+    dpsi = (np.abs(u) <= c).astype(float)
+
+    # H1 sandwich: k² · mean-square ψ (n - p df) / (mean ψ')² · s² · (XᵀX)⁻¹
+    p = 2
+    mean_dpsi = group_sum(dpsi) / n
+    var_dpsi = group_sum(dpsi * dpsi) / n - mean_dpsi ** 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        k = 1 + p / n * var_dpsi / mean_dpsi ** 2
+        factor = (k ** 2 * group_sum(psi * psi) / np.maximum(n - p, 1)
+                  / mean_dpsi ** 2 * scale ** 2)
+        mean_x = group_sum(x) / n
+        sxx = group_sum((x - mean_x[codes]) ** 2)
+        std_error = np.sqrt(factor / sxx)
+        p_value = 2 * stats.norm.sf(np.abs(slope / std_error))
+
+    spread = grouped_median(np.abs(y - grouped_median(y)[codes]))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        r_squared = 1 - (grouped_median(np.abs(residuals)) / spread) ** 2
+    z = stats.norm.ppf(0.975)
+
+    return {
+        'groups': names,
+        'slope': slope,
+        'intercept': intercept,
+        'std_error': std_error,
+        'p_value': p_value,
+        'confidence_interval': np.column_stack([slope - z * std_error, slope + z * std_error]),
+        'r_squared': r_squared,
+        'scale': scale,
+        'n': n.astype(int),
+        'iterations': iteration,
+        'converged': converged
+    }
+
+
+def robust_slope(x: np.ndarray, y: np.ndarray, method: str = 'theil_sen',
+                 seed: Optional[int] = None) -> Dict:
+    """
+    One robust fit of y = a + κ·x with a common result layout
+
+    Args:
+        x, y: Observations, shape (n,)
+        method: 'theil_sen' or 'huber'
+        seed: Seed for the Theil-Sen selection sampling
+
+    Returns:
+        Dict with slope, intercept, std_error, p_value, r_squared,
+        confidence_interval (95%) and n
+    """
+    if method == 'theil_sen':
+        return theil_sen(x, y, seed=seed)
+    if method == 'huber':
+        fit = huber_regression(x, y)
+        return {
+            'slope': float(fit['slope'][0]),
+            'intercept': float(fit['intercept'][0]),
+            'std_error': float(fit['std_error'][0]),
+            'p_value': float(fit['p_value'][0]),
+            'r_squared': float(fit['r_squared'][0]),
+            'confidence_interval': tuple(float(v) for v in fit['confidence_interval'][0]),
+            'n': int(fit['n'][0])
+        }
+    raise ValueError(f"Unknown robust method: {method} (choose from {ROBUST_METHODS})")
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+LJPW Roll-up - Team → Department → Organization Aggregation
+
+Rolls leaf (team) coordinates and mixing scores up an org hierarchy, for
+department and company views of the collective behavior discussed in
+research/multi-agent-dynamics.md.
+
+This module:
+1. Stores the hierarchy as a parent-index array (OrgTree): parent[i] is
+   the index of node i's parent, -1 for a root. Only leaves carry
+   measurements; every other node is the aggregate of its subtree
+2. Aggregates each of L, J, P, W and the five mixing scores three ways:
+   - 'mean': weighted mean (weights such as headcount)
+   - 'min': weakest link, the lowest value anywhere in the subtree
+   - 'harmonic': weighted harmonic mean (pulled down by weak teams,
+     without being decided by one of them)
+3. Keeps per-node sufficient statistics (weighted sums, weighted inverse
+   sums, subtree minima), so a leaf update touches only its ancestor
+   path: sums move by the leaf's delta, minima are recomputed from
+   children until one stops changing
+
+Usage:
+    from ljpw_rollup import OrgTree, HierarchyRollup
+
+    tree = OrgTree(parent, names)             # parent: -1 for the company
+    rollup = HierarchyRollup(tree, coords, weights=headcount)  # coords: (N, 4)
+    rollup.update(team, (0.6, 0.7, 0.5, 0.8))  # recomputes team's ancestors only
+    departments = rollup.level(1, method='mean')
+    company = rollup.node(0, method='harmonic')
+"""
+
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from ljpw_mixing import LJPWMixer
+
+DIMENSIONS = ('L', 'J', 'P', 'W')
+
+SCORES = ('robustness', 'effectiveness', 'growth_potential', 'harmony', 'composite')
+
+COLUMNS = DIMENSIONS + SCORES
+
+METHODS = ('mean', 'min', 'harmonic')
+
+
+class OrgTree:
+    """
+    Rooted forest as a parent-index array, with children in CSR form
+
+    Attributes:
+        parent: int64 array, -1 for roots
+        depth: Distance from the node's root (roots are 0)
+        is_leaf: True for nodes without children
+    """
+
+    def __init__(self, parent: Sequence[int], names: Optional[Sequence[str]] = None):
+        """
+        Args:
+            parent: Parent index per node (-1: root)
+            names: Optional node names (looked up by node())
+        """
+        self.parent = np.asarray(parent, dtype=np.int64).ravel()
+        n = len(self.parent)
+        if n and (self.parent.min() < -1 or self.parent.max() >= n):
+            raise ValueError("Parent indices must be -1 or a node index")
+        self.names = list(names) if names is not None else None
+        if self.names is not None and len(self.names) != n:
+            raise ValueError(f"Got {len(self.names)} names for {n} nodes")
+        self._index = {name: k for k, name in enumerate(self.names)} if self.names else {}
+
+        # Children of node k are child_order[child_start[k]:child_start[k + 1]]
+        has_parent = self.parent >= 0
+        self.child_order = np.flatnonzero(has_parent)[np.argsort(self.parent[has_parent], kind='stable')]
+        self.child_start = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.parent[has_parent], minlength=n), out=self.child_start[1:])
+        self.is_leaf = np.diff(self.child_start) == 0
+
+        # Depths breadth-first from the roots; a node never reached is on a cycle
+        self.depth = np.full(n, -1, dtype=np.int64)
+        frontier = np.flatnonzero(~has_parent)
+        level = 0
+        while len(frontier):
+            self.depth[frontier] = level
+            counts = self.child_start[frontier + 1] - self.child_start[frontier]
+            frontier = self.child_order[np.repeat(self.child_start[frontier], counts)
+                                        + _ranges(counts)]
+            level += 1
+        if (self.depth < 0).any():
+            raise ValueError(f"Parent array has a cycle through node {int(np.argmax(self.depth < 0))}")
+        self._parent_list: List[int] = self.parent.tolist()
+
+    def __len__(self) -> int:
+        return len(self.parent)
+
+    def index(self, node: Union[int, str]) -> int:
+        """Node index from an index or a name"""
+        if isinstance(node, str):
+            if node not in self._index:
+                raise KeyError(f"Unknown node: {node}")
+            return self._index[node]
+        return int(node)
+
+    def children(self, node: int) -> np.ndarray:
+        return self.child_order[self.child_start[node]:self.child_start[node + 1]]
+
+    def ancestors(self, node: int) -> List[int]:
+        """Parent, grandparent, ... up to the root"""
+        path = []
+        node = self._parent_list[node]
+        while node >= 0:
+            path.append(node)
+            node = self._parent_list[node]
+        return path
+
+    def levels(self) -> List[np.ndarray]:
+        """Nodes grouped by depth, roots first"""
+        order = np.argsort(self.depth, kind='stable')
+        bounds = np.searchsorted(self.depth[order], np.arange(self.depth.max() + 2 if len(order) else 1))
+        return [order[bounds[d]:bounds[d + 1]] for d in range(len(bounds) - 1)]
+
+
+def _ranges(counts: np.ndarray) -> np.ndarray:
+    """Concatenation of arange(c) for each c in counts"""
+    total = int(counts.sum())
+    if total == 0:
+        return np.zeros(0, dtype=np.int64)
+    starts = np.cumsum(counts) - counts
+    return np.arange(total) - np.repeat(starts, counts)
+
+
+class HierarchyRollup:
+    """
+    Incrementally maintained roll-up of leaf values over an OrgTree
+
+    Per node and column it keeps Σw·x, Σw/x (x > 0), the weight of zero
+    values, Σw and the subtree minimum; the three aggregates are read off
+    these. Sums updated incrementally can drift by float rounding over
+    very many updates; rebuild() recomputes them exactly.
+    """
+
+    def __init__(self, tree: OrgTree, coords: np.ndarray, weights: Optional[Sequence[float]] = None,
+                 mixer: Optional[LJPWMixer] = None):
+        """
+        Args:
+            tree: Hierarchy
+            coords: (N, 4) L, J, P, W per node; rows of non-leaf nodes are ignored
+            weights: Per-node weight, e.g. headcount (default 1; non-leaf rows ignored)
+            mixer: Mixer for the leaf scores
+        """
+        self.tree = tree
+        self.mixer = mixer or LJPWMixer()
+        n = len(tree)
+        coords = np.asarray(coords, dtype=float).reshape(n, 4)
+        leaves = tree.is_leaf
+
+        self.values = np.zeros((n, len(COLUMNS)))  # leaf rows only
+        scores = self.mixer.mix_arrays(*coords[leaves].T)
+        self.values[leaves] = np.column_stack([coords[leaves]] + [scores[k] for k in SCORES])
+        self.weights = np.where(leaves, 1.0 if weights is None else np.asarray(weights, dtype=float), 0.0)
+        if (self.weights < 0).any():
+            raise ValueError("Weights must be non-negative")
+        self.rebuild()
+
+    def _leaf_stats(self, values: np.ndarray, weights: np.ndarray):
+        """Σw·x, Σw/x, zero weight and Σw contributions of leaf rows"""
+        w = weights[..., None]
+        positive = values > 0
+        with np.errstate(divide='ignore'):
+            inverse = np.where(positive, w / np.where(positive, values, 1.0), 0.0)
+        return w * values, inverse, np.where(positive, 0.0, w), weights
+
+    def rebuild(self) -> None:
+        """Recompute every node's statistics from the leaves, deepest level first"""
+        tree = self.tree
+        leaves = tree.is_leaf
+        n, c = self.values.shape
+        self.sum_wx = np.zeros((n, c))
+        self.sum_w_inv = np.zeros((n, c))
+        self.zero_w = np.zeros((n, c))
+        self.sum_w = np.zeros(n)
+        self.minimum = np.full((n, c), np.inf)
+
+        stats = self._leaf_stats(self.values[leaves], self.weights[leaves])
+        for array, leaf_values in zip((self.sum_wx, self.sum_w_inv, self.zero_w, self.sum_w), stats):
+            array[leaves] = leaf_values
+        self.minimum[leaves] = self.values[leaves]
+
+        for nodes in reversed(tree.levels()[1:]):
+            parents = tree.parent[nodes]
+            for array in (self.sum_wx, self.sum_w_inv, self.zero_w, self.sum_w):
+                np.add.at(array, parents, array[nodes])
+            np.minimum.at(self.minimum, parents, self.minimum[nodes])
+
+    def update(self, node: Union[int, str], coords: Optional[Sequence[float]] = None,
+               weight: Optional[float] = None) -> None:
+        """
+        Change one leaf's coordinates and/or weight
+
+        Only the leaf and its ancestors are touched: the sums move by the
+        leaf's delta, and each ancestor's minimum is recomputed from its
+        children until one comes out unchanged.
+        """
+        tree = self.tree
+        node = tree.index(node)
+        if not tree.is_leaf[node]:
+            raise ValueError(f"Node {node} has children; only leaves carry values")
+
+        old_values = self.values[node].copy()
+        old_weight = self.weights[node]
+        if coords is not None:
+            L, J, P, W = (float(v) for v in coords)
+            scores = self.mixer.mix(L, J, P, W)
+            self.values[node] = (L, J, P, W) + tuple(scores[k] for k in SCORES)
+        if weight is not None:
+            if weight < 0:
+                raise ValueError("Weights must be non-negative")
+            self.weights[node] = weight
+
+        path = [node] + tree.ancestors(node)
+        new = self._leaf_stats(self.values[node], self.weights[node])
+        old = self._leaf_stats(old_values, old_weight)
+        for array, after, before in zip((self.sum_wx, self.sum_w_inv, self.zero_w, self.sum_w), new, old):
+            array[path] += after - before
+
+        self.minimum[node] = self.values[node]
+        for ancestor in path[1:]:
+            children = tree.children(ancestor)
+            minimum = self.minimum[children].min(axis=0)
+            if np.array_equal(minimum, self.minimum[ancestor]):
+                break
+            self.minimum[ancestor] = minimum
+
+    def rollup(self, method: str = 'mean', nodes: Optional[Sequence[int]] = None) -> np.ndarray:
+        """
+        Aggregated values
+
+        Args:
+            method: 'mean', 'min' or 'harmonic'
+            nodes: Node indices (default: all)
+
+        Returns:
+            (len(nodes), 9) array with columns COLUMNS; NaN where a node's
+            subtree has no weight (mean, harmonic)
+        """
+        index = slice(None) if nodes is None else np.asarray(nodes, dtype=np.int64)
+        if method == 'min':
+            return self.minimum[index].copy()
+        total = self.sum_w[index][:, None]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if method == 'mean':
+                result = self.sum_wx[index] / total
+            elif method == 'harmonic':
+                # Any zero-valued leaf with weight makes the harmonic mean 0
+                result = np.where(self.zero_w[index] > 0, 0.0, total / self.sum_w_inv[index])
+            else:
+                raise ValueError(f"Unknown method: {method} (choose from {METHODS})")
+        return np.where(total > 0, result, np.nan)
+
+    def node(self, node: Union[int, str], method: str = 'mean') -> Dict:
+        """
+        One node's roll-up
+
+        Returns:
+            Dict with 'node', 'name', 'weight', each column of COLUMNS,
+            and 'bottleneck' (lowest rolled-up dimension)
+        """
+        k = self.tree.index(node)
+        row = self.rollup(method, [k])[0]
+        result = {
+            'node': k,
+            'name': self.tree.names[k] if self.tree.names else None,
+            'weight': float(self.sum_w[k]),
+            **dict(zip(COLUMNS, row.tolist()))
+        }
+        coords = row[:len(DIMENSIONS)]
+        result['bottleneck'] = DIMENSIONS[int(np.argmin(coords))] if not np.isnan(coords).all() else None
+        return result
+
+    def level(self, depth: int, method: str = 'mean') -> Dict[str, np.ndarray]:
+        """
+        Roll-ups of every node at one depth (0: company, 1: departments, ...)
+
+        Returns:
+            Dict with 'node', 'name' (if the tree has names), 'weight' and
+            each column of COLUMNS as arrays
+        """
+        nodes = np.flatnonzero(self.tree.depth == depth)
+        rows = self.rollup(method, nodes)
+        result = {'node': nodes}
+        if self.tree.names:
+            result['name'] = np.array([self.tree.names[k] for k in nodes.tolist()], dtype=object)
+        result['weight'] = self.sum_w[nodes]
+        result.update({name: rows[:, k] for k, name in enumerate(COLUMNS)})
+        return result
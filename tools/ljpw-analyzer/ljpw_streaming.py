@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+LJPW Streaming - Mergeable Sufficient Statistics for Coupling Regressions
+
+Keeps coupling fits current as data arrives in shards (per region, per
+upload, per thread) without rescanning history. Every accumulator:
+1. Folds in a whole batch of observations at once (vectorized)
+2. Merges exactly with another accumulator built from a different shard
+3. Reports fitted coefficients, SE, CI and R² in O(1) at any time
+4. Round-trips through to_dict / from_dict for storing shard state as JSON
+
+Accumulators:
+- SlopeAccumulator: simple regression y = a + κ·x (e.g. J_eff / J = 1 + κ·L),
+  kept as Welford/Chan centered moments for numerical stability
+- CouplingMatrixAccumulator: the joint 4×4 coupling model of ljpw_coupling,
+  kept as per-target cross-products plus the fourth-order moments needed
+  for exact heteroscedasticity-robust (HC1) standard errors
+"""
+
+import numpy as np
+from scipy import stats
+from typing import Dict, Optional
+
+from ljpw_coupling import (
+    CouplingMatrixEstimate, _build_estimate, _design, _prior_coefficients
+)
+
+
+class SlopeAccumulator:
+    """Streaming OLS of y on x with intercept, from centered bivariate moments"""
+
+    def __init__(self):
+        self.n = 0
+        self.mean_x = 0.0
+        self.mean_y = 0.0
+        self.sxx = 0.0  # Σ(x - x̄)²
+        self.syy = 0.0  # Σ(y - ȳ)²
+        self.sxy = 0.0  # Σ(x - x̄)(y - ȳ)
+
+    def update(self, x: np.ndarray, y: np.ndarray) -> None:
+        """Fold a batch of (x, y) observations into the running moments"""
+        x = np.asarray(x, dtype=float).ravel()
+        y = np.asarray(y, dtype=float).ravel()
+        if x.size == 0:
+            return
+
+        mx, my = float(x.mean()), float(y.mean())
+        dx, dy = x - mx, y - my
+        self._combine(x.size, mx, my, float(dx @ dx), float(dy @ dy), float(dx @ dy))
+
+    def merge(self, other: 'SlopeAccumulator') -> None:
+        """Merge another shard's accumulator into this one (exact)"""
+        if other.n:
+            self._combine(other.n, other.mean_x, other.mean_y, other.sxx, other.syy, other.sxy)
+
+    def _combine(self, n_b, mean_x_b, mean_y_b, sxx_b, syy_b, sxy_b) -> None:
+        n_a = self.n
+        n = n_a + n_b
+        dx = mean_x_b - self.mean_x
+        dy = mean_y_b - self.mean_y
+        w = n_a * n_b / n
+
+        self.mean_x += dx * n_b / n
+        self.mean_y += dy * n_b / n
+        self.sxx += sxx_b + dx * dx * w
+        self.syy += syy_b + dy * dy * w
+        self.sxy += sxy_b + dx * dy * w
+        self.n = n
+
+    @property
+    def slope(self) -> float:
+        return self.sxy / self.sxx if self.sxx > 0 else float('nan')
+
+    @property
+    def intercept(self) -> float:
+        return self.mean_y - self.slope * self.mean_x
+
+    @property
+    def r_squared(self) -> float:
+        if self.sxx <= 0 or self.syy <= 0:
+            return float('nan')
+        return self.sxy ** 2 / (self.sxx * self.syy)
+
+    @property
+    def std_error(self) -> float:
+        """Standard error of the slope (n - 2 residual df)"""
+        if self.n <= 2 or self.sxx <= 0:
+            return float('nan')
+        ssr = max(self.syy - self.sxy ** 2 / self.sxx, 0.0)
+        return float(np.sqrt(ssr / (self.n - 2) / self.sxx))
+
+    @property
+    def p_value(self) -> float:
+        """Two-sided t-test of slope = 0, as in scipy.stats.linregress"""
+        se = self.std_error
+        if not np.isfinite(se):
+            return float('nan')
+        if se == 0:
+            return 0.0
+        return float(2 * stats.t.sf(abs(self.slope / se), self.n - 2))
+
+    def confidence_interval(self, confidence: float = 0.95) -> tuple:
+        t_val = stats.t.ppf(0.5 + confidence / 2, self.n - 2)
+        return (self.slope - t_val * self.std_error, self.slope + t_val * self.std_error)
+
+    def fit(self, confidence: float = 0.95) -> Dict:
+        """Current fit: slope, intercept, std_error, p_value, r_squared, CI, n"""
+        return {
+            'slope': self.slope,
+            'intercept': self.intercept,
+            'std_error': self.std_error,
+            'p_value': self.p_value,
+            'r_squared': self.r_squared,
+            'confidence_interval': self.confidence_interval(confidence),
+            'n': self.n
+        }
+
+    def to_dict(self) -> Dict[str, float]:
+        return {k: getattr(self, k) for k in ('n', 'mean_x', 'mean_y', 'sxx', 'syy', 'sxy')}
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, float]) -> 'SlopeAccumulator':
+        acc = cls()
+        for key, value in state.items():
+            setattr(acc, key, value)
+        acc.n = int(acc.n)
+        return acc
+
+
+class CouplingMatrixAccumulator:
+    """
+    Streaming sufficient statistics for estimate_coupling_matrix
+
+    Per target equation (4 targets, 3 regressors each) keeps n, Σy, Σy²,
+    XᵀX and Xᵀy, plus Σxxᵀy², Σxxᵀx·y and Σxxᵀxxᵀ so that the robust
+    sandwich Σ xxᵀ(y - xᵀβ)² can be expanded for any β without the rows.
+    Cluster-robust errors need per-system residuals and are only available
+    from the batch estimator.
+    """
+
+    ARRAYS = ('n', 'y_sum', 'y_sumsq', 'xtx', 'xty', 'm_yy', 'm_y', 'm_xx')
+
+    def __init__(self):
+        self.n = np.zeros(4)
+        self.y_sum = np.zeros(4)
+        self.y_sumsq = np.zeros(4)
+        self.xtx = np.zeros((4, 3, 3))
+        self.xty = np.zeros((4, 3))
+        self.m_yy = np.zeros((4, 3, 3))        # Σ x_i x_j y²
+        self.m_y = np.zeros((4, 3, 3, 3))      # Σ x_i x_j x_k y
+        self.m_xx = np.zeros((4, 3, 3, 3, 3))  # Σ x_i x_j x_k x_l
+
+    def update(self, coords: np.ndarray, effective: np.ndarray) -> None:
+        """Fold a batch of (N, 4) coordinates and effective outcomes (NaN = missing)"""
+        coords = np.asarray(coords, dtype=float)
+        effective = np.asarray(effective, dtype=float)
+        observed = np.isfinite(effective) & np.all(np.isfinite(coords), axis=1, keepdims=True)
+        weight = observed.T.astype(float)
+        X = _design(np.nan_to_num(coords)) * weight[:, :, None]
+        y = np.where(observed, effective - coords, 0.0).T
+
+        xx = np.einsum('tni,tnj->tnij', X, X)
+        self.n += weight.sum(axis=1)
+        self.y_sum += y.sum(axis=1)
+        self.y_sumsq += np.sum(y * y, axis=1)
+        self.xtx += xx.sum(axis=1)
+        self.xty += np.einsum('tni,tn->ti', X, y)
+        self.m_yy += np.einsum('tnij,tn->tij', xx, y * y)
+        self.m_y += np.einsum('tnij,tnk,tn->tijk', xx, X, y)
+        self.m_xx += np.einsum('tnij,tnkl->tijkl', xx, xx)
+
+    def merge(self, other: 'CouplingMatrixAccumulator') -> None:
+        """Merge another shard's accumulator into this one (exact)"""
+        for name in self.ARRAYS:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+
+    def fit(
+        self,
+        ridge: float = 0.0,
+        prior: Optional[Dict[str, float]] = None,
+        se_type: str = 'robust'
+    ) -> CouplingMatrixEstimate:
+        """
+        Current joint estimate, identical to estimate_coupling_matrix on all rows
+
+        Args:
+            ridge: Penalty λ on ||κ - κ_prior||² per target equation
+            prior: Coupling matrix to shrink toward (default: LJPWAnalyzer's)
+            se_type: 'classical' or 'robust' (HC1)
+        """
+        if se_type not in ('classical', 'robust'):
+            raise ValueError("Streaming fits support se_type 'classical' or 'robust'")
+
+        A = self.xtx + ridge * np.eye(3)
+        beta = np.linalg.solve(A, (self.xty + ridge * _prior_coefficients(prior))[..., None])[..., 0]
+        A_inv = np.linalg.inv(A)
+
+        # Σ(y - xᵀβ)² = Σy² - 2βᵀXᵀy + βᵀXᵀXβ
+        ssr = (self.y_sumsq - 2 * np.einsum('ti,ti->t', beta, self.xty)
+               + np.einsum('ti,tij,tj->t', beta, self.xtx, beta))
+        ssr = np.maximum(ssr, 0.0)
+        df_resid = np.maximum(self.n - 3, 1)
+
+        if se_type == 'classical':
+            cov = (ssr / df_resid)[:, None, None] * A_inv @ self.xtx @ A_inv
+        else:
+            meat = (self.m_yy
+                    - 2 * np.einsum('tijk,tk->tij', self.m_y, beta)
+                    + np.einsum('tijkl,tk,tl->tij', self.m_xx, beta, beta))
+            cov = (self.n / df_resid)[:, None, None] * A_inv @ meat @ A_inv
+
+        se = np.sqrt(np.maximum(np.diagonal(cov, axis1=1, axis2=2), 0.0))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            tss = self.y_sumsq - self.y_sum ** 2 / self.n
+            r_squared = 1 - ssr / tss
+
+        return _build_estimate(beta, se, self.n, r_squared, se_type, ridge)
+
+    def to_dict(self) -> Dict[str, list]:
+        return {name: getattr(self, name).tolist() for name in self.ARRAYS}
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, list]) -> 'CouplingMatrixAccumulator':
+        acc = cls()
+        for name in cls.ARRAYS:
+            setattr(acc, name, np.asarray(state[name], dtype=float))
+        return acc
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+LJPW Survey - Team Scores from Raw Likert Responses
+
+RawMetrics expects team-level 1-7 scores for psych_safety_score and
+knowledge_retention_score. This module builds them from item-level
+responses (one row per team, respondent, item, response).
+
+This module:
+1. Streams responses in chunks (arrays or a long-format CSV), so the full
+   response table never has to be in memory
+2. Reverse-codes and weights items per SurveyScale
+3. Scores each respondent as the weighted mean of the items they answered,
+   then each team as the mean over its respondents, with np.bincount over
+   integer team/respondent codes (no Python loop over rows)
+4. Emits team scores, standard errors (SD / √n respondents) and response
+   counts as columns for SoftwareTeamCalibrator.calibrate_arrays, and
+   Uncertainty specs for ljpw_uncertainty.propagate_uncertainty
+
+Usage:
+    from ljpw_survey import SurveyAggregator
+
+    aggregator = SurveyAggregator()
+    for chunk in read_responses_csv('responses.csv'):
+        aggregator.update(**chunk)
+    scores = aggregator.result()
+    fields = scores.fields(teams)      # {'psych_safety_score': array, ...}
+"""
+
+import csv
+import numpy as np
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Sequence
+
+from ljpw_calibrator import align_teams
+from ljpw_uncertainty import Uncertainty
+
+
+@dataclass
+class SurveyScale:
+    """Likert scale feeding one RawMetrics field"""
+    items: Dict[str, float]  # item id → weight
+    reverse: Sequence[str] = field(default_factory=tuple)  # reverse-coded item ids
+    scale_min: float = 1.0
+    scale_max: float = 7.0
+    min_item_share: float = 0.5  # share of total item weight a respondent must answer
+
+
+# Edmondson (1999) team psychological safety: items 1, 3 and 5 are negatively worded
+PSYCH_SAFETY_SCALE = SurveyScale(
+    items={f'ps{i}': 1.0 for i in range(1, 8)},
+    reverse=('ps1', 'ps3', 'ps5')
+)
+
+# Knowledge retention: "I can find who knows X", "knowledge survives turnover", ...
+KNOWLEDGE_RETENTION_SCALE = SurveyScale(
+    items={f'kr{i}': 1.0 for i in range(1, 5)}
+)
+
+DEFAULT_SCALES = {
+    'psych_safety_score': PSYCH_SAFETY_SCALE,
+    'knowledge_retention_score': KNOWLEDGE_RETENTION_SCALE,
+}
+
+
+class _Codes:
+    """Interns hashable ids as consecutive integer codes"""
+
+    def __init__(self):
+        self.index: Dict = {}
+        self.values: List = []
+
+    def code(self, value) -> int:
+        code = self.index.get(value)
+        if code is None:
+            code = self.index[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def encode(self, ids: np.ndarray) -> np.ndarray:
+        # Only the distinct ids of a chunk go through the dict
+        unique, inverse = np.unique(ids, return_inverse=True)
+        codes = np.array([self.code(value) for value in unique.tolist()], dtype=np.int64)
+        return codes[inverse.ravel()]
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+def _grow(array: np.ndarray, size: int) -> np.ndarray:
+    if size <= len(array):
+        return array
+    grown = np.zeros(max(size, 2 * len(array)), dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+@dataclass
+class SurveyScores:
+    """Team-level survey scores, one array entry per team"""
+    teams: List
+    scores: Dict[str, np.ndarray]       # field → mean score (NaN: no respondents)
+    std_errors: Dict[str, np.ndarray]   # field → SD / √n (NaN: fewer than 2)
+    respondents: Dict[str, np.ndarray]  # field → respondents counted
+    responses: Dict[str, np.ndarray]    # field → item responses counted
+
+    def fields(self, teams: Optional[Sequence] = None) -> Dict[str, np.ndarray]:
+        """
+        Columns for SoftwareTeamCalibrator.calibrate_arrays
+
+        Args:
+            teams: Team order of the other metric columns (default: self.teams);
+                teams without responses get NaN
+        """
+        return {name: align_teams(values, self.teams, teams) for name, values in self.scores.items()}
+
+    def uncertainty(self, teams: Optional[Sequence] = None) -> List[Dict[str, Uncertainty]]:
+        """Per-team Uncertainty dicts for ljpw_uncertainty.propagate_uncertainty"""
+        se = {name: align_teams(values, self.teams, teams) for name, values in self.std_errors.items()}
+        n = len(self.teams) if teams is None else len(teams)
+        return [
+            {name: Uncertainty(float(values[t])) for name, values in se.items() if np.isfinite(values[t])}
+            for t in range(n)
+        ]
+
+    def to_dict(self) -> Dict:
+        return {
+            'teams': list(self.teams),
+            **{
+                name: {
+                    'score': self.scores[name].tolist(),
+                    'std_error': self.std_errors[name].tolist(),
+                    'respondents': self.respondents[name].tolist(),
+                    'responses': self.responses[name].tolist()
+                }
+                for name in self.scores
+            }
+        }
+
+
+class SurveyAggregator:
+    """
+    Streaming aggregation of item-level Likert responses into team scores
+
+    Keeps only per-respondent weighted sums (respondents × scales), so
+    memory does not grow with the number of response rows.
+    """
+
+    def __init__(self, scales: Optional[Dict[str, SurveyScale]] = None):
+        self.scales = dict(scales if scales is not None else DEFAULT_SCALES)
+        self.names = list(self.scales)
+
+        # Item lookup: item id → (scale index, weight, reversed)
+        self._item_scale: Dict[str, int] = {}
+        self._item_weight: Dict[str, float] = {}
+        self._item_reverse: Dict[str, bool] = {}
+        for s, name in enumerate(self.names):
+            scale = self.scales[name]
+            for item, weight in scale.items.items():
+                if item in self._item_scale:
+                    raise ValueError(f"Item {item} belongs to more than one scale")
+                self._item_scale[item] = s
+                self._item_weight[item] = float(weight)
+                self._item_reverse[item] = item in scale.reverse
+        self._low = np.array([self.scales[n].scale_min for n in self.names])
+        self._high = np.array([self.scales[n].scale_max for n in self.names])
+
+        self._teams = _Codes()
+        self._respondents = _Codes()  # keyed by (team, respondent id)
+        self._items = _Codes()
+        self._item_lookup = (np.empty(0, dtype=np.int64), np.empty(0), np.empty(0, dtype=bool))
+
+        self._S = len(self.names)
+        self._respondent_team = np.zeros(0, dtype=np.int64)
+        self._weighted_sum = np.zeros(0)   # (respondents × S), flattened
+        self._weight_total = np.zeros(0)
+        self._count = np.zeros(0, dtype=np.int64)
+        self.rows_seen = 0
+        self.rows_used = 0
+
+    def _lookup_items(self, items: np.ndarray):
+        codes = self._items.encode(items)
+        scale_of, weight_of, reverse_of = self._item_lookup
+        known = len(scale_of)
+        if len(self._items) > known:
+            new = self._items.values[known:]
+            scale_of = np.concatenate([scale_of, [self._item_scale.get(i, -1) for i in new]]).astype(np.int64)
+            weight_of = np.concatenate([weight_of, [self._item_weight.get(i, 0.0) for i in new]])
+            reverse_of = np.concatenate([reverse_of, [self._item_reverse.get(i, False) for i in new]]).astype(bool)
+            self._item_lookup = (scale_of, weight_of, reverse_of)
+        return scale_of[codes], weight_of[codes], reverse_of[codes]
+
+    def update(self, team: Sequence, respondent: Sequence, item: Sequence, response: Sequence) -> None:
+        """
+        Fold in a chunk of responses (four equal-length columns)
+
+        Rows with an unknown item, a missing response or a response outside
+        the scale range are ignored. A respondent may span several chunks.
+        """
+        response = np.asarray(response, dtype=float)
+        self.rows_seen += len(response)
+        if len(response) == 0:
+            return
+
+        scale, weight, reverse = self._lookup_items(np.asarray(item).astype(str))
+        s = np.maximum(scale, 0)
+        valid = (scale >= 0) & (response >= self._low[s]) & (response <= self._high[s])
+        if not valid.all():
+            keep = np.flatnonzero(valid)
+            team, respondent = np.asarray(team)[keep], np.asarray(respondent)[keep]
+            response, scale, weight, reverse = response[keep], scale[keep], weight[keep], reverse[keep]
+            s = scale
+        if len(response) == 0:
+            return
+        self.rows_used += len(response)
+
+        team_code = self._teams.encode(np.asarray(team))
+        # Respondent ids only need to be unique within a team
+        local_ids, local = np.unique(np.asarray(respondent), return_inverse=True)
+        local = local.ravel()
+        _, first, inverse = np.unique(team_code * len(local_ids) + local,
+                                      return_index=True, return_inverse=True)
+        team_ids, respondent_ids = self._teams.values, local_ids.tolist()
+        pair_codes = np.array([
+            self._respondents.code((team_ids[t], respondent_ids[r]))
+            for t, r in zip(team_code[first].tolist(), local[first].tolist())
+        ], dtype=np.int64)
+        resp_code = pair_codes[inverse.ravel()]
+
+        R = len(self._respondents)
+        self._respondent_team = _grow(self._respondent_team, R)
+        self._respondent_team[resp_code] = team_code
+
+        value = np.where(reverse, self._low[s] + self._high[s] - response, response)
+        key = resp_code * self._S + s
+        size = R * self._S
+        self._weighted_sum = _grow(self._weighted_sum, size)
+        self._weight_total = _grow(self._weight_total, size)
+        self._count = _grow(self._count, size)
+        self._weighted_sum[:size] += np.bincount(key, weights=weight * value, minlength=size)
+        self._weight_total[:size] += np.bincount(key, weights=weight, minlength=size)
+        self._count[:size] += np.bincount(key, minlength=size)
+
+    def result(self) -> SurveyScores:
+        """Team scores from everything folded in so far"""
+        R, T = len(self._respondents), len(self._teams)
+        size = R * self._S
+        weighted_sum = self._weighted_sum[:size].reshape(R, self._S)
+        weight_total = self._weight_total[:size].reshape(R, self._S)
+        count = self._count[:size].reshape(R, self._S)
+        team = self._respondent_team[:R]
+
+        scores, std_errors, respondents, responses = {}, {}, {}, {}
+        for s, name in enumerate(self.names):
+            required = self.scales[name].min_item_share * sum(self.scales[name].items.values())
+            counted = weight_total[:, s] >= max(required, 1e-12)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                respondent_score = np.where(counted, weighted_sum[:, s] / weight_total[:, s], 0.0)
+
+            n = np.bincount(team, weights=counted, minlength=T)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                mean = np.bincount(team, weights=respondent_score, minlength=T) / n
+                # Two-pass variance around each team's mean
+                deviation = np.where(counted, respondent_score - mean[team], 0.0)
+                var = np.bincount(team, weights=deviation ** 2, minlength=T) / (n - 1)
+                se = np.where(n >= 2, np.sqrt(var / n), np.nan)
+
+            scores[name] = np.where(n > 0, mean, np.nan)
+            std_errors[name] = se
+            respondents[name] = n.astype(np.int64)
+            responses[name] = np.bincount(team, weights=count[:, s] * counted, minlength=T).astype(np.int64)
+
+        return SurveyScores(
+            teams=list(self._teams.values),
+            scores=scores,
+            std_errors=std_errors,
+            respondents=respondents,
+            responses=responses
+        )
+
+
+def _to_float(values: np.ndarray) -> np.ndarray:
+    try:
+        return values.astype(float)
+    except ValueError:
+        # Blank or non-numeric answers become NaN (and are skipped)
+        def parse(text):
+            try:
+                return float(text)
+            except ValueError:
+                return np.nan
+        return np.array([parse(text) for text in values.tolist()])
+
+
+def read_responses_csv(
+    path: str,
+    chunk_rows: int = 500000,
+    columns: Sequence[str] = ('team', 'respondent', 'item', 'response')
+) -> Iterator[Dict[str, np.ndarray]]:
+    """
+    Stream a long-format response CSV as chunks for SurveyAggregator.update
+
+    Args:
+        path: CSV with a header row
+        chunk_rows: Rows per chunk
+        columns: Header names for team, respondent, item and response
+
+    Yields:
+        Dict with 'team', 'respondent', 'item' (str arrays) and 'response'
+        (float array; blank or non-numeric → NaN)
+    """
+    with open(path, newline='') as fh:
+        reader = csv.reader(fh)
+        header = next(reader)
+        try:
+            index = [header.index(name) for name in columns]
+        except ValueError:
+            raise ValueError(f"CSV header must contain {list(columns)}, got {header}")
+
+        def emit(rows):
+            table = np.array([[row[i] for i in index] for row in rows], dtype=str)
+            return {'team': table[:, 0], 'respondent': table[:, 1], 'item': table[:, 2],
+                    'response': _to_float(table[:, 3])}
+
+        rows = []
+        for row in reader:
+            rows.append(row)
+            if len(rows) >= chunk_rows:
+                yield emit(rows)
+                rows = []
+        if rows:
+            yield emit(rows)
+
+
+def aggregate_csv(path: str, scales: Optional[Dict[str, SurveyScale]] = None,
+                  chunk_rows: int = 500000) -> SurveyScores:
+    """Aggregate a long-format response CSV into team scores in one streaming pass"""
+    aggregator = SurveyAggregator(scales)
+    for chunk in read_responses_csv(path, chunk_rows):
+        aggregator.update(**chunk)
+    return aggregator.result()
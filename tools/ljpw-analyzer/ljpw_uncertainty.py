@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+LJPW Uncertainty - Monte Carlo Propagation of Measurement Error
+
+Calibration treats every RawMetrics field as exact, but survey scores
+(psych_safety_score, knowledge_retention_score) are sample means with
+sampling error and p95_response_time_ms is itself an estimate.
+
+This module:
+1. Attaches an Uncertainty (standard error and distribution) to any
+   RawMetrics field
+2. Draws n_draws plausible metric sets per team, in chunks of teams so
+   that teams × draws held at once stays under a memory bound
+3. Runs SoftwareTeamCalibrator.calibrate_arrays and LJPWMixer.mix_arrays
+   on all draws of a chunk at once
+4. Summarizes confidence bands for L, J, P, W and every mixing score, and
+   how often each dimension is the bottleneck
+
+Usage:
+    from ljpw_uncertainty import Uncertainty, propagate_uncertainty, survey_uncertainty
+
+    uncertainty = {
+        'psych_safety_score': survey_uncertainty(sd=1.1, n_respondents=8),
+        'p95_response_time_ms': Uncertainty(40.0, 'lognormal'),
+    }
+    result = propagate_uncertainty(teams, uncertainty, n_draws=2000, seed=42)
+    print(result['low'][:, result['outputs'].index('composite')])
+"""
+
+import numpy as np
+from dataclasses import astuple, dataclass, fields
+from typing import Dict, List, Optional, Sequence, Union
+
+from ljpw_calibrator import RawMetrics, SoftwareTeamCalibrator
+from ljpw_mixing import LJPWMixer
+
+DIMENSIONS = ('L', 'J', 'P', 'W')
+
+OUTPUTS = DIMENSIONS + ('robustness', 'effectiveness', 'growth_potential', 'harmony', 'composite')
+
+FIELDS = [f.name for f in fields(RawMetrics)]
+
+# Valid range of each field (draws are clipped to it), per the RawMetrics comments
+FIELD_BOUNDS = {name: (0.0, 1.0) for name in FIELDS}
+FIELD_BOUNDS.update({
+    'psych_safety_score': (1.0, 7.0),
+    'knowledge_retention_score': (1.0, 7.0),
+    'velocity_achievement': (0.0, np.inf),
+    'p95_response_time_ms': (0.0, np.inf),
+    'sla_target_ms': (0.0, np.inf),
+    'doc_to_code_ratio': (0.0, np.inf),
+    'onboarding_days': (0.0, np.inf),
+    'baseline_onboarding_days': (0.0, np.inf),
+})
+
+DISTRIBUTIONS = ('normal', 'lognormal', 'uniform')
+
+
+@dataclass
+class Uncertainty:
+    """Sampling distribution of a measured field around its reported value"""
+    std_error: float
+    distribution: str = 'normal'  # 'normal', 'lognormal' (skewed, positive: latencies) or 'uniform'
+
+
+def survey_uncertainty(sd: float, n_respondents: int) -> Uncertainty:
+    """Uncertainty of a survey mean: normal with SE = sd / √n"""
+    return Uncertainty(sd / np.sqrt(n_respondents))
+
+
+UncertaintySpec = Union[Uncertainty, float]
+
+
+def _as_uncertainty(spec: UncertaintySpec) -> Uncertainty:
+    if isinstance(spec, Uncertainty):
+        if spec.distribution not in DISTRIBUTIONS:
+            raise ValueError(f"Unknown distribution: {spec.distribution}")
+        return spec
+    return Uncertainty(float(spec))
+
+
+def _draw(rng: np.random.Generator, value: np.ndarray, se: np.ndarray,
+          distribution: str, n_draws: int) -> np.ndarray:
+    """Draws of shape (teams, n_draws) centred on value with standard error se"""
+    value, se = value[:, None], se[:, None]
+    if distribution == 'lognormal':
+        # Mean-preserving lognormal: σ² = log(1 + (se / value)²)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            sigma = np.sqrt(np.log1p(np.where(value > 0, (se / value) ** 2, 0.0)))
+        return value * np.exp(sigma * rng.standard_normal((len(value), n_draws)) - sigma ** 2 / 2)
+    if distribution == 'uniform':
+        # A uniform of half-width a has SE a / √3
+        return value + se * np.sqrt(3) * rng.uniform(-1, 1, (len(value), n_draws))
+    return value + se * rng.standard_normal((len(value), n_draws))
+
+
+def propagate_uncertainty(
+    teams: Sequence[RawMetrics],
+    uncertainty: Union[Dict[str, UncertaintySpec], Sequence[Dict[str, UncertaintySpec]]],
+    n_draws: int = 2000,
+    confidence: float = 0.95,
+    seed: Optional[int] = None,
+    chunk_elements: int = 2 ** 18,
+    calibrator: Optional[SoftwareTeamCalibrator] = None,
+    mixer: Optional[LJPWMixer] = None
+) -> Dict:
+    """
+    Confidence bands on LJPW coordinates and mixing scores per team
+
+    Args:
+        teams: Point estimates, one RawMetrics per team
+        uncertainty: Field name → Uncertainty (or a plain standard error,
+            meaning normal), shared by all teams, or one such dict per team.
+            Fields not listed are treated as exact
+        n_draws: Monte Carlo draws per team
+        confidence: Two-sided level of the bands
+        seed: Seed or np.random.Generator; results also depend on
+            chunk_elements, which sets how draws are grouped
+        chunk_elements: Upper bound on teams × draws processed at once
+        calibrator, mixer: Instances to use (default: fresh ones)
+
+    Returns:
+        Dict with:
+        - outputs: Names of the columns below (L, J, P, W, mixing scores)
+        - point: Values from the point estimates, shape (teams, outputs)
+        - mean, std, low, high: Monte Carlo summaries, same shape
+        - bottleneck_probability: Share of draws in which each of L, J, P, W
+          is the weakest dimension, shape (teams, 4)
+        - point_bottleneck: Weakest dimension at the point estimates
+        - n_draws, confidence
+    """
+    calibrator = calibrator or SoftwareTeamCalibrator()
+    mixer = mixer or LJPWMixer()
+    rng = np.random.default_rng(seed)
+    T = len(teams)
+
+    values = np.array([astuple(team) for team in teams], dtype=float).reshape(T, len(FIELDS))
+    per_team = [uncertainty] * T if isinstance(uncertainty, dict) else list(uncertainty)
+    if len(per_team) != T:
+        raise ValueError("Need one uncertainty dict per team (or one shared dict)")
+
+    # Standard errors and distributions per field, as (teams,) arrays
+    se = {}
+    dist = {}
+    for t, specs in enumerate(per_team):
+        for name, spec in specs.items():
+            if name not in FIELD_BOUNDS:
+                raise ValueError(f"Unknown RawMetrics field: {name}")
+            spec = _as_uncertainty(spec)
+            if name not in se:
+                se[name] = np.zeros(T)
+                dist[name] = np.full(T, 'normal', dtype=object)
+            se[name][t] = spec.std_error
+            dist[name][t] = spec.distribution
+
+    def evaluate(fields_by_name):
+        """Outputs stacked on axis 1: (teams, outputs) or (teams, outputs, draws)"""
+        coords = np.moveaxis(calibrator.calibrate_arrays(fields_by_name), -1, 0)
+        scores = mixer.mix_arrays(*coords)
+        return np.stack(list(coords) + [scores[k] for k in OUTPUTS[4:]], axis=1)
+
+    point = evaluate({name: values[:, i] for i, name in enumerate(FIELDS)})
+
+    shape = (T, len(OUTPUTS))
+    mean, std, low, high = (np.empty(shape) for _ in range(4))
+    bottleneck_probability = np.empty((T, 4))
+    alpha = (1 - confidence) / 2
+
+    chunk = max(1, chunk_elements // max(n_draws, 1))
+    for start in range(0, T, chunk):
+        rows = slice(start, min(start + chunk, T))
+        block = {}
+        for i, name in enumerate(FIELDS):
+            value = values[rows, i]
+            if name not in se or not np.any(se[name][rows] > 0):
+                block[name] = value[:, None]
+                continue
+            draws = np.empty((len(value), n_draws))
+            for kind in np.unique(dist[name][rows]):
+                mask = dist[name][rows] == kind
+                draws[mask] = _draw(rng, value[mask], se[name][rows][mask], kind, n_draws)
+            block[name] = np.clip(draws, *FIELD_BOUNDS[name])
+
+        outputs = evaluate(block)  # (chunk, outputs, draws)
+        mean[rows] = outputs.mean(axis=-1)
+        std[rows] = outputs.std(axis=-1, ddof=1) if outputs.shape[-1] > 1 else 0.0
+        low[rows], high[rows] = np.quantile(outputs, [alpha, 1 - alpha], axis=-1)
+
+        weakest = np.argmin(outputs[:, :4], axis=1)  # ties go to the first, as in diagnose
+        bottleneck_probability[rows] = np.stack(
+            [np.mean(weakest == d, axis=-1) for d in range(4)], axis=-1
+        )
+
+    return {
+        'outputs': OUTPUTS,
+        'point': point,
+        'mean': mean,
+        'std': std,
+        'low': low,
+        'high': high,
+        'bottleneck_probability': bottleneck_probability,
+        'point_bottleneck': [DIMENSIONS[d] for d in np.argmin(point[:, :4], axis=1)],
+        'n_draws': n_draws,
+        'confidence': confidence
+    }
+
+
+def team_bands(result: Dict, index: int) -> Dict:
+    """
+    One team's bands from propagate_uncertainty
+
+    Returns:
+        Dict of output name → {'point', 'mean', 'std', 'low', 'high'}, plus
+        'bottleneck' → {'point': dimension, 'probability': {dimension: share}}
+    """
+    bands = {
+        name: {key: float(result[key][index, k]) for key in ('point', 'mean', 'std', 'low', 'high')}
+        for k, name in enumerate(result['outputs'])
+    }
+    bands['bottleneck'] = {
+        'point': result['point_bottleneck'][index],
+        'probability': {
+            d: float(p) for d, p in zip(DIMENSIONS, result['bottleneck_probability'][index])
+        }
+    }
+    return bands
+
+
+def bottleneck_confidence(result: Dict) -> List[float]:
+    """Per team, the share of draws agreeing with the point-estimate bottleneck"""
+    probability = result['bottleneck_probability']
+    return [
+        float(probability[t, DIMENSIONS.index(d)])
+        for t, d in enumerate(result['point_bottleneck'])
+    ]
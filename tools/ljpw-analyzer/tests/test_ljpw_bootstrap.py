@@ -0,0 +1,27 @@
+"""Bootstrap slope intervals, including data where no resample has a slope"""
+
+import warnings
+
+import numpy as np
+
+from ljpw_bootstrap import slope_confidence_intervals
+
+
+def test_intervals_cover_true_slope():
+    rng = np.random.default_rng(0)
+    x = rng.uniform(0, 1, 200)
+    y = 1 + 1.4 * x + rng.normal(0, 0.1, 200)
+    ci = slope_confidence_intervals(x, y, n_resamples=2000, seed=1)
+    assert ci['n_valid'] == 2000
+    for low, high in (ci['percentile'], ci['bca']):
+        assert low < 1.4 < high
+
+
+def test_constant_x_gives_nan_intervals():
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        ci = slope_confidence_intervals(np.full(10, 0.5), np.arange(10.0), n_resamples=100, seed=1)
+    assert ci['n_valid'] == 0
+    assert np.isnan(ci['percentile']).all()
+    assert np.isnan(ci['bca']).all()
+    assert np.isnan(ci['std_error'])
@@ -0,0 +1,141 @@
+"""ResultCache keys, LRU eviction, disabled fallback and source invalidation"""
+
+import sqlite3
+import sys
+from dataclasses import dataclass
+
+import numpy as np
+import pytest
+
+import ljpw_cache
+from ljpw_analyzer import LJPWCoordinates, analyze_system
+from ljpw_cache import ResultCache, cache_key, canonical_json, cached_call, source_fingerprint
+
+
+@dataclass
+class Point:
+    x: float
+    y: float
+
+
+def _text(size):
+    """JSON text of exactly size bytes, as put() stores a str"""
+    return canonical_json('x' * (size - 2))
+
+
+@pytest.fixture
+def cache(tmp_path):
+    with ResultCache(str(tmp_path / 'results.sqlite')) as cache:
+        yield cache
+
+
+def test_key_is_stable_and_covers_kind_inputs_and_context():
+    key = cache_key('analyze', {'L': 0.5, 'J': 0.25}, {'version': '1'})
+    assert key == cache_key('analyze', {'J': 0.25, 'L': 0.5}, {'version': '1'})
+    assert key != cache_key('mix', {'L': 0.5, 'J': 0.25}, {'version': '1'})
+    assert key != cache_key('analyze', {'L': 0.5, 'J': 0.25000000000000006}, {'version': '1'})
+    assert key != cache_key('analyze', {'L': 0.5, 'J': 0.25}, {'version': '2'})
+
+    # Dataclasses and numpy values key like the plain JSON they encode to
+    assert canonical_json(Point(1.0, 2.0)) == canonical_json({'y': 2.0, 'x': 1.0})
+    assert cache_key('k', np.array([0.5, np.float64(1.5)])) == cache_key('k', [0.5, 1.5])
+
+
+def test_lru_eviction_keeps_total_under_max_bytes(tmp_path):
+    value = _text(100)
+    with ResultCache(str(tmp_path / 'results.sqlite'), max_bytes=350) as cache:
+        for k in range(3):
+            cache.put(f'k{k}', value)
+        assert cache.get('k0') == 'x' * 98  # k0 is now more recent than k1
+
+        cache.put('k3', value)
+        assert cache.get('k1') is None
+        assert all(cache.get(f'k{k}') == 'x' * 98 for k in (0, 2, 3))
+        assert cache.stats()['bytes'] == 300
+
+        # Replacing an entry counts only its new size
+        cache.put('k3', _text(50))
+        assert cache.stats()['bytes'] == 250
+
+        cache.put('big', _text(300))  # 550 bytes: the two oldest, k0 and k2, go
+        assert cache.get('k0') is None and cache.get('k2') is None
+        assert cache.get('k3') is not None
+        assert cache.stats()['bytes'] == 350
+
+        cache.clear()
+        assert cache.stats()['bytes'] == 0
+
+
+def test_running_total_matches_stored_sizes(tmp_path):
+    path = str(tmp_path / 'results.sqlite')
+    rng = np.random.default_rng(0)
+    with ResultCache(path, max_bytes=5000) as cache:
+        for k in rng.integers(0, 40, 300).tolist():
+            cache.put(f'k{k}', _text(int(rng.integers(2, 400))))
+        total = cache.stats()['bytes']
+    assert total <= 5000
+    with sqlite3.connect(path) as conn:
+        assert conn.execute('SELECT SUM(size) FROM entries').fetchone()[0] == total
+
+
+def test_total_is_initialized_for_a_file_without_it(tmp_path):
+    path = str(tmp_path / 'results.sqlite')
+    with ResultCache(path) as cache:
+        cache.put('a', _text(10))
+        cache.put('b', _text(20))
+    with sqlite3.connect(path) as conn:
+        conn.execute('DROP TABLE meta')
+    with ResultCache(path) as cache:
+        assert cache.stats()['bytes'] == 30
+
+
+def test_unusable_path_disables_cache_without_failing(tmp_path, capsys):
+    blocker = tmp_path / 'not-a-directory'
+    blocker.write_text('')
+    cache = ResultCache(str(blocker / 'results.sqlite'))
+    assert not cache.enabled
+    assert 'result cache disabled' in capsys.readouterr().err
+
+    calls = []
+    compute = lambda: calls.append(1) or {'value': (1, 2)}
+    assert cache.get_or_compute('k', {}, None, compute) == {'value': [1, 2]}
+    assert cache.get_or_compute('k', {}, None, compute) == {'value': [1, 2]}
+    assert len(calls) == 2
+    cache.put('k', _text(10))
+    assert cache.get('k') is None
+    assert cached_call(None, 'k', {}, None, compute) == {'value': [1, 2]}
+
+
+def test_hit_and_miss_return_the_same_result(cache):
+    coords = LJPWCoordinates(L=0.7, J=0.9, P=0.8, W=0.6)
+    first = analyze_system(coords, cache=cache)
+    second = analyze_system(coords, cache=cache)
+    assert (cache.misses, cache.hits) == (1, 1)
+    assert first == second == analyze_system(coords)
+
+
+def test_changed_source_fingerprint_invalidates(cache, monkeypatch):
+    coords = LJPWCoordinates(L=0.7, J=0.9, P=0.8, W=0.6)
+    analyze_system(coords, cache=cache)
+    analyze_system(coords, cache=cache)
+    assert (cache.misses, cache.hits) == (1, 1)
+
+    monkeypatch.setattr(ljpw_cache, 'source_fingerprint', lambda *modules: 'edited')
+    analyze_system(coords, cache=cache)
+    assert (cache.misses, cache.hits) == (2, 1)
+
+
+def test_source_fingerprint_follows_file_contents(tmp_path, monkeypatch):
+    module = tmp_path / 'ljpw_fingerprint_probe.py'
+    module.write_text('VALUE = 1\n')
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    before = source_fingerprint('ljpw_fingerprint_probe')
+    assert source_fingerprint('ljpw_fingerprint_probe') == before  # memoized per process
+
+    module.write_text('VALUE = 2\n')
+    source_fingerprint.cache_clear()
+    assert source_fingerprint('ljpw_fingerprint_probe') != before
+    assert source_fingerprint('ljpw_fingerprint_probe', 'ljpw_mixing') != \
+        source_fingerprint('ljpw_fingerprint_probe')
+    sys.modules.pop('ljpw_fingerprint_probe', None)
@@ -0,0 +1,34 @@
+"""Team alignment shared by the git, Prometheus and survey metric sources"""
+
+import numpy as np
+
+from ljpw_calibrator import align_teams
+from ljpw_git_miner import GitMetrics
+from ljpw_prometheus import PowerMetrics
+from ljpw_survey import SurveyScores
+
+
+def test_align_teams_reorders_and_fills_nan():
+    values = np.array([1.0, 2.0, 3.0])
+    aligned = align_teams(values, ['a', 'b', 'c'], ['c', 'x', 'a'])
+    np.testing.assert_array_equal(aligned, [3.0, np.nan, 1.0])
+    assert align_teams(values, ['a', 'b', 'c']) is values
+    assert len(align_teams(values, ['a', 'b', 'c'], [])) == 0
+    np.testing.assert_array_equal(align_teams(np.array([5, 7]), [10, 20], [20, 30]), [7.0, np.nan])
+
+
+def test_metric_sources_align_alike():
+    teams = ['pay', 'search']
+    wanted = ['search', 'infra', 'pay']
+    values = np.array([0.25, 0.75])
+    git = GitMetrics(teams, values, values, values, np.array([3, 4]))
+    power = PowerMetrics(teams, values, values, values, np.array([10.0, 20.0]), np.array([1, 2]))
+    survey = SurveyScores(teams, {'psych_safety_score': values}, {'psych_safety_score': values},
+                          {}, {})
+
+    expected = [0.75, np.nan, 0.25]
+    for fields in (git.fields(wanted), power.fields(wanted), survey.fields(wanted)):
+        for column in fields.values():
+            np.testing.assert_array_equal(column, expected)
+    bands = survey.uncertainty(wanted)
+    assert [set(band) for band in bands] == [{'psych_safety_score'}, set(), {'psych_safety_score'}]
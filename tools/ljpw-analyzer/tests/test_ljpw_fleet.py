@@ -0,0 +1,83 @@
+"""Incremental fleet scans against a fresh full scan"""
+
+import json
+import os
+
+import pytest
+
+from ljpw_fleet import FleetAnalyzer
+
+
+def _config(path, name, L, J=0.6, P=0.7, W=0.5):
+    path.write_text(json.dumps({'system': name, 'coordinates': {'L': L, 'J': J, 'P': P, 'W': W}}))
+
+
+def _bump_mtime(path):
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+
+def _assert_matches_fresh_scan(fleet, root):
+    fresh = FleetAnalyzer(str(root))
+    fresh.scan()
+    incremental, expected = fleet.summary(), fresh.summary()
+    assert incremental['systems'] == expected['systems']
+    assert incremental['bottlenecks'] == expected['bottlenecks']
+    assert incremental['errors'] == expected['errors']
+    assert incremental['lowest_harmony'] == expected['lowest_harmony']
+    for key, value in expected['mean'].items():
+        assert incremental['mean'][key] == pytest.approx(value)
+
+
+def test_scan_classifies_changes_and_keeps_aggregate(tmp_path):
+    (tmp_path / 'teams').mkdir()
+    for k in range(4):
+        _config(tmp_path / 'teams' / f'team{k}.json', f'Team {k}', L=0.2 + 0.15 * k)
+    (tmp_path / '.hidden.json').write_text('{}')
+    manifest = tmp_path / '.ljpw-manifest.json'
+
+    fleet = FleetAnalyzer(str(tmp_path), manifest_path=str(manifest))
+    changes = fleet.scan()
+    assert sorted(changes['added']) == [f'teams/team{k}.json' for k in range(4)]
+    assert fleet.summary()['systems'] == 4
+    _assert_matches_fresh_scan(fleet, tmp_path)
+
+    # Nothing on disk changed: nothing is read again
+    assert not any(fleet.scan().values())
+
+    _config(tmp_path / 'teams' / 'team0.json', 'Team 0', L=0.9, J=0.3)  # edited
+    _bump_mtime(tmp_path / 'teams' / 'team0.json')  # same size; don't rely on mtime resolution
+    _bump_mtime(tmp_path / 'teams' / 'team1.json')                     # touched only
+    (tmp_path / 'teams' / 'team2.json').unlink()                       # deleted
+    _config(tmp_path / 'team4.json', 'Team 4', L=0.5)                  # new
+    (tmp_path / 'broken.json').write_text('{"system": "Broken"}')      # no coordinates
+
+    changes = fleet.scan()
+    assert changes['changed'] == ['teams/team0.json']
+    assert changes['touched'] == ['teams/team1.json']
+    assert changes['removed'] == ['teams/team2.json']
+    assert sorted(changes['added']) == ['broken.json', 'team4.json']
+    assert changes['errors'] == ['broken.json']
+    assert fleet.summary()['systems'] == 4
+    _assert_matches_fresh_scan(fleet, tmp_path)
+
+    # A new analyzer resumes from the manifest without re-analyzing
+    resumed = FleetAnalyzer(str(tmp_path), manifest_path=str(manifest))
+    assert not any(resumed.scan().values())
+    _assert_matches_fresh_scan(resumed, tmp_path)
+
+
+def test_watch_reports_changes_and_duration(tmp_path):
+    _config(tmp_path / 'team.json', 'Team', L=0.5)
+    output = tmp_path / 'fleet.json'
+    calls = []
+
+    FleetAnalyzer(str(tmp_path)).watch(
+        output_path=str(output), interval=0.0, max_scans=2,
+        on_change=lambda changes, elapsed: calls.append((changes, elapsed))
+    )
+
+    assert len(calls) == 1  # the first scan; the second found nothing new
+    changes, elapsed = calls[0]
+    assert changes['added'] == ['team.json'] and elapsed >= 0
+    assert json.loads(output.read_text())['summary']['systems'] == 1
@@ -0,0 +1,78 @@
+"""HistoryStore snapshots, bottleneck changes and replaced records"""
+
+import numpy as np
+import pytest
+
+from ljpw_history import HistoryStore
+
+DAY = 86400.0
+
+
+@pytest.fixture
+def store(tmp_path):
+    with HistoryStore(str(tmp_path / 'history.sqlite')) as store:
+        yield store
+
+
+def test_snapshot_takes_latest_record_at_or_before(store):
+    store.record_many(
+        ['a', 'a', 'b', 'b', 'c'],
+        [1 * DAY, 3 * DAY, 2 * DAY, 5 * DAY, 4 * DAY],
+        [(0.5, 0.6, 0.7, 0.8), (0.6, 0.6, 0.7, 0.8), (0.2, 0.6, 0.7, 0.8),
+         (0.3, 0.6, 0.7, 0.8), (0.9, 0.6, 0.7, 0.8)]
+    )
+
+    snap = store.snapshot(at=3 * DAY, fields=('L',))
+    assert snap['system'].tolist() == ['a', 'b']  # c has no record by day 3
+    assert snap['time'].tolist() == [3 * DAY, 2 * DAY]
+    assert snap['L'].tolist() == [0.6, 0.2]
+
+    latest = store.snapshot()
+    assert latest['system'].tolist() == ['a', 'b', 'c']
+    assert latest['L'].tolist() == [0.6, 0.3, 0.9]
+    assert set(latest) >= {'bottleneck', 'flags', 'harmony'}
+
+
+def test_bottleneck_changes_compare_with_record_before_window(store):
+    # Bottleneck is the lowest dimension: W, then L, then L again
+    store.record('a', (0.6, 0.7, 0.8, 0.5), time=1 * DAY)
+    store.record('a', (0.4, 0.7, 0.8, 0.5), time=10 * DAY)
+    store.record('a', (0.3, 0.7, 0.8, 0.5), time=11 * DAY)
+    # J throughout, with its only earlier record far before the window
+    store.record('b', (0.6, 0.2, 0.8, 0.5), time=0.0)
+    store.record('b', (0.6, 0.3, 0.8, 0.5), time=12 * DAY)
+    # Changes only inside the window, from P to W
+    store.record('c', (0.6, 0.7, 0.1, 0.5), time=9.5 * DAY)
+    store.record('c', (0.6, 0.7, 0.8, 0.5), time=10.5 * DAY)
+
+    changes = store.bottleneck_changes(since=9 * DAY)
+    assert changes['system'].tolist() == ['a', 'c']
+    assert changes['time'].tolist() == [10 * DAY, 10.5 * DAY]
+    assert changes['before'].tolist() == ['W', 'P']
+    assert changes['after'].tolist() == ['L', 'W']
+
+    # A window that starts after a's change sees none for it
+    assert store.bottleneck_changes(since=10.2 * DAY)['system'].tolist() == ['c']
+    assert len(store.bottleneck_changes(since=20 * DAY)['system']) == 0
+
+
+def test_same_system_and_time_is_replaced(store):
+    store.record('a', (0.2, 0.7, 0.8, 0.9), time='2025-01-13T09:00:00', inputs={'source': 'first'})
+    store.record('a', (0.8, 0.7, 0.8, 0.1), time='2025-01-13T09:00:00', inputs={'source': 'second'})
+    store.record('a', (0.5, 0.5, 0.5, 0.5), time='2025-01-14T09:00:00')
+
+    assert len(store) == 2
+    trend = store.trend('a', fields=('L', 'W', 'bottleneck'))
+    assert trend['L'].tolist() == [0.8, 0.5]
+    assert trend['W'].tolist() == [0.1, 0.5]
+    assert trend['bottleneck'][0] == 3  # W
+    assert store.inputs('a', '2025-01-13T09:00:00') == {'source': 'second'}
+
+
+def test_records_persist_across_reopen(tmp_path):
+    path = str(tmp_path / 'history.sqlite')
+    with HistoryStore(path) as store:
+        store.record_many(['a', 'b'], [DAY, DAY], np.full((2, 4), 0.5))
+    with HistoryStore(path) as store:
+        assert len(store) == 2
+        assert store.snapshot(fields=('L',))['system'].tolist() == ['a', 'b']
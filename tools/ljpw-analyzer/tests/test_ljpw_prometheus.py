@@ -0,0 +1,44 @@
+"""Exposition parsing, including OpenMetrics exemplars"""
+
+import pytest
+
+from ljpw_prometheus import PrometheusIngester, ScrapeConfig, _SAMPLE_EXEMPLAR
+
+BUCKETS = [('0.05', 50), ('0.1', 90), ('0.5', 99), ('+Inf', 100)]
+
+
+def _scrape(time, scale, exemplars):
+    lines = ['# TYPE http_request_duration_seconds histogram']
+    for le, count in BUCKETS:
+        line = f'http_request_duration_seconds_bucket{{team="pay",le="{le}"}} {count * scale} {time}'
+        if exemplars:
+            line += ' # {trace_id="abc123"} 0.043 1700000000.5'
+        lines.append(line)
+    return lines
+
+
+def _p95(exemplars):
+    ingester = PrometheusIngester(ScrapeConfig(quantile=0.05))
+    ingester.ingest_lines(_scrape(1700000000, 1, exemplars) + _scrape(1700000060, 3, exemplars))
+    return ingester.result().p95_response_time_ms[0]
+
+
+def test_exemplar_is_not_read_as_value():
+    match = _SAMPLE_EXEMPLAR.match('x_bucket{le="0.1"} 10 # {trace_id="x"} 0.05 100')
+    assert match.group(2) == '{le="0.1"}'
+    assert match.group(3) == '10'
+    assert match.group(4) is None
+
+    match = _SAMPLE_EXEMPLAR.match('x_bucket{le="0.1"} 10 1700000000 # {trace_id="x"} 0.05 100')
+    assert match.group(3, 4) == ('10', '1700000000')
+
+
+def test_braces_inside_label_values():
+    match = _SAMPLE_EXEMPLAR.match('x{path="/a}b",q="\\"}"} 3')
+    assert match.group(2) == '{path="/a}b",q="\\"}"}'
+    assert match.group(3) == '3'
+
+
+def test_exemplars_do_not_change_quantiles():
+    assert _p95(exemplars=True) == _p95(exemplars=False)
+    assert _p95(exemplars=True) == pytest.approx(5.0)  # rank 10 of 200, in the first 50 ms bucket
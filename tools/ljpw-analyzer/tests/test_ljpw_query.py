@@ -0,0 +1,200 @@
+"""Query expressions, top-k, group-by and derived columns against plain Python"""
+
+import json
+import math
+import os
+
+import numpy as np
+import pytest
+
+from ljpw_fleet import FleetAnalyzer
+from ljpw_mixing import LJPWDiagnostics
+from ljpw_query import FleetTable, Query, group_by, load_table, select, top_k
+
+ISSUE_FLAGS = {
+    'Bottleneck in': 'low_robustness',
+    'critically low': 'low_effectiveness',
+    'Love deficiency': 'love_deficiency',
+    'Far from Anchor': 'far_from_anchor',
+}
+
+
+@pytest.fixture
+def table():
+    rng = np.random.default_rng(7)
+    n = 500
+    # Rounded so that ties between dimensions (bottleneck order) occur
+    L, J, P, W = np.round(rng.uniform(0.1, 1.0, (4, n)), 1)
+    orgs = rng.choice(['payments', 'platform', 'search'], n)
+    headcount = rng.integers(1, 5, n)
+    return FleetTable.from_coordinates(L, J, P, W, extra={'org': orgs, 'headcount': headcount})
+
+
+def _rows(table):
+    """The table as a list of plain dicts"""
+    names = ('L', 'J', 'P', 'W', 'org', 'headcount')
+    columns = {name: table.decoded(name).tolist() for name in names}
+    return [dict(zip(names, values)) for values in zip(*columns.values())]
+
+
+def _matching(table, text):
+    return np.flatnonzero(Query(text).mask(table)).tolist()
+
+
+def _reference(table, predicate):
+    return [k for k, row in enumerate(_rows(table)) if predicate(row)]
+
+
+@pytest.mark.parametrize('text, predicate', [
+    # and binds tighter than or
+    ("L < 0.3 or J > 0.8 and P > 0.5",
+     lambda r: r['L'] < 0.3 or (r['J'] > 0.8 and r['P'] > 0.5)),
+    ("(L < 0.3 or J > 0.8) and P > 0.5",
+     lambda r: (r['L'] < 0.3 or r['J'] > 0.8) and r['P'] > 0.5),
+    # not binds tighter than and, looser than a comparison
+    ("not L < 0.5 and J < 0.5", lambda r: not r['L'] < 0.5 and r['J'] < 0.5),
+    ("not (L < 0.5 and J < 0.5)", lambda r: not (r['L'] < 0.5 and r['J'] < 0.5)),
+    # * before +, unary minus, left-associative - and /
+    ("L + J * P > 0.9", lambda r: r['L'] + r['J'] * r['P'] > 0.9),
+    ("-L + 1 - J - P < -0.5", lambda r: -r['L'] + 1 - r['J'] - r['P'] < -0.5),
+    ("L / J / P > 1", lambda r: r['L'] / r['J'] / r['P'] > 1),
+    ("max(L, J) - min(P, W) >= abs(L - W)",
+     lambda r: max(r['L'], r['J']) - min(r['P'], r['W']) >= abs(r['L'] - r['W'])),
+    # Membership, numeric and text, with and without not
+    ("headcount in (1, 3)", lambda r: r['headcount'] in (1, 3)),
+    ("headcount not in (1, 3) and L > 0.5", lambda r: r['headcount'] not in (1, 3) and r['L'] > 0.5),
+    ("org not in ('payments', 'search')", lambda r: r['org'] not in ('payments', 'search')),
+    ("not org in ('payments') or L == 1", lambda r: r['org'] != 'payments' or r['L'] == 1),
+    # Text comparisons, either side, and values the column never holds
+    ("org == 'platform'", lambda r: r['org'] == 'platform'),
+    ("'search' != org and W >= 0.5", lambda r: r['org'] != 'search' and r['W'] >= 0.5),
+    ('org == "billing"', lambda r: False),
+    ("org != 'billing'", lambda r: True),
+    ("org in ('billing', 'search')", lambda r: r['org'] == 'search'),
+    ("true", lambda r: True),
+    ("L > 0.5 and false", lambda r: False),
+])
+def test_expressions_match_python(table, text, predicate):
+    assert _matching(table, text) == _reference(table, predicate)
+
+
+def test_keywords_are_case_insensitive(table):
+    assert _matching(table, "L < 0.3 OR NOT J > 0.2") == _matching(table, "L < 0.3 or not J > 0.2")
+
+
+@pytest.mark.parametrize('text, message', [
+    ("org < 'payments'", "Text can only be compared with == or !=, not <"),
+    ("L == 'payments'", "Only text columns can be compared with strings"),
+    ("L in ('a', 'b')", "Only text columns can be compared with strings"),
+    ("org == 1", "org is a text column; compare it with a string"),
+    ("org in (1, 2)", "org is a text column; compare it with a string"),
+    ("'a' == 'b'", "Only text columns can be compared with strings"),
+    ("abs('a') > 1", "String 'a' must be compared with a text column"),
+    ("L + 1", "Query does not produce a condition"),
+    ("L <", "Unexpected end of query"),
+    ("L < 0.5)", "Expected end at 7, found ')'"),
+    ("(L < 0.5", "Expected ')' at 8, found end of query"),
+    ("L in 0.5", "Expected '(' at 5, found '0.5'"),
+    ("L not 0.5", "Expected 'in' at 6, found '0.5'"),
+    ("L in (J)", "Expected a number or string at 6"),
+    ("sqrt(L) > 1", "Unknown function at 0: sqrt"),
+    ("min(L) > 1", "min() takes 2 argument(s)"),
+    ("L < 0.5 & J", "Unexpected character at 8"),
+])
+def test_error_messages(table, text, message):
+    with pytest.raises(ValueError, match=message.replace('(', r'\(').replace(')', r'\)')):
+        Query(text).mask(table)
+
+
+def test_unknown_column_lists_available(table):
+    with pytest.raises(KeyError, match="Unknown column: team .*available: L, J, P, W, org"):
+        Query("team == 'a'").mask(table)
+
+
+def test_top_k_ranks_nan_last():
+    values = np.array([0.3, np.nan, 0.9, 0.1, np.nan, 0.9, 0.5])
+    assert top_k(values, 3).tolist() == [2, 5, 6]
+    assert top_k(values, 3, largest=False).tolist() == [3, 0, 6]
+    assert top_k(values, 7).tolist() == [2, 5, 6, 0, 3, 1, 4]
+    assert top_k(values, 7, largest=False).tolist() == [3, 0, 6, 2, 5, 1, 4]
+    assert top_k(values, 100).tolist()[-2:] == [1, 4]
+    assert top_k(values, 0).tolist() == []
+    assert top_k(np.full(3, np.nan), 2).tolist() == [0, 1]
+
+
+def test_select_orders_filtered_rows(table):
+    index = select(table, "org == 'search'", order_by='harmony', limit=10, ascending=True)
+    rows = _reference(table, lambda r: r['org'] == 'search')
+    expected = sorted(rows, key=lambda k: table['harmony'][k])[:10]
+    assert table['harmony'][index].tolist() == table['harmony'][expected].tolist()
+    assert select(table, limit=5).tolist() == [0, 1, 2, 3, 4]
+
+
+@pytest.mark.parametrize('key', ['org', 'headcount'])
+def test_group_by_matches_python(table, key):
+    aggregates = {'L': ['count', 'sum', 'mean', 'min', 'max', 'std'], 'harmony': 'mean'}
+    result = group_by(table, key, aggregates, where="W > 0.3")
+
+    groups = {}
+    harmony = table['harmony'].tolist()
+    for k, row in enumerate(_rows(table)):
+        if row['W'] > 0.3:
+            groups.setdefault(row[key], []).append((row['L'], harmony[k]))
+
+    assert result[key].tolist() == sorted(groups)
+    for g, label in enumerate(result[key].tolist()):
+        L = [pair[0] for pair in groups[label]]
+        mean = sum(L) / len(L)
+        assert result['count'][g] == len(L)
+        assert result['sum_L'][g] == pytest.approx(sum(L))
+        assert result['mean_L'][g] == pytest.approx(mean)
+        assert result['min_L'][g] == min(L)
+        assert result['max_L'][g] == max(L)
+        assert result['std_L'][g] == pytest.approx(math.sqrt(sum((v - mean) ** 2 for v in L) / len(L)), abs=1e-12)
+        assert result['mean_harmony'][g] == pytest.approx(sum(p[1] for p in groups[label]) / len(L))
+    assert 'count_L' not in result
+
+
+def test_group_by_rejects_unknown_aggregate(table):
+    with pytest.raises(ValueError, match="Unknown aggregate: median"):
+        group_by(table, 'org', {'L': 'median'})
+
+
+@pytest.mark.parametrize('flags_first', [False, True])
+def test_bottleneck_and_flags_match_diagnose(table, flags_first):
+    if flags_first:
+        table['flags']  # single flags are then read off the bit column
+    diagnostics = LJPWDiagnostics()
+    flags = list(ISSUE_FLAGS.values())
+    columns = {name: table[name].tolist() for name in flags}
+    bottleneck = table.decoded('bottleneck').tolist()
+
+    for k, row in enumerate(_rows(table)):
+        report = diagnostics.diagnose(row['L'], row['J'], row['P'], row['W'])
+        assert bottleneck[k] == report['bottleneck']
+        raised = {flag for text, flag in ISSUE_FLAGS.items()
+                  if any(text in issue for issue in report['issues'])}
+        assert {flag for flag in flags if columns[flag][k]} == raised
+        for score in ('robustness', 'effectiveness', 'growth_potential', 'harmony', 'composite'):
+            assert table[score][k] == pytest.approx(report['scores'][score])
+
+
+def test_query_on_config_directory_writes_nothing(tmp_path):
+    def config(name, L):
+        (tmp_path / f'{name}.json').write_text(json.dumps(
+            {'system': name, 'coordinates': {'L': L, 'J': 0.8, 'P': 0.7, 'W': 0.6}}))
+
+    config('a', 0.3)
+    config('b', 0.9)
+    assert _matching(load_table(str(tmp_path)), "L < 0.5") == [0]
+    assert sorted(os.listdir(tmp_path)) == ['a.json', 'b.json']
+
+    # An existing manifest is used but left as it was
+    manifest = tmp_path / '.ljpw-manifest.json'
+    FleetAnalyzer(str(tmp_path), manifest_path=str(manifest)).scan()
+    saved = manifest.read_bytes()
+    config('b', 0.4)
+    os.utime(tmp_path / 'b.json', ns=(0, os.stat(tmp_path / 'b.json').st_mtime_ns + 10 ** 9))
+    table = load_table(str(tmp_path))
+    assert table.decoded('system', select(table, "L < 0.5")).tolist() == ['a', 'b']
+    assert manifest.read_bytes() == saved
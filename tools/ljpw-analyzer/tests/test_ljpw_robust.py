@@ -0,0 +1,61 @@
+"""theil_sen against the all-pairs reference and scipy.stats.theilslopes"""
+
+import numpy as np
+import pytest
+from scipy import stats
+
+from ljpw_robust import theil_sen, theil_sen_reference
+
+
+def _data(kind, n, rng):
+    x = rng.normal(size=n)
+    y = 2 * x + rng.standard_cauchy(n)
+    if kind == 'rounded':
+        x, y = np.round(x, 1), np.round(y, 1)
+    elif kind == 'integer':
+        x = rng.integers(0, 4, n).astype(float)
+        y = rng.integers(0, 3, n).astype(float)
+    elif kind == 'tied_y':
+        y = np.where(rng.random(n) < 0.7, 1.0, y)
+    return x, y
+
+
+def _assert_matches(x, y, **kwargs):
+    reference = theil_sen_reference(x, y)
+    scipy_fit = stats.theilslopes(y, x, 0.95)
+    fit = theil_sen(x, y, **kwargs)
+    assert fit['slope'] == pytest.approx(reference['slope'], rel=1e-12, abs=1e-12)
+    assert fit['slope'] == pytest.approx(scipy_fit.slope, rel=1e-12, abs=1e-12)
+    assert fit['confidence_interval'] == pytest.approx(
+        (scipy_fit.low_slope, scipy_fit.high_slope), rel=1e-12, abs=1e-12)
+
+
+@pytest.mark.parametrize('kind', ['random', 'rounded', 'integer', 'tied_y'])
+@pytest.mark.parametrize('data_seed', range(4))
+def test_small_windows_match_reference(kind, data_seed):
+    # Small samples and enumeration limits force many narrowing rounds
+    rng = np.random.default_rng(data_seed)
+    x, y = _data(kind, int(rng.integers(20, 300)), rng)
+    for seed in range(10):
+        _assert_matches(x, y, seed=seed, sample_size=int(rng.integers(5, 60)),
+                        enumerate_limit=int(rng.integers(10, 200)))
+
+
+def test_rounded_data_all_seeds():
+    # One-decimal data: many mathematically equal slopes that round differently
+    rng = np.random.default_rng(0)
+    x = np.round(rng.uniform(0, 3, 333), 1)
+    y = np.round(1.5 * x + rng.normal(0, 1, 333), 1)
+    for seed in range(100):
+        _assert_matches(x, y, seed=seed, enumerate_limit=123, sample_size=28)
+
+
+def test_default_parameters():
+    rng = np.random.default_rng(1)
+    x, y = _data('rounded', 2000, rng)
+    _assert_matches(x, y, seed=0)
+
+
+def test_needs_two_distinct_x():
+    with pytest.raises(ValueError):
+        theil_sen(np.ones(5), np.arange(5.0))
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Vectorized Ordinary Least Squares
+
+Fits several response variables against the same design matrix in one
+linear-algebra call, and supports datasets too large for memory through
+chunked normal-equation accumulation.
+
+This module provides:
+1. fit_ols: one QR decomposition for a stacked (N, k) response matrix
+2. NormalEquations: mergeable XᵀX / XᵀY accumulator for chunked data
+3. nested_f_test: F-test of a restricted model against a full model
+"""
+
+import numpy as np
+from scipy import stats
+from scipy.linalg import cho_factor, cho_solve, solve_triangular
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+
+@dataclass
+class OLSResult:
+    """Coefficients and inference for k responses sharing one design"""
+    terms: List[str]
+    responses: List[str]
+    coefficients: np.ndarray  # (p, k)
+    std_errors: np.ndarray    # (p, k)
+    ssr: np.ndarray           # (k,) residual sum of squares
+    tss: np.ndarray           # (k,) total sum of squares about the mean
+    n: int
+
+    @property
+    def df_resid(self) -> int:
+        return self.n - len(self.terms)
+
+    @property
+    def t_values(self) -> np.ndarray:
+        return self.coefficients / self.std_errors
+
+    @property
+    def p_values(self) -> np.ndarray:
+        return 2 * stats.t.sf(np.abs(self.t_values), self.df_resid)
+
+    @property
+    def r_squared(self) -> np.ndarray:
+        return 1 - self.ssr / self.tss
+
+    def to_dict(self) -> Dict[str, Dict]:
+        """Per-response summary keyed by term name"""
+        t, p, r2 = self.t_values, self.p_values, self.r_squared
+        return {
+            response: {
+                'coefficients': dict(zip(self.terms, self.coefficients[:, j])),
+                'std_errors': dict(zip(self.terms, self.std_errors[:, j])),
+                't_values': dict(zip(self.terms, t[:, j])),
+                'p_values': dict(zip(self.terms, p[:, j])),
+                'r_squared': r2[j],
+                'n': self.n
+            }
+            for j, response in enumerate(self.responses)
+        }
+
+
+def _as_matrix(a: np.ndarray) -> np.ndarray:
+    a = np.asarray(a, dtype=float)
+    return a[:, None] if a.ndim == 1 else a
+
+
+def fit_ols(
+    X: np.ndarray,
+    Y: np.ndarray,
+    terms: Sequence[str],
+    responses: Sequence[str]
+) -> OLSResult:
+    """
+    Fit Y = X·B by least squares with a single QR decomposition
+
+    Args:
+        X: Design matrix (N, p), including an intercept column if wanted
+        Y: Stacked responses (N, k)
+        terms: Name of each design column
+        responses: Name of each response column
+    """
+    X = _as_matrix(X)
+    Y = _as_matrix(Y)
+    n, p = X.shape
+
+    Q, R = np.linalg.qr(X)
+    B = solve_triangular(R, Q.T @ Y)
+
+    residuals = Y - X @ B
+    ssr = np.sum(residuals ** 2, axis=0)
+    tss = np.sum((Y - Y.mean(axis=0)) ** 2, axis=0)
+
+    # diag((XᵀX)⁻¹) = row norms² of R⁻¹
+    R_inv = solve_triangular(R, np.eye(p))
+    xtx_inv_diag = np.sum(R_inv ** 2, axis=1)
+    sigma2 = ssr / (n - p)
+    se = np.sqrt(xtx_inv_diag[:, None] * sigma2[None, :])
+
+    return OLSResult(list(terms), list(responses), B, se, ssr, tss, n)
+
+
+class NormalEquations:
+    """
+    Chunked accumulator of XᵀX, XᵀY, ΣY and ΣY²
+
+    Memory is O(p² + pk) regardless of the number of rows; accumulators
+    from different chunks, shards or threads merge exactly by addition.
+    """
+
+    def __init__(self, terms: Sequence[str], responses: Sequence[str]):
+        self.terms = list(terms)
+        self.responses = list(responses)
+        p, k = len(self.terms), len(self.responses)
+        self.n = 0
+        self.xtx = np.zeros((p, p))
+        self.xty = np.zeros((p, k))
+        self.y_sum = np.zeros(k)
+        self.y_sumsq = np.zeros(k)
+
+    def update(self, X: np.ndarray, Y: np.ndarray) -> None:
+        X = _as_matrix(X)
+        Y = _as_matrix(Y)
+        self.n += len(X)
+        self.xtx += X.T @ X
+        self.xty += X.T @ Y
+        self.y_sum += Y.sum(axis=0)
+        self.y_sumsq += np.sum(Y ** 2, axis=0)
+
+    def merge(self, other: 'NormalEquations') -> None:
+        self.n += other.n
+        self.xtx += other.xtx
+        self.xty += other.xty
+        self.y_sum += other.y_sum
+        self.y_sumsq += other.y_sumsq
+
+    def fit(self, terms: Optional[Sequence[str]] = None) -> OLSResult:
+        """
+        Solve the normal equations, optionally for a subset of terms
+
+        A subset gives the nested (restricted) model without touching
+        the data again.
+        """
+        terms = list(terms) if terms is not None else self.terms
+        idx = [self.terms.index(t) for t in terms]
+        xtx = self.xtx[np.ix_(idx, idx)]
+        xty = self.xty[idx]
+
+        factor = cho_factor(xtx)
+        B = cho_solve(factor, xty)
+        xtx_inv_diag = np.diag(cho_solve(factor, np.eye(len(idx))))
+
+        ssr = np.maximum(self.y_sumsq - np.sum(B * xty, axis=0), 0.0)
+        tss = self.y_sumsq - self.y_sum ** 2 / self.n
+        sigma2 = ssr / (self.n - len(idx))
+        se = np.sqrt(xtx_inv_diag[:, None] * sigma2[None, :])
+
+        return OLSResult(terms, self.responses, B, se, ssr, tss, self.n)
+
+
+def nested_f_test(full: OLSResult, restricted: OLSResult) -> Dict[str, Dict[str, float]]:
+    """
+    F-test that the terms dropped from the full model are jointly zero
+
+    Returns:
+        Per-response {'F', 'p', 'df_num', 'df_den', 'delta_r_squared'}
+    """
+    q = len(full.terms) - len(restricted.terms)
+    if q <= 0:
+        raise ValueError("Restricted model must have fewer terms than the full model")
+
+    F = ((restricted.ssr - full.ssr) / q) / (full.ssr / full.df_resid)
+    p = stats.f.sf(F, q, full.df_resid)
+    delta_r2 = full.r_squared - restricted.r_squared
+
+    return {
+        response: {
+            'F': F[j],
+            'p': p[j],
+            'df_num': q,
+            'df_den': full.df_resid,
+            'delta_r_squared': delta_r2[j]
+        }
+        for j, response in enumerate(full.responses)
+    }
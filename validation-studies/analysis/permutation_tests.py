@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Vectorized Permutation Tests
+
+Distribution-free p-values for the statistics the prediction scripts
+otherwise test with parametric assumptions (normal residuals, equal group
+variances) that bounded [0, 1] outcomes and clipped ceilings violate.
+
+This module:
+1. Draws permutations in blocks, one (b, n) index matrix per block
+2. Evaluates a statistic for the whole block with matrix operations
+3. Stops early once every p-value is either clearly on one side of alpha
+   or known to a target Monte Carlo standard error
+4. Optionally fans blocks out to worker processes
+
+Block b always draws from stream b of the root seed and blocks are
+consumed in order, so results do not depend on the number of workers.
+
+Statistics are callables mapping a (b, n) permutation matrix to (b,) or
+(b, k) values; the identity permutation gives the observed statistic.
+Provided statistics:
+- SlopeStatistic: OLS slope (κ in amplification = 1 + κ·L)
+- InteractionStatistic: t of β₃ in y ~ J + L + J×L (Freedman-Lane)
+- GroupFStatistic: one-way ANOVA F for several outcome columns
+"""
+
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict
+
+from rng_streams import RandomStreams
+
+# Stop once |p - alpha| exceeds this many Monte Carlo standard errors
+DECISION_Z = 3.29
+
+
+class SlopeStatistic:
+    """OLS slope of y on x under permutations of y"""
+
+    def __init__(self, x: np.ndarray, y: np.ndarray):
+        x = np.asarray(x, dtype=float)
+        self.y = np.asarray(y, dtype=float) - np.mean(y)
+        dx = x - x.mean()
+        self.weights = dx / np.sum(dx * dx)
+
+    def __call__(self, perms: np.ndarray) -> np.ndarray:
+        return self.y[perms] @ self.weights
+
+
+class InteractionStatistic:
+    """
+    t-statistic of the J×L coefficient in y ~ 1 + J + L + J×L
+
+    Uses Freedman-Lane permutation: residuals of the reduced model
+    y ~ 1 + J + L are permuted and added back to its fitted values, so the
+    main effects are preserved under the null of no interaction.
+    """
+
+    def __init__(self, J: np.ndarray, L: np.ndarray, y: np.ndarray):
+        J = np.asarray(J, dtype=float)
+        L = np.asarray(L, dtype=float)
+        y = np.asarray(y, dtype=float)
+        X = np.column_stack([np.ones(len(J)), J, L, J * L])
+
+        Q0, R0 = np.linalg.qr(X[:, :3])
+        self.fitted = Q0 @ (Q0.T @ y)
+        self.residuals = y - self.fitted
+
+        self.Q, R = np.linalg.qr(X)
+        self.R_inv_last = np.linalg.inv(R)[3]  # row giving β₃ from Qᵀy
+        self.df = len(y) - 4
+
+    def __call__(self, perms: np.ndarray) -> np.ndarray:
+        Y = self.fitted + self.residuals[perms]  # (b, n)
+        c = Y @ self.Q                           # (b, 4) = Qᵀy per permutation
+        beta = c @ self.R_inv_last
+        rss = np.maximum(np.sum(Y * Y, axis=1) - np.sum(c * c, axis=1), 0.0)
+        se = np.sqrt(rss / self.df * np.sum(self.R_inv_last ** 2))
+        return beta / se
+
+
+class GroupFStatistic:
+    """One-way ANOVA F per outcome column under permutations of the rows"""
+
+    def __init__(self, codes: np.ndarray, values: np.ndarray):
+        codes = np.asarray(codes, dtype=np.intp)
+        values = np.asarray(values, dtype=float).reshape(len(codes), -1)
+
+        present, codes = np.unique(codes, return_inverse=True)
+        self.onehot = np.zeros((len(codes), len(present)))
+        self.onehot[np.arange(len(codes)), codes] = 1.0
+        self.counts = self.onehot.sum(axis=0)
+
+        self.values = values - values.mean(axis=0)
+        self.ss_total = np.sum(self.values ** 2, axis=0)
+        self.df_between = len(present) - 1
+        self.df_within = len(codes) - len(present)
+
+    def __call__(self, perms: np.ndarray) -> np.ndarray:
+        sums = np.einsum('bnk,ng->bgk', self.values[perms], self.onehot)
+        ss_between = np.sum(sums ** 2 / self.counts[None, :, None], axis=1)  # (b, k)
+        ss_within = np.maximum(self.ss_total - ss_between, 1e-300)
+        return (ss_between / self.df_between) / (ss_within / self.df_within)
+
+
+def _exceedances(statistic, n, seed, block, size, observed, alternative):
+    """Worker: count permuted statistics at least as extreme as observed"""
+    rng = RandomStreams(seed).stream(block)
+    perms = rng.permuted(np.broadcast_to(np.arange(n), (size, n)), axis=1)
+    values = np.asarray(statistic(perms), dtype=float).reshape(size, -1)
+
+    # Relative slack so the identity permutation counts as a tie, not a miss
+    slack = 1e-12 * np.maximum(np.abs(observed), 1.0)
+    if alternative == 'greater':
+        hits = values >= observed - slack
+    elif alternative == 'less':
+        hits = values <= observed + slack
+    else:
+        hits = np.abs(values) >= np.abs(observed) - slack
+    return hits.sum(axis=0)
+
+
+def permutation_test(
+    statistic: Callable[[np.ndarray], np.ndarray],
+    n: int,
+    alternative: str = 'two-sided',
+    max_permutations: int = 10000,
+    min_permutations: int = 1000,
+    block_size: int = 500,
+    alpha: float = 0.05,
+    max_se: float = 0.001,
+    chunk_elements: int = 2 ** 22,
+    seed: int = 42,
+    n_workers: int = 1
+) -> Dict:
+    """
+    Monte Carlo permutation p-values with early stopping
+
+    After each block (once min_permutations are done) sampling stops when,
+    for every statistic, the p-value's Monte Carlo standard error is below
+    max_se or the p-value is more than DECISION_Z standard errors from alpha.
+
+    Args:
+        statistic: Vectorized statistic, (b, n) permutations → (b,) or (b, k)
+        n: Number of observations being permuted
+        alternative: 'two-sided' (|T|), 'greater' or 'less'
+        max_permutations: Upper bound on permutations drawn
+        min_permutations: Permutations drawn before early stopping is allowed
+        block_size: Permutations per block (reduced so block × n ≤ chunk_elements)
+        alpha: Significance level the stopping rule decides against
+        max_se: Target Monte Carlo standard error of the p-values
+        chunk_elements: Memory bound on block × n
+        seed: Root seed; block b uses stream b
+        n_workers: Worker processes (1 = in-process); statistic must be picklable
+
+    Returns:
+        Dict with 'observed', 'p_value', 'mc_se' (arrays of length k, or
+        scalars for a single statistic), 'n_permutations' and 'stopped_early'
+    """
+    if alternative not in ('two-sided', 'greater', 'less'):
+        raise ValueError(f"Unknown alternative: {alternative}")
+
+    observed = np.asarray(statistic(np.arange(n)[None, :]), dtype=float).reshape(-1)
+    block_size = max(1, min(block_size, chunk_elements // max(n, 1), max_permutations))
+    n_blocks = -(-max_permutations // block_size)
+
+    hits = np.zeros(len(observed))
+    drawn = 0
+    stopped_early = False
+
+    def task(block):
+        size = min(block_size, max_permutations - block * block_size)
+        return (statistic, n, seed, block, size, observed, alternative), size
+
+    def should_stop():
+        if drawn < min_permutations:
+            return False
+        p = (hits + 1) / (drawn + 1)
+        se = np.sqrt(p * (1 - p) / drawn)
+        return bool(np.all((se <= max_se) | (np.abs(p - alpha) > DECISION_Z * se)))
+
+    pool = ProcessPoolExecutor(max_workers=n_workers) if n_workers > 1 else None
+    try:
+        block = 0
+        while block < n_blocks and not stopped_early:
+            wave = range(block, min(block + (n_workers if pool else 1), n_blocks))
+            tasks = [task(b) for b in wave]
+            if pool:
+                results = list(pool.map(_exceedances, *zip(*[args for args, _ in tasks])))
+            else:
+                results = [_exceedances(*args) for args, _ in tasks]
+
+            # Consume blocks in order so the stopping point matches a serial run
+            for (_, size), block_hits in zip(tasks, results):
+                hits += block_hits
+                drawn += size
+                block += 1
+                if block < n_blocks and should_stop():
+                    stopped_early = True
+                    break
+    finally:
+        if pool:
+            pool.shutdown()
+
+    p_value = (hits + 1) / (drawn + 1)
+    mc_se = np.sqrt(p_value * (1 - p_value) / drawn)
+    scalar = len(observed) == 1
+
+    return {
+        'observed': observed[0] if scalar else observed,
+        'p_value': p_value[0] if scalar else p_value,
+        'mc_se': mc_se[0] if scalar else mc_se,
+        'n_permutations': drawn,
+        'stopped_early': stopped_early
+    }
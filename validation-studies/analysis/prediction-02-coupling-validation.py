@@ -17,8 +17,20 @@ import pandas as pd
 from scipy import stats
 from scipy.optimize import curve_fit
 import matplotlib.pyplot as plt
-from typing import Dict, Tuple
+from typing import Dict, Optional, Tuple
 import json
+import sys
+from pathlib import Path
+
+from hierarchical_kappa import fit_hierarchical_kappa
+from permutation_tests import SlopeStatistic, permutation_test
+from rng_streams import RandomStreams, SeedLike, as_generator
+
+# Shared estimators live with the ljpw-analyzer tool
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'tools' / 'ljpw-analyzer'))
+from ljpw_bootstrap import slope_confidence_intervals  # noqa: E402
+from ljpw_robust import huber_regression, robust_slope  # noqa: E402
+from ljpw_streaming import SlopeAccumulator  # noqa: E402
 
 
 class CouplingCoefficientValidator:
@@ -28,36 +40,180 @@ class CouplingCoefficientValidator:
         self.expected_kappa = expected_kappa
         self.tolerance = tolerance
         self.results = {}
+        self.accumulators: Dict[str, SlopeAccumulator] = {}
 
     def fit_coupling_coefficient(
         self,
         L_values: np.ndarray,
         J_values: np.ndarray,
         J_effective_observed: np.ndarray,
-        domain: str
+        domain: str,
+        n_bootstrap: int = 10000,
+        n_permutations: int = 10000,
+        seed: Optional[int] = 42,
+        method: str = 'ols'
     ) -> Dict:
         """
         Fit coupling coefficient for a single domain
 
         Model: Effective_J = J × (1 + κ × L)
         Rearranged: Effective_J / J = 1 + κ × L
+
+        Besides the normal-theory t-interval, reports percentile and BCa
+        bootstrap intervals for κ (n_bootstrap case resamples; 0 to skip),
+        which stay valid under heteroscedastic residuals and small n, and a
+        permutation p-value for κ (up to n_permutations, stopping early once
+        the decision at α = 0.05 is clear; 0 to skip).
+
+        method='theil_sen' or 'huber' fits κ with a robust estimator from
+        ljpw_robust instead, so a few teams with J near zero (exploding
+        J_eff / J) cannot dominate it; R² is then the robust R² and the
+        bootstrap and permutation results (OLS only) are skipped. Huber's
+        std_error is a sandwich sampling SE like OLS's; Theil-Sen's is its
+        rank-based CI half-width / z, recorded as se_type='ci_half_width'
+        and left out of the precision-weighted cross-domain statistics.
         """
         # Calculate amplification factor
         amplification = J_effective_observed / J_values
+        n = len(L_values)
+
+        # Seed the domain's streaming statistics so later shards extend this data
+        accumulator = SlopeAccumulator()
+        accumulator.update(L_values, amplification)
+        self.accumulators[domain] = accumulator
+
+        if method != 'ols':
+            fit = robust_slope(L_values, amplification, method=method, seed=seed)
+            result = self._domain_result(
+                domain, fit['slope'], fit['r_squared'], fit['p_value'], fit['std_error'], n,
+                confidence_interval=fit['confidence_interval'], method=method
+            )
+            self.results[domain] = result
+            return result
 
         # Linear regression: amplification = 1 + κ × L
         slope, intercept, r_value, p_value, std_err = stats.linregress(
             L_values, amplification
         )
 
-        fitted_kappa = slope
-        r_squared = r_value ** 2
+        # Bootstrap 95% intervals (percentile and BCa)
+        bootstrap = None
+        if n_bootstrap:
+            boot = slope_confidence_intervals(L_values, amplification, n_resamples=n_bootstrap, seed=seed)
+            bootstrap = {
+                'percentile_ci': boot['percentile'],
+                'bca_ci': boot['bca'],
+                'std_error': boot['std_error'],
+                'bias': boot['bias']
+            }
+
+        # Distribution-free p-value for κ ≠ 0
+        permutation_p = None
+        if n_permutations:
+            permutation_p = permutation_test(
+                SlopeStatistic(L_values, amplification), n,
+                max_permutations=n_permutations, seed=seed
+            )['p_value']
+
+        result = self._domain_result(
+            domain, slope, r_value ** 2, p_value, std_err, n,
+            bootstrap=bootstrap, permutation_p=permutation_p
+        )
+        self.results[domain] = result
+        return result
 
-        # 95% confidence interval
-        n = len(L_values)
-        t_val = stats.t.ppf(0.975, n - 2)  # 97.5th percentile
-        ci_low = fitted_kappa - t_val * std_err
-        ci_high = fitted_kappa + t_val * std_err
+    def fit_huber_domains(
+        self,
+        datasets: Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]]
+    ) -> Dict[str, Dict]:
+        """
+        Huber κ for many domains in one vectorized IRLS run
+
+        Args:
+            datasets: domain → (L_values, J_values, J_effective_observed)
+
+        Returns:
+            Per-domain results, as fit_coupling_coefficient(method='huber')
+        """
+        domains = list(datasets)
+        L = np.concatenate([np.asarray(datasets[d][0], dtype=float) for d in domains])
+        amplification = np.concatenate([
+            np.asarray(datasets[d][2], dtype=float) / np.asarray(datasets[d][1], dtype=float)
+            for d in domains
+        ])
+        labels = np.repeat(np.arange(len(domains)), [len(datasets[d][0]) for d in domains])
+
+        fit = huber_regression(L, amplification, groups=labels)
+        results = {}
+        for g, domain in zip(fit['groups'], domains):
+            results[domain] = self._domain_result(
+                domain, float(fit['slope'][g]), float(fit['r_squared'][g]),
+                float(fit['p_value'][g]), float(fit['std_error'][g]), int(fit['n'][g]),
+                confidence_interval=tuple(float(v) for v in fit['confidence_interval'][g]),
+                method='huber'
+            )
+        self.results.update(results)
+        return results
+
+    def update_coupling_coefficient(
+        self,
+        L_values: np.ndarray,
+        J_values: np.ndarray,
+        J_effective_observed: np.ndarray,
+        domain: str
+    ) -> Dict:
+        """
+        Add a new shard of observations to a domain and refresh its fit
+
+        Keeps mergeable sufficient statistics per domain (SlopeAccumulator),
+        so each upload costs O(shard size) and the fit is O(1); earlier
+        shards are never rescanned. Gives the same κ, SE, p-value, CI and R²
+        as fit_coupling_coefficient on the concatenated data, but without
+        bootstrap or permutation results (those need the raw rows).
+
+        Streaming fits are OLS only: a domain last fit with a robust method
+        raises ValueError rather than silently switching estimators.
+        """
+        method = self.results.get(domain, {}).get('method', 'ols')
+        if method != 'ols':
+            raise ValueError(f"Domain {domain} was fit with method={method!r}; "
+                             f"streaming updates are OLS only")
+        shard = SlopeAccumulator()
+        shard.update(L_values, J_effective_observed / J_values)
+        return self.merge_accumulator(domain, shard)
+
+    def merge_accumulator(self, domain: str, accumulator: SlopeAccumulator) -> Dict:
+        """Merge a shard accumulator (e.g. built in another process) into a domain"""
+        self.accumulators.setdefault(domain, SlopeAccumulator()).merge(accumulator)
+        fit = self.accumulators[domain].fit()
+
+        result = self._domain_result(
+            domain, fit['slope'], fit['r_squared'], fit['p_value'], fit['std_error'], fit['n']
+        )
+        self.results[domain] = result
+        return result
+
+    def _domain_result(
+        self,
+        domain: str,
+        fitted_kappa: float,
+        r_squared: float,
+        p_value: float,
+        std_err: float,
+        n: int,
+        bootstrap: Optional[Dict] = None,
+        permutation_p: Optional[float] = None,
+        confidence_interval: Optional[Tuple[float, float]] = None,
+        method: str = 'ols'
+    ) -> Dict:
+        """Confidence interval, effect size and validation checks for one domain's fit"""
+        # 95% confidence interval (robust estimators supply their own)
+        if confidence_interval is None:
+            t_val = stats.t.ppf(0.975, n - 2)  # 97.5th percentile
+            ci_low = fitted_kappa - t_val * std_err
+            ci_high = fitted_kappa + t_val * std_err
+        else:
+            ci_low, ci_high = confidence_interval
 
         # Cohen's f² effect size for R²
         f_squared = r_squared / (1 - r_squared) if r_squared < 1 else np.inf
@@ -71,27 +227,41 @@ class CouplingCoefficientValidator:
 
         validated = in_range and good_fit and significant
 
-        result = {
+        return {
             'domain': domain,
             'fitted_kappa': fitted_kappa,
             'expected_kappa': self.expected_kappa,
             'r_squared': r_squared,
             'p_value': p_value,
+            'permutation_p_value': permutation_p,
             'std_error': std_err,
             'confidence_interval': (ci_low, ci_high),
+            'bootstrap': bootstrap,
             'effect_size_f2': f_squared,
             'sample_size': n,
             'validated': validated,
             'in_range': in_range,
             'good_fit': good_fit,
-            'significant': significant
+            'significant': significant,
+            'method': method,
+            # Theil-Sen's std_error is a CI half-width / z, not a sampling SE
+            'se_type': 'ci_half_width' if method == 'theil_sen' else 'sampling'
         }
 
-        self.results[domain] = result
-        return result
+    def _sampling_se_results(self) -> Dict[str, Dict]:
+        """Domain results whose std_error is a sampling SE (OLS, Huber)"""
+        return {d: r for d, r in self.results.items() if r['se_type'] == 'sampling'}
 
     def cross_domain_analysis(self) -> Dict:
-        """Analyze consistency across domains"""
+        """
+        Analyze consistency across domains
+
+        The mean, CI and consistency score use every domain's κ. Cochran's
+        Q, I² and the pooled κ weight each κ by 1 / std_error², so they use
+        only domains with a sampling SE (se_type 'sampling'); Theil-Sen
+        domains are listed in 'excluded_from_weighting', and the three are
+        NaN when fewer than 2 domains remain.
+        """
         if len(self.results) < 2:
             raise ValueError("Need at least 2 domains for cross-domain analysis")
 
@@ -112,12 +282,20 @@ class CouplingCoefficientValidator:
         # High variation (std>0.5) → <0.5
         consistency = max(0, 1 - std_kappa / self.tolerance)
 
-        # ANOVA test: Are kappas significantly different across domains?
-        # If not, that's good (consistency)
-        # Note: This is a simplification - proper analysis would be multilevel model
-        f_stat, anova_p = stats.f_oneway(*[
-            [r['fitted_kappa']] for r in self.results.values()
-        ])
+        # Heterogeneity test: Are kappas significantly different across domains?
+        # If not, that's good (consistency). Cochran's Q weights each domain's
+        # κ by its precision; I² is the share of variation beyond sampling error
+        weighted = self._sampling_se_results()
+        if len(weighted) >= 2:
+            weighted_kappas = np.array([r['fitted_kappa'] for r in weighted.values()])
+            weights = np.array([1 / r['std_error'] ** 2 for r in weighted.values()])
+            pooled_kappa = np.sum(weights * weighted_kappas) / np.sum(weights)
+            q_stat = float(np.sum(weights * (weighted_kappas - pooled_kappa) ** 2))
+            q_df = len(weighted_kappas) - 1
+            q_p = stats.chi2.sf(q_stat, q_df)
+            i_squared = max(0.0, (q_stat - q_df) / q_stat) if q_stat > 0 else 0.0
+        else:
+            pooled_kappa = q_stat = q_p = i_squared = np.nan
 
         return {
             'mean_kappa': mean_kappa,
@@ -127,58 +305,62 @@ class CouplingCoefficientValidator:
             'consistency_score': consistency,
             'cross_domain_variance': std_kappa ** 2,
             'domains_tested': len(domains),
-            'anova_f': f_stat,
-            'anova_p': anova_p,
+            'pooled_kappa': pooled_kappa,
+            'heterogeneity_q': q_stat,
+            'heterogeneity_p': q_p,
+            'i_squared': i_squared,
+            'excluded_from_weighting': [d for d in domains if d not in weighted],
             'domains_validated': sum(r['validated'] for r in self.results.values()),
             'validation_rate': sum(r['validated'] for r in self.results.values()) / len(self.results)
         }
 
     def bayesian_analysis(self) -> Dict:
         """
-        Bayesian analysis of coupling coefficient
-
-        Prior: κ ~ Normal(1.4, 0.2²)
-        Likelihood: Data from all domains
-        Posterior: Updated belief about κ
-        """
-        # Collect all data points
-        all_kappas = [r['fitted_kappa'] for r in self.results.values()]
-        all_stderrs = [r['std_error'] for r in self.results.values()]
-
-        # Prior parameters
-        prior_mean = self.expected_kappa
-        prior_std = 0.2
+        Hierarchical Bayesian analysis of coupling coefficient
 
-        # Posterior using conjugate update (weighted average)
-        # This is simplified - proper Bayesian would use MCMC
-        prior_precision = 1 / (prior_std ** 2)
-
-        posterior_precision = prior_precision + sum(1 / (se ** 2) for se in all_stderrs)
-        posterior_variance = 1 / posterior_precision
-        posterior_std = np.sqrt(posterior_variance)
-
-        posterior_mean = posterior_variance * (
-            prior_precision * prior_mean +
-            sum(kappa / (se ** 2) for kappa, se in zip(all_kappas, all_stderrs))
-        )
+        Model: κ̂_d ~ Normal(κ_d, se_d²), κ_d ~ Normal(μ, τ²)
+        Prior: μ ~ Normal(1.4, 0.2²), τ ~ HalfCauchy(0.2)
+        Posterior: population κ (μ), between-domain spread (τ) and
+        partially pooled per-domain κ, from a vectorized multi-chain sampler
 
-        # 95% Credible Interval
-        ci_low = stats.norm.ppf(0.025, posterior_mean, posterior_std)
-        ci_high = stats.norm.ppf(0.975, posterior_mean, posterior_std)
-
-        # Probability that κ is in expected range
-        prob_in_range = (
-            stats.norm.cdf(self.expected_kappa + self.tolerance, posterior_mean, posterior_std) -
-            stats.norm.cdf(self.expected_kappa - self.tolerance, posterior_mean, posterior_std)
+        The likelihood needs sampling SEs, so domains fit with Theil-Sen
+        (se_type 'ci_half_width') are left out and listed in 'excluded'.
+        """
+        included = self._sampling_se_results()
+        if not included:
+            raise ValueError("Bayesian analysis needs a domain with a sampling SE (OLS or Huber)")
+        domains = list(included.keys())
+        posterior = fit_hierarchical_kappa(
+            [r['fitted_kappa'] for r in included.values()],
+            [r['std_error'] for r in included.values()],
+            domains=domains,
+            prior_mean=self.expected_kappa,
+            prior_std=0.2,
+            kappa_range=(self.expected_kappa - self.tolerance, self.expected_kappa + self.tolerance)
         )
+        mu = posterior['mu']
 
         return {
-            'posterior_mean': posterior_mean,
-            'posterior_std': posterior_std,
-            'credible_interval_95': (ci_low, ci_high),
-            'probability_in_range': prob_in_range,
-            'prior_mean': prior_mean,
-            'prior_std': prior_std
+            'posterior_mean': mu['mean'],
+            'posterior_std': mu['std'],
+            'credible_interval_95': mu['credible_interval_95'],
+            'probability_in_range': posterior['probability_mu_in_range'],
+            'prior_mean': posterior['prior']['mu_mean'],
+            'prior_std': posterior['prior']['mu_std'],
+            'tau_mean': posterior['tau']['mean'],
+            'tau_credible_interval_95': posterior['tau']['credible_interval_95'],
+            'new_domain_credible_interval_95': posterior['kappa_new']['credible_interval_95'],
+            'probability_new_domain_in_range': posterior['probability_new_domain_in_range'],
+            'domain_kappa': {
+                domain: {
+                    'mean': summary['mean'],
+                    'credible_interval_95': summary['credible_interval_95']
+                }
+                for domain, summary in posterior['domain_kappa'].items()
+            },
+            'max_rhat': max(mu['rhat'], posterior['tau']['rhat']),
+            'min_ess': min(mu['ess'], posterior['tau']['ess']),
+            'excluded': [d for d in self.results if d not in included]
         }
 
     def generate_report(self) -> str:
@@ -197,9 +379,17 @@ class CouplingCoefficientValidator:
         for domain, result in self.results.items():
             report.append(f"\n{domain.upper()}:")
             report.append(f"  Fitted κ_LJ: {result['fitted_kappa']:.3f}")
+            if result['method'] != 'ols':
+                report.append(f"  Estimator: {result['method']}")
             report.append(f"  95% CI: [{result['confidence_interval'][0]:.3f}, {result['confidence_interval'][1]:.3f}]")
+            if result['bootstrap']:
+                boot = result['bootstrap']
+                report.append(f"  95% CI (bootstrap percentile): [{boot['percentile_ci'][0]:.3f}, {boot['percentile_ci'][1]:.3f}]")
+                report.append(f"  95% CI (bootstrap BCa): [{boot['bca_ci'][0]:.3f}, {boot['bca_ci'][1]:.3f}]")
             report.append(f"  R²: {result['r_squared']:.3f}")
             report.append(f"  p-value: {result['p_value']:.4f}")
+            if result['permutation_p_value'] is not None:
+                report.append(f"  p-value (permutation): {result['permutation_p_value']:.4f}")
             report.append(f"  Sample size: {result['sample_size']}")
             report.append(f"  Effect size (f²): {result['effect_size_f2']:.3f}")
 
@@ -224,6 +414,10 @@ class CouplingCoefficientValidator:
             report.append(f"\nMean κ_LJ across domains: {cross['mean_kappa']:.3f} ± {cross['std_kappa']:.3f}")
             report.append(f"95% CI: [{cross['confidence_interval'][0]:.3f}, {cross['confidence_interval'][1]:.3f}]")
             report.append(f"Consistency score: {cross['consistency_score']:.3f}")
+            report.append(f"Heterogeneity: Q={cross['heterogeneity_q']:.2f}, p={cross['heterogeneity_p']:.4f}, I²={cross['i_squared']:.1%}")
+            if cross['excluded_from_weighting']:
+                report.append(f"  (Q and I² exclude Theil-Sen domains, which have no sampling SE: "
+                              f"{', '.join(cross['excluded_from_weighting'])})")
             report.append(f"Domains validated: {cross['domains_validated']} / {cross['domains_tested']}")
             report.append(f"Validation rate: {cross['validation_rate']:.1%}")
 
@@ -232,12 +426,22 @@ class CouplingCoefficientValidator:
             report.append("BAYESIAN ANALYSIS:")
             report.append("-" * 80)
 
-            bayes = self.bayesian_analysis()
+            bayes = self.bayesian_analysis() if self._sampling_se_results() else None
 
-            report.append(f"\nPrior: κ ~ Normal({bayes['prior_mean']:.2f}, {bayes['prior_std']:.2f}²)")
-            report.append(f"Posterior: κ ~ Normal({bayes['posterior_mean']:.3f}, {bayes['posterior_std']:.3f}²)")
-            report.append(f"95% Credible Interval: [{bayes['credible_interval_95'][0]:.3f}, {bayes['credible_interval_95'][1]:.3f}]")
-            report.append(f"P(κ ∈ [1.2, 1.6]): {bayes['probability_in_range']:.1%}")
+            if bayes is None:
+                report.append("\nSkipped: every domain was fit with Theil-Sen, which has no sampling SE")
+            else:
+                report.append(f"\nPrior: μ ~ Normal({bayes['prior_mean']:.2f}, {bayes['prior_std']:.2f}²), τ ~ HalfCauchy(0.2)")
+                report.append(f"Posterior μ (population κ): {bayes['posterior_mean']:.3f} ± {bayes['posterior_std']:.3f}")
+                report.append(f"95% Credible Interval: [{bayes['credible_interval_95'][0]:.3f}, {bayes['credible_interval_95'][1]:.3f}]")
+                report.append(f"Between-domain SD τ: {bayes['tau_mean']:.3f} "
+                              f"[{bayes['tau_credible_interval_95'][0]:.3f}, {bayes['tau_credible_interval_95'][1]:.3f}]")
+                report.append(f"New domain κ 95% interval: [{bayes['new_domain_credible_interval_95'][0]:.3f}, "
+                              f"{bayes['new_domain_credible_interval_95'][1]:.3f}]")
+                report.append(f"P(μ ∈ [1.2, 1.6]): {bayes['probability_in_range']:.1%}")
+                report.append(f"Sampler: max R̂ = {bayes['max_rhat']:.3f}, min ESS = {bayes['min_ess']:.0f}")
+                if bayes['excluded']:
+                    report.append(f"Excluded (Theil-Sen, no sampling SE): {', '.join(bayes['excluded'])}")
 
         # Overall conclusion
         report.append("\n" + "=" * 80)
@@ -245,10 +449,8 @@ class CouplingCoefficientValidator:
         report.append("=" * 80)
 
         if len(self.results) > 1:
-            cross = self.cross_domain_analysis()
-            bayes = self.bayesian_analysis()
-
-            if cross['validation_rate'] >= 0.75 and bayes['probability_in_range'] > 0.80:
+            # cross and bayes were computed in the cross-domain section above
+            if bayes is not None and cross['validation_rate'] >= 0.75 and bayes['probability_in_range'] > 0.80:
                 report.append("\n✓ HYPOTHESIS VALIDATED")
                 report.append(f"  The coupling coefficient κ_LJ ≈ {cross['mean_kappa']:.2f} is consistent")
                 report.append(f"  across {cross['domains_tested']} domains with {bayes['probability_in_range']:.1%} confidence.")
@@ -264,20 +466,33 @@ class CouplingCoefficientValidator:
         return "\n".join(report)
 
 
-def generate_synthetic_data(domain: str, n: int = 30, true_kappa: float = 1.4, noise: float = 0.1):
+def generate_synthetic_data(
+    domain: str,
+    n: int = 30,
+    true_kappa: float = 1.4,
+    noise: float = 0.1,
+    seed: int = 42,
+    rng: SeedLike = None
+):
     """
     Generate synthetic data for testing
 
     In real study, this would be replaced with actual measurements
+
+    Args:
+        domain: Domain name; selects this domain's random stream
+        seed: Root seed shared by all domains
+        rng: Optional Generator to draw from instead of the domain stream
     """
-    np.random.seed(hash(domain) % 2**32)  # Reproducible per domain
+    # Reproducible per domain, independent of PYTHONHASHSEED and process
+    rng = as_generator(rng) if rng is not None else RandomStreams(seed).stream(domain)
 
     # Random L and J values
-    L = np.random.beta(5, 2, n)  # Skewed toward higher values
-    J = np.random.beta(5, 2, n)
+    L = rng.beta(5, 2, n)  # Skewed toward higher values
+    J = rng.beta(5, 2, n)
 
     # True relationship with noise
-    J_effective = J * (1 + true_kappa * L) + np.random.normal(0, noise, n)
+    J_effective = J * (1 + true_kappa * L) + rng.normal(0, noise, n)
 
     # Ensure J_effective > 0
     J_effective = np.maximum(J_effective, 0.1)
@@ -320,7 +535,9 @@ def main():
     with open('prediction-02-results.json', 'w') as f:
         # Convert numpy types to Python types for JSON serialization
         def convert(obj):
-            if isinstance(obj, np.integer):
+            if isinstance(obj, np.bool_):
+                return bool(obj)
+            elif isinstance(obj, np.integer):
                 return int(obj)
             elif isinstance(obj, np.floating):
                 return float(obj)
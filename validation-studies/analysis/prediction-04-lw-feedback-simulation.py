@@ -15,9 +15,16 @@ This script:
 
 import numpy as np
 import matplotlib.pyplot as plt
-from typing import List, Tuple, Dict
+from scipy import stats
+from typing import List, Tuple, Dict, Optional
 import json
 
+from adaptive_sampling import adaptive_sample
+from replication import ReplicationRunner, required_sample_size
+from rng_streams import RandomStreams, SeedLike, as_generator
+from sobol_sensitivity import sobol_indices
+from streaming_stats import StreamingSummary
+
 
 class LWFeedbackSimulator:
     """Simulates Love-Wisdom feedback loop dynamics"""
@@ -87,6 +94,133 @@ class LWFeedbackSimulator:
 
         return trajectory
 
+    def simulate_intervention_batch(
+        self,
+        L0: np.ndarray,
+        W0: np.ndarray,
+        delta_W: np.ndarray,
+        weeks: int = 6,
+        intervention_week: int = 2,
+        kappa_WL: Optional[np.ndarray] = None,
+        kappa_LW: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized simulate_intervention over many teams at once
+
+        Applies exactly the same update rules as simulate_intervention, with
+        the L > 0.7 virtuous-cycle threshold evaluated per team.
+
+        Args:
+            L0, W0, delta_W: Initial conditions and interventions, broadcastable
+            weeks: Total simulation weeks
+            intervention_week: Week when intervention completes
+            kappa_WL, kappa_LW: Optional per-team coupling overrides
+                (default: the simulator's own coefficients)
+
+        Returns:
+            (L, W) arrays of shape (weeks + 1, *batch_shape)
+        """
+        kappa_WL = self.kappa_WL if kappa_WL is None else kappa_WL
+        kappa_LW = self.kappa_LW if kappa_LW is None else kappa_LW
+
+        L0, W0, delta_W, kappa_WL, kappa_LW = np.broadcast_arrays(
+            *(np.asarray(a, dtype=float) for a in (L0, W0, delta_W, kappa_WL, kappa_LW))
+        )
+
+        L_traj = np.empty((weeks + 1,) + L0.shape)
+        W_traj = np.empty((weeks + 1,) + L0.shape)
+
+        L = L0.copy()
+        W = W0.copy()
+
+        for week in range(weeks + 1):
+            L_traj[week] = L
+            W_traj[week] = W
+
+            if week < intervention_week:
+                W = W + (delta_W / intervention_week)
+            elif week > intervention_week:
+                L = np.minimum(1.0, L + kappa_WL * delta_W * L * 0.1)
+                W = np.where(
+                    L > 0.7,
+                    np.minimum(1.0, W + kappa_LW * (L - L0) * 0.05),
+                    W
+                )
+
+        return L_traj, W_traj
+
+    def simulate_intervention_sensitivity(
+        self,
+        L0: np.ndarray,
+        W0: np.ndarray,
+        delta_W: np.ndarray,
+        kappa_WL: np.ndarray,
+        kappa_LW: np.ndarray,
+        weeks: int = 6,
+        intervention_week: int = 2
+    ) -> Dict[str, np.ndarray]:
+        """
+        Batched simulation with forward sensitivities to κ_WL and κ_LW
+
+        Differentiates the update rules of simulate_intervention alongside
+        the state, so Jacobians come out of one pass with no finite
+        differences. Where min(1.0, ·) clips, the derivative is zero.
+
+        Returns:
+            Dict of arrays of shape (weeks + 1, *batch_shape):
+            L, W, dL_dkWL, dW_dkWL, dW_dkLW (L does not depend on κ_LW)
+        """
+        L0, W0, delta_W, kappa_WL, kappa_LW = np.broadcast_arrays(
+            *(np.asarray(a, dtype=float) for a in (L0, W0, delta_W, kappa_WL, kappa_LW))
+        )
+
+        shape = (weeks + 1,) + L0.shape
+        out = {k: np.empty(shape) for k in ('L', 'W', 'dL_dkWL', 'dW_dkWL', 'dW_dkLW')}
+
+        L = L0.copy()
+        W = W0.copy()
+        dL_dkWL = np.zeros(L0.shape)
+        dW_dkWL = np.zeros(L0.shape)
+        dW_dkLW = np.zeros(L0.shape)
+
+        for week in range(weeks + 1):
+            out['L'][week] = L
+            out['W'][week] = W
+            out['dL_dkWL'][week] = dL_dkWL
+            out['dW_dkWL'][week] = dW_dkWL
+            out['dW_dkLW'][week] = dW_dkLW
+
+            if week < intervention_week:
+                W = W + (delta_W / intervention_week)
+            elif week > intervention_week:
+                # L ← min(1, L + κ_WL·ΔW·L·0.1)
+                L_next = L + kappa_WL * delta_W * L * 0.1
+                L_free = L_next < 1.0
+                dL_dkWL = np.where(
+                    L_free,
+                    dL_dkWL * (1 + kappa_WL * delta_W * 0.1) + delta_W * L * 0.1,
+                    0.0
+                )
+                L = np.minimum(1.0, L_next)
+
+                # W ← min(1, W + κ_LW·(L - L0)·0.05) when L > 0.7
+                active = L > 0.7
+                W_next = W + kappa_LW * (L - L0) * 0.05
+                W_free = active & (W_next < 1.0)
+                dW_dkWL = np.where(
+                    active,
+                    np.where(W_free, dW_dkWL + kappa_LW * dL_dkWL * 0.05, 0.0),
+                    dW_dkWL
+                )
+                dW_dkLW = np.where(
+                    active,
+                    np.where(W_free, dW_dkLW + (L - L0) * 0.05, 0.0),
+                    dW_dkLW
+                )
+                W = np.where(active, np.minimum(1.0, W_next), W)
+
+        return out
+
     def predict_delta_L(
         self,
         L0: float,
@@ -148,24 +282,28 @@ class LWFeedbackSimulator:
         self,
         n_teams: int = 20,
         delta_W_mean: float = 0.4,
-        delta_W_std: float = 0.1
+        delta_W_std: float = 0.1,
+        seed: SeedLike = 42
     ) -> List[Dict]:
         """
         Generate predicted outcomes for field study
 
         Provides testable predictions for 20 teams
+
+        Args:
+            seed: Seed or Generator for the team draws (reproducible)
         """
-        np.random.seed(42)  # Reproducible
+        rng = as_generator(seed)
 
         predictions = []
 
         for team_id in range(1, n_teams + 1):
             # Random initial conditions (realistic distributions)
-            L0 = np.random.beta(3, 2)  # Skewed toward higher values
-            W0 = np.random.beta(2, 3)  # Skewed toward lower values (undocumented)
+            L0 = rng.beta(3, 2)  # Skewed toward higher values
+            W0 = rng.beta(2, 3)  # Skewed toward lower values (undocumented)
 
             # Intervention magnitude (varies by team effort)
-            delta_W = np.random.normal(delta_W_mean, delta_W_std)
+            delta_W = rng.normal(delta_W_mean, delta_W_std)
             delta_W = np.clip(delta_W, 0.2, 0.6)  # Reasonable bounds
 
             # Simulate
@@ -195,6 +333,443 @@ class LWFeedbackSimulator:
 
         return predictions
 
+    def run_field_study_ensemble(
+        self,
+        n_teams: int = 10000,
+        n_replications: int = 1000,
+        delta_W_mean: float = 0.4,
+        delta_W_std: float = 0.1,
+        block_size: int = 65536,
+        seed: int = 42
+    ) -> Dict:
+        """
+        Monte Carlo ensemble of field studies with streaming summaries
+
+        Draws teams and interventions in vectorized blocks (same distributions
+        as generate_field_study_predictions), each block from its own
+        independent RNG stream, and folds ΔL at weeks 4 and 6 into streaming
+        accumulators. Trajectories are discarded block by block, so memory
+        use depends on block_size only.
+
+        Args:
+            n_teams: Teams per simulated study
+            n_replications: Number of simulated studies
+            delta_W_mean, delta_W_std: Intervention magnitude distribution
+            block_size: Maximum teams simulated per vectorized block
+            seed: Root seed; block b of replication r uses spawn key (r, b)
+
+        Returns:
+            Dict with team-level and study-level summaries (mean, std,
+            quantiles, histogram) for delta_L_week4 and delta_L_week6
+        """
+        metrics = ['delta_L_week4', 'delta_L_week6']
+        team_level = {m: StreamingSummary(histogram_range=(0.0, 1.0), bins=100) for m in metrics}
+        study_level = {m: StreamingSummary() for m in metrics}
+
+        n_blocks = -(-n_teams // block_size)
+        streams = RandomStreams(seed)
+
+        for replication in range(n_replications):
+            study_sums = dict.fromkeys(metrics, 0.0)
+
+            for block in range(n_blocks):
+                size = min(block_size, n_teams - block * block_size)
+                rng = streams.stream(replication, block)
+
+                L0 = rng.beta(3, 2, size)
+                W0 = rng.beta(2, 3, size)
+                delta_W = np.clip(rng.normal(delta_W_mean, delta_W_std, size), 0.2, 0.6)
+
+                L, _ = self.simulate_intervention_batch(L0, W0, delta_W, weeks=6)
+                deltas = {
+                    'delta_L_week4': L[4] - L[0],
+                    'delta_L_week6': L[6] - L[0]
+                }
+
+                for m in metrics:
+                    team_level[m].update(deltas[m])
+                    study_sums[m] += float(deltas[m].sum())
+
+            for m in metrics:
+                study_level[m].update(np.array([study_sums[m] / n_teams]))
+
+        return {
+            'n_teams': n_teams,
+            'n_replications': n_replications,
+            'team_level': {m: team_level[m].summary() for m in metrics},
+            'study_mean': {m: study_level[m].summary() for m in metrics}
+        }
+
+
+class CouplingParameterFitter:
+    """
+    Least-squares estimation of κ_WL and κ_LW from observed L/W trajectories
+
+    Simulated trajectories are compared with weekly measurements for every
+    team at once. A coarse candidate grid (evaluated as one broadcast
+    simulation) picks starting values, then a vectorized Levenberg-Marquardt
+    loop refines them using the analytic sensitivities from
+    LWFeedbackSimulator.simulate_intervention_sensitivity.
+
+    The L > 0.7 threshold puts kinks in the objective, where LM can stall
+    at its starting point, so each fit is refined from the best few
+    distinct grid candidates and the lowest SSR wins. An estimate at the
+    edge of the grid is not bracketed by it (the SSR may keep falling
+    beyond): it is reported with converged=False and a NaN standard error.
+    """
+
+    def __init__(
+        self,
+        simulator: Optional[LWFeedbackSimulator] = None,
+        weeks: int = 6,
+        intervention_week: int = 2
+    ):
+        self.simulator = simulator or LWFeedbackSimulator()
+        self.weeks = weeks
+        self.intervention_week = intervention_week
+
+    def fit(
+        self,
+        L_obs: np.ndarray,
+        W_obs: np.ndarray,
+        delta_W: np.ndarray,
+        kappa_grid: Optional[np.ndarray] = None,
+        max_iter: int = 100,
+        tol: float = 1e-10,
+        n_starts: int = 3
+    ) -> Dict:
+        """
+        Fit per-team and pooled coupling coefficients
+
+        Args:
+            L_obs, W_obs: Observed trajectories, shape (n_teams, weeks + 1).
+                Week 0 is the baseline (L₀, W₀); missing weeks may be NaN.
+            delta_W: Documentation intervention size per team, shape (n_teams,)
+            kappa_grid: Candidate values for the starting-point search
+                (default: 0.0 to 3.0 in steps of 0.25, for both κ)
+            max_iter: Maximum Levenberg-Marquardt iterations
+            tol: Relative SSR improvement below which a fit has converged
+            n_starts: Best grid candidates each fit is refined from
+
+        Returns:
+            Dict with 'per_team' arrays and 'pooled' scalars: kappa_WL,
+            kappa_LW, se_kappa_WL, se_kappa_LW, rmse, converged, and
+            at_grid_edge (per κ). Standard errors are NaN where a parameter
+            is not identifiable (e.g. κ_LW for a team whose L never crosses
+            the 0.7 threshold) or its estimate lies within half a grid step
+            of the grid's edge or beyond; such fits also have
+            converged=False (widen kappa_grid and refit).
+        """
+        L_obs = np.asarray(L_obs, dtype=float)
+        W_obs = np.asarray(W_obs, dtype=float)
+        delta_W = np.asarray(delta_W, dtype=float)
+
+        if L_obs.shape != W_obs.shape or L_obs.shape[1] != self.weeks + 1:
+            raise ValueError(
+                f"Trajectories must have shape (n_teams, {self.weeks + 1}), "
+                f"got {L_obs.shape} and {W_obs.shape}"
+            )
+        if np.isnan(L_obs[:, 0]).any() or np.isnan(W_obs[:, 0]).any():
+            raise ValueError("Baseline (week 0) measurements must be present for every team")
+
+        n_teams = L_obs.shape[0]
+        if kappa_grid is None:
+            kappa_grid = np.arange(0.0, 3.01, 0.25)
+
+        # Observations stacked as (weeks + 1, n_teams); NaNs carry zero weight
+        obs = np.stack([L_obs.T, W_obs.T])
+        weight = (~np.isnan(obs)).astype(float)
+        obs = np.nan_to_num(obs)
+
+        per_team = self._levenberg_marquardt(
+            obs, weight, delta_W, np.arange(n_teams), n_teams, kappa_grid, max_iter, tol, n_starts
+        )
+        pooled = self._levenberg_marquardt(
+            obs, weight, delta_W, np.zeros(n_teams, dtype=int), 1, kappa_grid, max_iter, tol, n_starts
+        )
+
+        return {
+            'per_team': per_team,
+            'pooled': {k: v[0] for k, v in pooled.items()}
+        }
+
+    def _residuals(self, obs, weight, delta_W, theta, with_jacobian=False):
+        """Weighted residuals (2, weeks + 1, n) and optionally their Jacobian"""
+        L0 = obs[0, 0]
+        W0 = obs[1, 0]
+
+        if with_jacobian:
+            sim = self.simulator.simulate_intervention_sensitivity(
+                L0, W0, delta_W, theta[:, 0], theta[:, 1],
+                weeks=self.weeks, intervention_week=self.intervention_week
+            )
+            pred = np.stack([sim['L'], sim['W']])
+            jac = np.stack([
+                np.stack([sim['dL_dkWL'], sim['dW_dkWL']]),
+                np.stack([np.zeros_like(sim['L']), sim['dW_dkLW']])
+            ], axis=-1) * weight[..., None]
+            return (pred - obs) * weight, jac
+
+        L, W = self.simulator.simulate_intervention_batch(
+            L0, W0, delta_W, weeks=self.weeks, intervention_week=self.intervention_week,
+            kappa_WL=theta[:, 0], kappa_LW=theta[:, 1]
+        )
+        return (np.stack([L, W]) - obs) * weight
+
+    def _levenberg_marquardt(self, obs, weight, delta_W, group, n_groups, kappa_grid, max_iter, tol,
+                             n_starts=1):
+        """Vectorized multi-start LM over independent parameter groups (teams or pooled)"""
+        kappa_grid = np.asarray(kappa_grid, dtype=float)
+
+        # Starting values: evaluate every grid candidate for every team at once
+        cand = np.stack(np.meshgrid(kappa_grid, kappa_grid, indexing='ij'), axis=-1).reshape(-1, 2)
+        L_c, W_c = self.simulator.simulate_intervention_batch(
+            obs[0, 0][None, :], obs[1, 0][None, :], delta_W[None, :],
+            weeks=self.weeks, intervention_week=self.intervention_week,
+            kappa_WL=cand[:, 0:1], kappa_LW=cand[:, 1:2]
+        )
+        r_c = (np.stack([L_c, W_c]) - obs[:, :, None, :]) * weight[:, :, None, :]
+        ssr_c = np.sum(r_c ** 2, axis=(0, 1))  # (n_candidates, n_teams)
+        ssr_c_group = np.stack([
+            np.bincount(group, weights=row, minlength=n_groups) for row in ssr_c
+        ])
+        n_starts = max(1, min(n_starts, len(cand)))
+        starts = cand[np.argsort(ssr_c_group, axis=0, kind='stable')[:n_starts]]  # (n_starts, n_groups, 2)
+
+        # Each start refines its own copy of the teams, as separate groups
+        tiled = np.concatenate([group + s * n_groups for s in range(n_starts)])
+        theta, ssr, converged = self._refine(
+            np.tile(obs, n_starts), np.tile(weight, n_starts), np.tile(delta_W, n_starts),
+            tiled, n_starts * n_groups, starts.reshape(-1, 2), max_iter, tol
+        )
+        best = np.argmin(ssr.reshape(n_starts, n_groups), axis=0)
+        pick = best * n_groups + np.arange(n_groups)
+        theta, ssr, converged = theta[pick], ssr[pick], converged[pick]
+
+        # Standard errors from σ² (JᵀJ)⁻¹ at the optimum
+        _, jac = self._residuals(obs, weight, delta_W, theta[group], with_jacobian=True)
+        jtj = np.zeros((n_groups, 2, 2))
+        np.add.at(jtj, group, np.einsum('swnp,swnq->npq', jac, jac))
+
+        n_obs = np.bincount(group, weights=np.sum(weight[:, 1:], axis=(0, 1)), minlength=n_groups)
+        dof = n_obs - 2
+        sigma2 = np.where(dof > 0, ssr / np.maximum(dof, 1), np.nan)
+
+        identifiable = np.einsum('gii->gi', jtj) > 1e-12
+        cov_diag = np.full((n_groups, 2), np.nan)
+        solvable = identifiable.all(axis=1) & (np.abs(np.linalg.det(jtj)) > 1e-300)
+        if solvable.any():
+            cov_diag[solvable] = np.einsum('gii->gi', np.linalg.inv(jtj[solvable]))
+        lone = identifiable[:, 0] & ~identifiable[:, 1]  # Only κ_WL informed
+        cov_diag[lone, 0] = 1.0 / jtj[lone, 0, 0]
+        se = np.sqrt(sigma2[:, None] * cov_diag)
+
+        # Not bracketed by the grid: the SSR minimum may lie beyond it
+        half_step = np.min(np.diff(np.unique(kappa_grid)), initial=np.inf) / 2
+        at_edge = identifiable & ((theta <= kappa_grid.min() + half_step)
+                                  | (theta >= kappa_grid.max() - half_step))
+        se[at_edge] = np.nan
+        converged = converged & ~at_edge.any(axis=1)
+
+        return {
+            'kappa_WL': theta[:, 0],
+            'kappa_LW': np.where(identifiable[:, 1], theta[:, 1], np.nan),
+            'se_kappa_WL': se[:, 0],
+            'se_kappa_LW': se[:, 1],
+            'rmse': np.sqrt(ssr / np.maximum(n_obs, 1)),
+            'n_observations': n_obs.astype(int),
+            'converged': converged,
+            'at_grid_edge': at_edge
+        }
+
+    def _refine(self, obs, weight, delta_W, group, n_groups, theta, max_iter, tol):
+        """LM iterations from starting values theta (n_groups, 2); returns theta, SSR, converged"""
+        def group_ssr(theta_teams):
+            r = self._residuals(obs, weight, delta_W, theta_teams)
+            return np.bincount(group, weights=np.sum(r ** 2, axis=(0, 1)), minlength=n_groups)
+
+        ssr = group_ssr(theta[group])
+        damping = np.full(n_groups, 1e-3)
+        converged = np.zeros(n_groups, dtype=bool)
+
+        for _ in range(max_iter):
+            r, jac = self._residuals(obs, weight, delta_W, theta[group], with_jacobian=True)
+
+            # Per-team normal equations summed into their group
+            jtj_team = np.einsum('swnp,swnq->npq', jac, jac)
+            jtr_team = np.einsum('swnp,swn->np', jac, r)
+            jtj = np.zeros((n_groups, 2, 2))
+            jtr = np.zeros((n_groups, 2))
+            np.add.at(jtj, group, jtj_team)
+            np.add.at(jtr, group, jtr_team)
+
+            diag = np.einsum('gii->gi', jtj)
+            scale = np.where(diag > 0, diag, 1.0)
+            lhs = jtj + (damping[:, None] * scale)[:, :, None] * np.eye(2)
+            step = -np.linalg.solve(lhs, jtr[:, :, None])[:, :, 0]
+            step[converged] = 0.0
+
+            trial = theta + step
+            trial_ssr = group_ssr(trial[group])
+            improved = trial_ssr < ssr
+
+            rel_change = np.where(improved, (ssr - trial_ssr) / np.maximum(ssr, 1e-300), 0.0)
+            theta = np.where(improved[:, None], trial, theta)
+            damping = np.where(improved, damping / 10, damping * 10)
+            converged |= (improved & (rel_change < tol)) | (damping > 1e12) | (ssr == 0)
+            ssr = np.where(improved, trial_ssr, ssr)
+
+            if converged.all():
+                break
+
+        return theta, ssr, converged
+
+
+# Plausible ranges for global sensitivity analysis of ΔL
+LW_SENSITIVITY_BOUNDS = {
+    'L0': (0.2, 0.9),
+    'W0': (0.1, 0.7),
+    'delta_W': (0.2, 0.6),
+    'kappa_WL': (1.0, 1.6),
+    'kappa_LW': (1.2, 1.8)
+}
+
+
+def delta_L_response(X: np.ndarray) -> np.ndarray:
+    """
+    Vectorized model for sensitivity analysis
+
+    Rows of X are (L0, W0, ΔW, κ_WL, κ_LW); returns ΔL at weeks 4 and 6
+    as an (N, 2) array.
+    """
+    L, _ = LWFeedbackSimulator().simulate_intervention_batch(
+        X[:, 0], X[:, 1], X[:, 2], weeks=6,
+        kappa_WL=X[:, 3], kappa_LW=X[:, 4]
+    )
+    return np.column_stack([L[4] - L[0], L[6] - L[0]])
+
+
+def global_sensitivity_analysis(
+    n_samples: int = 2 ** 14,
+    bounds: Optional[Dict[str, Tuple[float, float]]] = None,
+    **kwargs
+) -> Dict:
+    """
+    Sobol indices of ΔL (weeks 4 and 6) with respect to L0, W0, ΔW, κ_WL, κ_LW
+
+    Extra keyword arguments are passed to sobol_indices
+    (n_bootstrap, n_workers, chunk_size, seed, ...).
+    """
+    return sobol_indices(
+        delta_L_response,
+        bounds or LW_SENSITIVITY_BOUNDS,
+        n_samples=n_samples,
+        output_names=['delta_L_week4', 'delta_L_week6'],
+        **kwargs
+    )
+
+
+def sensitivity_map_response(X: np.ndarray, delta_W: float = 0.4) -> np.ndarray:
+    """
+    Vectorized counterpart of sensitivity_analysis for adaptive sampling
+
+    Rows of X are (L0, W0); returns an (N, 2) array of observed ΔL after
+    6 weeks and its absolute error against predict_delta_L.
+    """
+    simulator = LWFeedbackSimulator()
+    L, _ = simulator.simulate_intervention_batch(X[:, 0], X[:, 1], delta_W, weeks=6)
+    observed = L[-1] - L[0]
+    predicted = simulator.predict_delta_L(X[:, 0], delta_W, weeks_after_intervention=4)
+    return np.column_stack([observed, np.abs(observed - predicted)])
+
+
+def adaptive_sensitivity_map(
+    L0_range: Tuple[float, float] = (0.1, 0.95),
+    W0_range: Tuple[float, float] = (0.1, 0.9),
+    delta_W: float = 0.4,
+    tolerance: Tuple[float, float] = (0.001, 0.001),
+    error_threshold: float = np.inf,
+    max_depth: int = 6
+):
+    """
+    Adaptively refined L0×W0 map of ΔL and prediction error
+
+    Cells are split where ΔL or |observed - predicted| is not captured by
+    linear interpolation within tolerance, or where the prediction error
+    exceeds error_threshold. Returns (tree, stats) from adaptive_sample.
+    """
+    return adaptive_sample(
+        lambda X: sensitivity_map_response(X, delta_W),
+        [L0_range, W0_range],
+        tolerance=np.asarray(tolerance),
+        max_depth=max_depth,
+        error_output=1,
+        error_threshold=error_threshold
+    )
+
+
+def field_study_replication(
+    n_teams: int,
+    rng: np.random.Generator,
+    delta_W_mean: float = 0.4,
+    delta_W_std: float = 0.1,
+    measurement_std: float = 0.1,
+    min_effect: float = 0.1
+) -> Dict[str, float]:
+    """
+    Simulate and analyse one documentation-intervention study of n_teams
+
+    Study function for ReplicationRunner (use functools.partial to change
+    the keyword arguments). Teams are drawn as in
+    generate_field_study_predictions; L is measured at weeks 0 and 4 with
+    survey noise of measurement_std. Tests:
+    - p_delta_L_positive: one-sided paired t-test of ΔL > 0
+    - p_delta_L: one-sided paired t-test of ΔL > min_effect (success criterion)
+    - p_correlation: Pearson correlation of ΔL with ΔW × L₀ (measured)
+
+    Returns:
+        Dict of the three p-values plus 'delta_L_mean', 'cohens_d' and 'r'
+    """
+    L0 = rng.beta(3, 2, n_teams)
+    W0 = rng.beta(2, 3, n_teams)
+    delta_W = np.clip(rng.normal(delta_W_mean, delta_W_std, n_teams), 0.2, 0.6)
+
+    L, _ = LWFeedbackSimulator().simulate_intervention_batch(L0, W0, delta_W, weeks=6)
+    L0_measured = L[0] + rng.normal(0, measurement_std, n_teams)
+    L4_measured = L[4] + rng.normal(0, measurement_std, n_teams)
+    delta_L = L4_measured - L0_measured
+
+    mean = delta_L.mean()
+    std = delta_L.std(ddof=1)
+    se = std / np.sqrt(n_teams)
+    r, p_correlation = stats.pearsonr(delta_W * L0_measured, delta_L)
+
+    return {
+        'p_delta_L_positive': stats.t.sf(mean / se, n_teams - 1),
+        'p_delta_L': stats.t.sf((mean - min_effect) / se, n_teams - 1),
+        'p_correlation': p_correlation,
+        'delta_L_mean': mean,
+        'cohens_d': mean / std,
+        'r': r
+    }
+
+
+def power_analysis(
+    sample_sizes: Tuple[int, ...] = (5, 10, 15, 20, 30, 40),
+    n_replications: int = 1000,
+    **kwargs
+) -> Dict:
+    """
+    Power curves of the Prediction 4 tests over a grid of team counts
+
+    Extra keyword arguments are passed to ReplicationRunner
+    (seed, alpha, n_workers, checkpoint_path, ...).
+    """
+    runner = ReplicationRunner(
+        field_study_replication, sample_sizes, n_replications=n_replications, **kwargs
+    )
+    return runner.run()
+
 
 def plot_trajectory(trajectory: List[Tuple[int, float, float]], title: str = "L↔W Dynamics"):
     """Plot L and W over time"""
@@ -344,6 +919,32 @@ def main():
 
     print()
 
+    # Prediction intervals from a Monte Carlo ensemble of the same study
+    print("Ensemble Prediction Intervals (1,000 replications of N=20)")
+    print("-" * 80)
+
+    ensemble = simulator.run_field_study_ensemble(n_teams=20, n_replications=1000)
+    team_q = ensemble['team_level']['delta_L_week4']['quantiles']
+    study_q = ensemble['study_mean']['delta_L_week4']['quantiles']
+
+    print(f"Team-level ΔL (Week 4) 95% PI: [{team_q[0.025]:.3f}, {team_q[0.975]:.3f}]")
+    print(f"Study mean ΔL (Week 4) 95% PI: [{study_q[0.025]:.3f}, {study_q[0.975]:.3f}]")
+    print()
+
+    # Power of the success criteria under survey measurement noise
+    print("Power Analysis (1,000 replications per sample size, measurement SD 0.1)")
+    print("-" * 80)
+
+    power = power_analysis()
+    tests = ['delta_L_positive', 'delta_L', 'correlation']
+    print(f"{'Teams':>6} {'ΔL > 0':>12} {'ΔL > 0.1':>12} {'Correlation':>12}")
+    for i, n in enumerate(power['sample_sizes']):
+        print(f"{n:>6} " + " ".join(f"{power['power'][t][i]:>12.3f}" for t in tests))
+    for test in tests:
+        n_required = required_sample_size(power, test, target_power=0.8)
+        print(f"  80% power for {test}: N = {n_required if n_required else '> ' + str(power['sample_sizes'][-1])}")
+    print()
+
     # Save predictions
     with open('prediction-04-field-study-predictions.json', 'w') as f:
         json.dump(predictions, f, indent=2)
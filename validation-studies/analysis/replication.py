@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Parallel Replication Engine for Study Power Estimation
+
+Answers "how many teams/organizations does the field study need?" by
+simulating the whole study many times at each candidate sample size.
+
+This module:
+1. Runs R independent replications per sample size across a process pool
+2. Gives every replication its own RNG stream, keyed by (sample size,
+   replication index), so results do not depend on worker count or
+   scheduling
+3. Aggregates rejection rates (power), Monte Carlo errors and effect-size
+   distributions into power curves
+4. Checkpoints completed replications to .npz and resumes from them
+
+A study function has the signature study_fn(n, rng) -> Dict[str, float].
+Keys starting with 'p_' are p-values of hypothesis tests; every other key
+is treated as an effect size. The function must be picklable (defined at
+module level) for multi-process runs.
+"""
+
+import os
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional, Sequence
+
+from rng_streams import RandomStreams
+
+
+def _run_block(args):
+    """Worker: run replications [rep_start, rep_stop) at sample size n"""
+    study_fn, n, rep_start, rep_stop, seed = args
+    streams = RandomStreams(seed)
+    records = [study_fn(n, streams.stream(n, rep)) for rep in range(rep_start, rep_stop)]
+    return n, rep_start, records
+
+
+class ReplicationRunner:
+    """Runs and aggregates replicated study simulations over a sample-size grid"""
+
+    def __init__(
+        self,
+        study_fn: Callable[[int, np.random.Generator], Dict[str, float]],
+        sample_sizes: Sequence[int],
+        n_replications: int = 1000,
+        seed: int = 0,
+        alpha: float = 0.05,
+        n_workers: Optional[int] = None,
+        block_size: int = 50,
+        checkpoint_path: Optional[str] = None,
+        checkpoint_interval: float = 30.0
+    ):
+        """
+        Args:
+            study_fn: Simulates and analyses one study of size n
+            sample_sizes: Candidate sample sizes (teams or organizations)
+            n_replications: Replications per sample size
+            seed: Root seed of all replication streams
+            alpha: Significance level for rejection rates
+            n_workers: Worker processes (default: os.cpu_count(); 1 = in-process)
+            block_size: Replications per task sent to a worker
+            checkpoint_path: Optional .npz file to save progress to and resume from
+            checkpoint_interval: Minimum seconds between checkpoint writes
+        """
+        self.study_fn = study_fn
+        self.sample_sizes = [int(n) for n in sample_sizes]
+        self.n_replications = n_replications
+        self.seed = seed
+        self.alpha = alpha
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.block_size = block_size
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_interval = checkpoint_interval
+
+        shape = (len(self.sample_sizes), n_replications)
+        self.done = np.zeros(shape, dtype=bool)
+        self.values: Dict[str, np.ndarray] = {}
+
+        if checkpoint_path and os.path.exists(checkpoint_path):
+            self._load_checkpoint()
+
+    def _load_checkpoint(self) -> None:
+        with np.load(self.checkpoint_path) as data:
+            if (list(data['sample_sizes']) != self.sample_sizes or
+                    int(data['n_replications']) != self.n_replications or
+                    int(data['seed']) != self.seed):
+                raise ValueError(
+                    f"Checkpoint {self.checkpoint_path} was written for a different "
+                    "sample-size grid, replication count or seed"
+                )
+            self.done = data['done'].copy()
+            self.values = {
+                key[len('value_'):]: data[key].copy()
+                for key in data.files if key.startswith('value_')
+            }
+
+    def _save_checkpoint(self) -> None:
+        tmp_path = self.checkpoint_path + '.tmp.npz'
+        np.savez(
+            tmp_path,
+            sample_sizes=np.array(self.sample_sizes),
+            n_replications=self.n_replications,
+            seed=self.seed,
+            done=self.done,
+            **{f'value_{k}': v for k, v in self.values.items()}
+        )
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def _record(self, n: int, rep_start: int, records: List[Dict[str, float]]) -> None:
+        row = self.sample_sizes.index(n)
+        for offset, record in enumerate(records):
+            for key, value in record.items():
+                if key not in self.values:
+                    self.values[key] = np.full(self.done.shape, np.nan)
+                self.values[key][row, rep_start + offset] = value
+            self.done[row, rep_start + offset] = True
+
+    def _pending_tasks(self) -> List[tuple]:
+        tasks = []
+        for row, n in enumerate(self.sample_sizes):
+            for start in range(0, self.n_replications, self.block_size):
+                stop = min(start + self.block_size, self.n_replications)
+                if not self.done[row, start:stop].all():
+                    tasks.append((self.study_fn, n, start, stop, self.seed))
+        return tasks
+
+    def run(self) -> Dict:
+        """Run all pending replications and return the aggregated power curves"""
+        tasks = self._pending_tasks()
+        last_save = time.monotonic()
+
+        def maybe_checkpoint(force=False):
+            nonlocal last_save
+            if self.checkpoint_path and (force or time.monotonic() - last_save >= self.checkpoint_interval):
+                self._save_checkpoint()
+                last_save = time.monotonic()
+
+        if self.n_workers > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=self.n_workers) as pool:
+                futures = [pool.submit(_run_block, task) for task in tasks]
+                for future in as_completed(futures):
+                    self._record(*future.result())
+                    maybe_checkpoint()
+        else:
+            for task in tasks:
+                self._record(*_run_block(task))
+                maybe_checkpoint()
+
+        maybe_checkpoint(force=True)
+        return self.summary()
+
+    def summary(self) -> Dict:
+        """Power curves and effect-size distributions from completed replications"""
+        completed = self.done.sum(axis=1)
+        power = {}
+        power_se = {}
+        effects = {}
+
+        for key, values in self.values.items():
+            if key.startswith('p_'):
+                test = key[2:]
+                # A test that could not be computed (NaN) counts as not rejected
+                rejected = np.where(self.done, np.nan_to_num(values, nan=1.0) < self.alpha, False)
+                rate = rejected.sum(axis=1) / np.maximum(completed, 1)
+                power[test] = rate.tolist()
+                power_se[test] = np.sqrt(rate * (1 - rate) / np.maximum(completed, 1)).tolist()
+            else:
+                masked = np.where(self.done, values, np.nan)
+                effects[key] = {
+                    'mean': np.nanmean(masked, axis=1).tolist(),
+                    'std': np.nanstd(masked, axis=1, ddof=1).tolist(),
+                    'q025': np.nanquantile(masked, 0.025, axis=1).tolist(),
+                    'q500': np.nanquantile(masked, 0.5, axis=1).tolist(),
+                    'q975': np.nanquantile(masked, 0.975, axis=1).tolist()
+                }
+
+        return {
+            'sample_sizes': self.sample_sizes,
+            'n_replications': self.n_replications,
+            'completed': completed.tolist(),
+            'alpha': self.alpha,
+            'power': power,
+            'power_se': power_se,
+            'effects': effects
+        }
+
+
+def required_sample_size(summary: Dict, test: str, target_power: float = 0.8) -> Optional[int]:
+    """Smallest sample size on the grid whose estimated power reaches the target"""
+    for n, power in zip(summary['sample_sizes'], summary['power'][test]):
+        if power >= target_power:
+            return n
+    return None
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Streaming Summary Statistics
+
+Mergeable accumulators for Monte Carlo studies whose outputs are too large to
+keep in memory. Every accumulator:
+1. Folds in a whole block of values at once (vectorized)
+2. Merges exactly with another accumulator of the same kind
+3. Reports its summary at any time without rescanning data
+
+Used by the ensemble and replication runners, which simulate blocks of teams
+or organizations and discard them as soon as they are folded in.
+"""
+
+import numpy as np
+from typing import Dict, Optional, Sequence
+
+
+class WelfordAccumulator:
+    """Running count, mean and variance (Welford / Chan et al. parallel update)"""
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # Sum of squared deviations from the mean
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values: np.ndarray) -> None:
+        """Fold a block of values into the running moments"""
+        values = np.asarray(values, dtype=float).ravel()
+        if values.size == 0:
+            return
+
+        block_mean = float(values.mean())
+        block_m2 = float(np.sum((values - block_mean) ** 2))
+        self._combine(values.size, block_mean, block_m2)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+    def merge(self, other: 'WelfordAccumulator') -> None:
+        """Merge another accumulator into this one"""
+        if other.n == 0:
+            return
+        self._combine(other.n, other.mean, other.m2)
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def _combine(self, n_b: int, mean_b: float, m2_b: float) -> None:
+        n_a = self.n
+        n = n_a + n_b
+        delta = mean_b - self.mean
+
+        self.mean += delta * n_b / n
+        self.m2 += m2_b + delta ** 2 * n_a * n_b / n
+        self.n = n
+
+    @property
+    def variance(self) -> float:
+        """Sample variance (ddof=1)"""
+        return self.m2 / (self.n - 1) if self.n > 1 else float('nan')
+
+    @property
+    def std(self) -> float:
+        return float(np.sqrt(self.variance))
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            'n': self.n,
+            'mean': self.mean,
+            'std': self.std,
+            'min': self.min,
+            'max': self.max
+        }
+
+
+class QuantileSketch:
+    """
+    Relative-error quantile sketch (DDSketch-style logarithmic buckets)
+
+    Every value x ≠ 0 falls into bucket ceil(log_γ |x|) with
+    γ = (1 + α) / (1 - α), so any reported quantile is within relative
+    error α of the exact sample quantile. Buckets are sparse integer keys,
+    which makes merging two sketches an exact count addition.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.005):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError(f"relative_accuracy must be in (0, 1), got {relative_accuracy}")
+
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = np.log(self.gamma)
+        self.positive: Dict[int, int] = {}
+        self.negative: Dict[int, int] = {}
+        self.zero_count = 0
+        self.n = 0
+
+    def update(self, values: np.ndarray) -> None:
+        """Fold a block of values into the sketch"""
+        values = np.asarray(values, dtype=float).ravel()
+        if values.size == 0:
+            return
+
+        self.n += values.size
+        self.zero_count += int(np.count_nonzero(values == 0))
+        self._add(self.positive, values[values > 0])
+        self._add(self.negative, -values[values < 0])
+
+    def _add(self, store: Dict[int, int], magnitudes: np.ndarray) -> None:
+        if magnitudes.size == 0:
+            return
+        keys = np.ceil(np.log(magnitudes) / self._log_gamma).astype(np.int64)
+        unique_keys, counts = np.unique(keys, return_counts=True)
+        for key, count in zip(unique_keys.tolist(), counts.tolist()):
+            store[key] = store.get(key, 0) + count
+
+    def merge(self, other: 'QuantileSketch') -> None:
+        """Merge another sketch with the same relative accuracy"""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+
+        for mine, theirs in ((self.positive, other.positive), (self.negative, other.negative)):
+            for key, count in theirs.items():
+                mine[key] = mine.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self.n += other.n
+
+    def quantiles(self, qs: Sequence[float]) -> np.ndarray:
+        """Estimate quantiles for each q in [0, 1]"""
+        qs = np.asarray(qs, dtype=float)
+        if self.n == 0:
+            return np.full(qs.shape, np.nan)
+
+        # Ordered bucket representatives: most negative first
+        neg_keys = sorted(self.negative, reverse=True)
+        pos_keys = sorted(self.positive)
+        values = np.concatenate([
+            [-self._bucket_value(k) for k in neg_keys],
+            [0.0] if self.zero_count else [],
+            [self._bucket_value(k) for k in pos_keys]
+        ])
+        counts = np.concatenate([
+            [self.negative[k] for k in neg_keys],
+            [self.zero_count] if self.zero_count else [],
+            [self.positive[k] for k in pos_keys]
+        ])
+
+        cumulative = np.cumsum(counts)
+        ranks = qs * (self.n - 1)
+        idx = np.searchsorted(cumulative, ranks, side='right')
+        return values[np.minimum(idx, len(values) - 1)]
+
+    def _bucket_value(self, key: int) -> float:
+        # Midpoint (in relative terms) of bucket (γ^(k-1), γ^k]
+        return 2 * self.gamma ** key / (1 + self.gamma)
+
+
+class StreamingHistogram:
+    """Fixed-edge histogram with underflow/overflow counts"""
+
+    def __init__(self, edges: np.ndarray):
+        self.edges = np.asarray(edges, dtype=float)
+        self.counts = np.zeros(len(self.edges) - 1, dtype=np.int64)
+        self.underflow = 0
+        self.overflow = 0
+
+    @classmethod
+    def uniform(cls, low: float, high: float, bins: int = 50) -> 'StreamingHistogram':
+        return cls(np.linspace(low, high, bins + 1))
+
+    def update(self, values: np.ndarray) -> None:
+        """Fold a block of values into the histogram"""
+        values = np.asarray(values, dtype=float).ravel()
+        self.underflow += int(np.count_nonzero(values < self.edges[0]))
+        self.overflow += int(np.count_nonzero(values > self.edges[-1]))
+        counts, _ = np.histogram(values, bins=self.edges)
+        self.counts += counts
+
+    def merge(self, other: 'StreamingHistogram') -> None:
+        if not np.array_equal(self.edges, other.edges):
+            raise ValueError("Cannot merge histograms with different edges")
+        self.counts += other.counts
+        self.underflow += other.underflow
+        self.overflow += other.overflow
+
+    def to_dict(self) -> Dict:
+        return {
+            'edges': self.edges.tolist(),
+            'counts': self.counts.tolist(),
+            'underflow': self.underflow,
+            'overflow': self.overflow
+        }
+
+
+class StreamingSummary:
+    """Moments, quantile sketch and histogram of one streamed quantity"""
+
+    DEFAULT_QUANTILES = (0.025, 0.05, 0.25, 0.5, 0.75, 0.95, 0.975)
+
+    def __init__(
+        self,
+        histogram_range: Optional[Sequence[float]] = None,
+        bins: int = 50,
+        relative_accuracy: float = 0.005
+    ):
+        self.moments = WelfordAccumulator()
+        self.sketch = QuantileSketch(relative_accuracy)
+        self.histogram = (
+            StreamingHistogram.uniform(histogram_range[0], histogram_range[1], bins)
+            if histogram_range is not None else None
+        )
+
+    def update(self, values: np.ndarray) -> None:
+        self.moments.update(values)
+        self.sketch.update(values)
+        if self.histogram is not None:
+            self.histogram.update(values)
+
+    def merge(self, other: 'StreamingSummary') -> None:
+        self.moments.merge(other.moments)
+        self.sketch.merge(other.sketch)
+        if self.histogram is not None and other.histogram is not None:
+            self.histogram.merge(other.histogram)
+
+    def summary(self, quantiles: Sequence[float] = DEFAULT_QUANTILES) -> Dict:
+        result = self.moments.summary()
+        result['quantiles'] = {
+            float(q): float(v) for q, v in zip(quantiles, self.sketch.quantiles(quantiles))
+        }
+        if self.histogram is not None:
+            result['histogram'] = self.histogram.to_dict()
+        return result